@@ -0,0 +1,89 @@
+# benchmarks/cdp_transport.py
+import argparse  # Command line interface
+from benchmarks.framework import FixtureSite, measure  # Local stand-in site and timing loop
+from benchmarks.stats import print_table, summarize  # Shared benchmark helpers
+from driver.cdp_transport import CdpSession  # Transport under test
+from driver.driver_setup import Driver  # Browser startup
+
+READ_ALTS_SCRIPT = "return Array.prototype.map.call(document.querySelectorAll(arguments[0]), function (e) { return e.alt; });"
+
+
+def commands(driver, session, pipeline):
+    """
+    Return command name -> (classic WebDriver callable, DevTools websocket callable).
+    """
+    expressions = [f"document.querySelectorAll('img').length + {i}" for i in range(pipeline)]
+    return {
+        "evaluate": (
+            lambda: driver.execute_script("return document.title;"),
+            lambda: session.run_script("return document.title;"),
+        ),
+        "dom_query": (
+            lambda: driver.execute_script(READ_ALTS_SCRIPT, "img.tw-image"),
+            lambda: session.run_script(READ_ALTS_SCRIPT, "img.tw-image"),
+        ),
+        "scroll": (
+            lambda: driver.execute_script("window.scrollBy(0, arguments[0]);", 1),
+            lambda: session.run_script("window.scrollBy(0, arguments[0]);", 1),
+        ),
+        "screenshot": (
+            driver.get_screenshot_as_base64,
+            lambda: session.call("Page.captureScreenshot", {"format": "png"}),
+        ),
+        f"pipelined_x{pipeline}": (
+            lambda: [driver.execute_script(f"return {expression};") for expression in expressions],
+            lambda: session.call_many([("Runtime.evaluate", {"expression": e, "returnByValue": True}) for e in expressions]),
+        ),
+    }
+
+
+def run(warmup, repeat, pipeline):
+    """
+    Time each command over both transports in one browser on the fixture site.
+
+    :return: "<transport>.<command>" -> summary (see benchmarks.stats.summarize).
+    """
+    driver = Driver.get_driver(mobile=True)
+    session = CdpSession.connect(driver)
+    samples = {}
+    try:
+        with FixtureSite() as site:
+            driver.get(site.url)
+            # Fill the page with search results so DOM queries have something to read
+            driver.execute_script("document.getElementById('browse').click();")
+            driver.execute_script(
+                "var input = document.querySelector('#search input'); input.value = 'bench';"
+                "input.dispatchEvent(new KeyboardEvent('keydown', {key: 'Enter'}));"
+            )
+            driver.execute_script("return new Promise(function (resolve) { setTimeout(resolve, 300); });")
+            for name, (classic, devtools) in commands(driver, session, pipeline).items():
+                samples[f"classic.{name}"] = measure(f"classic.{name}", classic, warmup, repeat)
+                samples[f"cdp.{name}"] = measure(f"cdp.{name}", devtools, warmup, repeat)
+    finally:
+        session.close()
+        Driver.close_driver(driver)
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def main():
+    """
+    Compare per-command latency of chromedriver HTTP commands and the DevTools websocket:
+    python -m benchmarks.cdp_transport [--repeat N]
+    """
+    parser = argparse.ArgumentParser(description="Per-command latency of the classic and DevTools transports.")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed runs per command")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed runs per command")
+    parser.add_argument("--pipeline", type=int, default=10, help="Commands in the pipelined batch")
+    args = parser.parse_args()
+
+    results = run(args.warmup, args.repeat, args.pipeline)
+    print_table(results, {})
+    print()
+    for name in sorted({metric.split(".", 1)[1] for metric in results}):
+        classic, devtools = results[f"classic.{name}"]["median"], results[f"cdp.{name}"]["median"]
+        print(f"{name:20} classic {classic * 1000:8.2f} ms   cdp {devtools * 1000:8.2f} ms   {classic / devtools:5.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
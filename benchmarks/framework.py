@@ -0,0 +1,165 @@
+# benchmarks/framework.py
+import argparse  # Command line interface
+import functools  # Binding the site folder to the request handler
+import os  # OS module for file and directory handling
+import tempfile  # Throwaway wait history for the fixture site
+import threading  # The fixture site is served from a background thread
+import time  # High resolution timer
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer  # Local static file server
+from selenium.webdriver.common.by import By  # Locator strategy class for Selenium
+from benchmarks.stats import compare, load_baseline, print_table, save_baseline, summarize  # Shared benchmark helpers
+from driver.driver_setup import Driver  # Browser startup under test
+from lib.adaptive_timeouts import AdaptiveTimeouts  # Kept away from the real site's wait history
+from lib.tracing import Tracer  # Spans of each benchmark are written like a test's
+from pages.common_page import CommonPage  # Page objects under test
+from pages.home_page import HomePage  # Page objects under test
+
+SITE_DIR = os.path.join(os.path.dirname(__file__), "site")
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "framework_baseline.json")
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass  # One line per request would drown the results
+
+
+class FixtureSite:
+    """
+    Serves the static stand-in pages in benchmarks/site on a free local port.
+    """
+    def __init__(self, directory=SITE_DIR):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=directory))
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/index.html"
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fixture-site", daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
+
+
+def measure(name, func, warmup, repeat, setup=None):
+    """
+    Time a framework primitive.
+
+    :param name: Benchmark name; its spans are written under "benchmark::<name>".
+    :param func: Callable that is timed.
+    :param warmup: Untimed runs before measuring.
+    :param repeat: Timed runs.
+    :param setup: Optional callable run before every run, outside the timing.
+    :return: List of durations in seconds.
+    """
+    samples = []
+    Tracer.start_test(f"benchmark::{name}")
+    try:
+        for run in range(warmup + repeat):
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            if run >= warmup:
+                samples.append(elapsed)
+    finally:
+        Tracer.end_test()
+    return samples
+
+
+def search_flow(home_page, common_page, url):
+    """
+    The steps of test_twitch_search_player, against the fixture site.
+    """
+    home_page.load(url)
+    home_page.click_browse_button()
+    home_page.enter_search_text("StarCraft II")
+    common_page.close_modal_popup()
+    for _ in range(2):
+        common_page.scroll_down(200)
+    home_page.click_twitch_image()
+    home_page.wait_for_player_load()
+
+
+def run(warmup, repeat, startup_repeat, only=None):
+    """
+    Run the benchmarks against a fresh browser and the local fixture site.
+
+    :param warmup: Untimed runs per primitive.
+    :param repeat: Timed runs per primitive.
+    :param startup_repeat: Timed browser startups (each one starts and quits Chrome).
+    :param only: Optional set of benchmark names to run.
+    :return: Benchmark name -> summary (see benchmarks.stats.summarize).
+    """
+    samples = {}
+    wanted = (lambda name: only is None or name in only)
+    history_dir = tempfile.mkdtemp(prefix="benchmark_waits_")
+    # Fixed timeouts, and waits on the fixture site must not teach budgets for the real site
+    AdaptiveTimeouts._settings = dict(AdaptiveTimeouts.settings(), enabled=False,
+                                      history_file=os.path.join(history_dir, "wait_history.json"))
+
+    if wanted("driver_startup"):
+        samples["driver_startup"] = measure(
+            "driver_startup", lambda: Driver.close_driver(Driver.get_driver(mobile=True)), 1, startup_repeat
+        )
+
+    driver = Driver.get_driver(mobile=True)
+    try:
+        with FixtureSite() as site:
+            home_page, common_page = HomePage(driver), CommonPage(driver)
+            home_page.load(site.url)
+            click_browse = lambda: home_page.click_element("home.browse_button")
+            # name -> (timed callable, untimed setup before each run)
+            primitives = {
+                "page_load": (lambda: home_page.load(site.url), None),
+                "find_element": (lambda: home_page.find_element(By.ID, "browse"), None),
+                # Locator resolution plus click, and a click on an element already in the ElementCache
+                "click_element": (click_browse, home_page.elements.invalidate),
+                "click_element_cached": (click_browse, lambda: home_page.locate("home.browse_button", "clickable")),
+                "is_modal_present": (home_page.is_modal_present, None),
+                "take_screenshot": (lambda: home_page.take_screenshot("benchmark"), None),
+                "search_flow": (lambda: search_flow(home_page, common_page, site.url), None),
+            }
+            for name, (func, setup) in primitives.items():
+                if wanted(name):
+                    samples[name] = measure(name, func, warmup, repeat, setup)
+    finally:
+        Driver.close_driver(driver)
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def main():
+    """
+    Benchmark the framework's primitives: python -m benchmarks.framework [--repeat N] [--update-baseline]
+
+    Exits with 1 when a median is more than --threshold slower than the baseline.
+    """
+    parser = argparse.ArgumentParser(description="Time BasePage/Driver primitives against a local stand-in site.")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed runs per primitive")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per primitive")
+    parser.add_argument("--startup-repeat", type=int, default=3, help="Timed browser startups")
+    parser.add_argument("--only", help="Comma separated benchmark names to run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown of the median, e.g. 0.2 for 20%%")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    results = run(args.warmup, args.repeat, args.startup_repeat, set(args.only.split(",")) if args.only else None)
+    baseline = load_baseline(args.baseline)
+    print_table(results, baseline)
+    if args.update_baseline:
+        save_baseline(args.baseline, dict(baseline, **results))
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+    regressions = compare(results, baseline, args.threshold)
+    for metric, reference, current, change in regressions:
+        print(f"REGRESSION {metric}: median {reference:.4f}s -> {current:.4f}s ({change:+.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+# benchmarks/startup.py
+import argparse  # Command line interface
+import os  # OS module for file and directory handling
+import subprocess  # Every measurement runs in a fresh interpreter
+import sys  # Path of the current interpreter
+import tempfile  # Hand-off file for the first-test probe
+import time  # Wall clock timing
+from benchmarks.stats import compare, load_baseline, print_table, save_baseline, summarize  # Shared benchmark helpers
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "startup_baseline.json")
+
+# Modules whose import time is tracked, one fresh interpreter per sample
+IMPORTS = {
+    "import.test_twitch_search": "tests.test_twitch_search",
+    "import.tests_conftest": "tests.conftest",
+    "import.driver_setup": "driver.driver_setup",
+}
+
+# A cheap test that needs no browser, so time-to-first-test measures only harness startup
+FIRST_TEST = "tests/test_sharding.py::test_partition_balances_longest_first"
+
+PROBE_ENV = "STARTUP_PROBE_FILE"
+START_ENV = "STARTUP_PROBE_T0"
+
+
+def pytest_runtest_call(item):
+    """
+    Probe hook, loaded with `-p benchmarks.startup`: write the seconds between
+    process launch and the first test body to the file named by STARTUP_PROBE_FILE.
+    """
+    path = os.environ.get(PROBE_ENV)
+    if path and not os.path.exists(path):
+        with open(path, "w") as probe_file:
+            probe_file.write(str(time.time() - float(os.environ[START_ENV])))
+
+
+def measure_import(module):
+    """
+    Return the seconds a fresh interpreter spends importing `module`.
+    """
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_collect():
+    """
+    Return the wall time of `pytest --collect-only` over the tests folder.
+    """
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider", "tests"],
+                   capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def measure_first_test():
+    """
+    Return the seconds from launching pytest to the start of the first test.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        probe = os.path.join(folder, "first_test")
+        env = dict(os.environ, **{PROBE_ENV: probe, START_ENV: str(time.time())})
+        subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-p", "benchmarks.startup",
+                        FIRST_TEST], capture_output=True, check=True, env=env)
+        with open(probe) as probe_file:
+            return float(probe_file.read())
+
+
+def run(repeat):
+    """
+    Measure every metric `repeat` times.
+
+    :return: Metric name -> summary (see benchmarks.stats.summarize).
+    """
+    samples = {}
+    for _ in range(repeat):
+        for metric, module in IMPORTS.items():
+            samples.setdefault(metric, []).append(measure_import(module))
+        samples.setdefault("pytest.collect_only", []).append(measure_collect())
+        samples.setdefault("pytest.time_to_first_test", []).append(measure_first_test())
+    return {metric: summarize(values) for metric, values in samples.items()}
+
+
+def main():
+    """
+    Track harness startup cost: python -m benchmarks.startup [--repeat N] [--update-baseline]
+
+    Note that the pytest runs start a regular session, so reports/ and screenshots/ are cleared.
+    Exits with 1 when a median is more than --threshold slower than the baseline.
+    """
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-first-test.")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per metric")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown of the median, e.g. 0.25 for 25%%")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    baseline = load_baseline(args.baseline)
+    print_table(results, baseline)
+    if args.update_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+    regressions = compare(results, baseline, args.threshold)
+    for metric, reference, current, change in regressions:
+        print(f"REGRESSION {metric}: median {reference:.4f}s -> {current:.4f}s ({change:+.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+# benchmarks/stats.py
+import json  # Baselines are stored as JSON
+import os  # OS module for file and directory handling
+from lib.adaptive_timeouts import percentile  # Percentile interpolation shared with the wait budgets
+
+
+def summarize(samples):
+    """
+    Summarize repeated measurements.
+
+    :param samples: Non-empty list of durations in seconds.
+    :return: Dict with runs, min, median, p95 and mean, rounded to 0.1 ms.
+    """
+    return {
+        "runs": len(samples),
+        "min": round(min(samples), 4),
+        "median": round(percentile(samples, 50), 4),
+        "p95": round(percentile(samples, 95), 4),
+        "mean": round(sum(samples) / len(samples), 4),
+    }
+
+
+def load_baseline(path):
+    """
+    Read a baseline file, metric name -> summary. Missing files give an empty baseline.
+    """
+    try:
+        with open(path) as baseline_file:
+            return json.load(baseline_file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, results):
+    """
+    Write the summaries of a run as the new baseline.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as baseline_file:
+        json.dump(results, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+
+
+def compare(results, baseline, threshold, key="median"):
+    """
+    Compare a run against a baseline.
+
+    :param results: Metric name -> summary of this run.
+    :param baseline: Metric name -> summary of the baseline run.
+    :param threshold: Allowed relative slowdown, e.g. 0.2 for 20 %.
+    :param key: Summary field that is compared.
+    :return: List of (metric, baseline value, current value, change) for metrics that regressed.
+    """
+    regressions = []
+    for metric, summary in sorted(results.items()):
+        reference = baseline.get(metric, {}).get(key)
+        if not reference:
+            continue
+        change = summary[key] / reference - 1
+        if change > threshold:
+            regressions.append((metric, reference, summary[key], change))
+    return regressions
+
+
+def print_table(results, baseline):
+    """
+    Print one line per metric with its summary and the change against the baseline median.
+    """
+    print(f"{'metric':32} {'runs':>4} {'min':>8} {'median':>8} {'p95':>8} {'baseline':>9} {'change':>7}")
+    for metric, summary in sorted(results.items()):
+        reference = baseline.get(metric, {}).get("median")
+        change = f"{summary['median'] / reference - 1:+.0%}" if reference else "-"
+        print(f"{metric:32} {summary['runs']:>4} {summary['min']:>8.4f} {summary['median']:>8.4f} "
+              f"{summary['p95']:>8.4f} {reference or '-':>9} {change:>7}")
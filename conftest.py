@@ -0,0 +1,423 @@
+# conftest.py
+import html  # Escaping step names in the HTML report
+import json  # Writing shard results
+import os  # OS module for file and directory handling
+import logging  # Retry output
+import pytest  # Import pytest for hook implementations
+from _pytest.runner import runtestprotocol  # Running a test without logging its reports, for retries (pytest is pinned in requirements.txt)
+from lib.artifacts import clear_artifacts, get_folder, get_worker_id, merge_worker_artifacts, read_worker_jsonl  # Session-level artifact handling
+from lib.config import get_section  # Importing the config section reader
+from lib.failure_artifacts import FailureArtifacts  # DOM snapshots of failing pages
+from lib.live_report import LiveReport  # HTML report streamed as tests finish
+from lib.logging import configure_logging, set_log_context  # Log handlers and test id in log records
+from lib.page_metrics import PageMetrics  # Page performance history
+from lib.retries import RUNS_FILE, FlakinessTracker, classify_failure  # Retries and flakiness history
+from lib.screenshot_pipeline import ScreenshotPipeline  # Background screenshot writer
+from lib.sharding import RESULTS_FILE, load_durations, partition, shard_results, update_durations  # Test sharding
+from lib.tracing import SPANS_FILE, Tracer, render_flame, summarize_spans  # Per-step timing spans
+
+
+logger = logging.getLogger("retry_logger")
+
+# Failure kinds that get a DOM snapshot from the hook; assertions are captured by ExpectationHandler
+SNAPSHOT_FAILURE_KINDS = ("timeout", "webdriver", "error")
+
+# Outcome and total duration (setup + call + teardown) of every test run in this session
+_test_results = {}
+
+# Call report of the running test attempt, read when choosing what its teardown keeps for a retry
+_call_report_key = pytest.StashKey()
+
+# Report rows are streamed here by the controller process; details of tests still running wait in _live_details
+_live_report = None
+_live_details = {}
+
+
+def _is_xdist_worker(config):
+    """
+    Return True when running inside a pytest-xdist worker process.
+    """
+    return hasattr(config, "workerinput")
+
+
+def pytest_addoption(parser):
+    """
+    Options for running one shard of the suite on each CI node.
+    """
+    group = parser.getgroup("sharding")
+    group.addoption("--num-shards", type=int, default=1, help="Split the suite into this many balanced shards.")
+    group.addoption("--shard-id", type=int, default=0, help="Index (0-based) of the shard to run.")
+    group.addoption("--store-durations", action="store_true",
+                    help="Fold this run's test durations into the durations file used for sharding.")
+
+
+def pytest_configure(config):
+    """
+    Validate the shard options and set up logging.
+    """
+    configure_logging()
+    num_shards, shard_id = config.getoption("num_shards"), config.getoption("shard_id")
+    if num_shards < 1 or not 0 <= shard_id < num_shards:
+        raise pytest.UsageError(f"--shard-id must be between 0 and {num_shards - 1} (got {shard_id})")
+
+
+def _driver_group(item, pool):
+    """
+    Return the DriverPool key of the browser a test uses, or None if it uses no browser.
+
+    Tests use mobile emulation unless marked with @pytest.mark.driver_config(mobile=False);
+    tests parametrized with a device all share the device matrix browser.
+    """
+    if not {"driver", "driver_pool"} & set(item.fixturenames):
+        return None
+    callspec = getattr(item, "callspec", None)
+    if callspec is not None and "device" in callspec.params:
+        return pool.config_key(mobile=False, device=callspec.params["device"])
+    marker = item.get_closest_marker("driver_config")
+    return pool.config_key(marker.kwargs.get("mobile", True) if marker else True)
+
+
+def pytest_collection_modifyitems(session, config, items):
+    """
+    Keep only the tests of the selected shard, ordered so tests sharing a driver configuration run together.
+    """
+    num_shards = config.getoption("num_shards")
+    if num_shards <= 1:
+        return
+    from driver.driver_setup import DriverPool  # Only needed to group tests by driver configuration
+
+    durations = load_durations()
+    pool = DriverPool()
+    groups = {item.nodeid: _driver_group(item, pool) for item in items}
+    startup = {group: durations["driver_startup"].get(group[1], 0.0) for group in set(groups.values()) if group}
+    shards = partition([(item.nodeid, groups[item.nodeid]) for item in items], num_shards, durations["tests"], startup)
+
+    position = {nodeid: index for index, nodeid in enumerate(shards[config.getoption("shard_id")])}
+    config.hook.pytest_deselected(items=[item for item in items if item.nodeid not in position])
+    items[:] = sorted((item for item in items if item.nodeid in position), key=lambda item: position[item.nodeid])
+
+
+def pytest_runtest_logreport(report):
+    """
+    Add up the duration of each test's phases (including browser startup in setup) and track its outcome.
+    """
+    result = _test_results.setdefault(report.nodeid, {"outcome": "passed", "duration": 0.0})
+    result["duration"] = round(result["duration"] + report.duration, 3)
+    if report.failed:
+        result["outcome"] = "failed" if report.when == "call" else "error"
+    elif report.skipped and result["outcome"] == "passed":
+        result["outcome"] = "skipped"
+    if _live_report is not None:
+        _stream_report(report, result)
+
+
+def _stream_report(report, result):
+    """
+    Collect the details of a test's phases and append its row to the live report after teardown.
+    """
+    details = _live_details.setdefault(report.nodeid, {})
+    if report.when == "call":
+        details.update(
+            worker=_user_property(report, "worker", ""),
+            step_timings=_user_property(report, "step_timings", ""),
+            screenshots=_user_property(report, "screenshots", []),
+        )
+    if (report.failed or report.skipped) and "message" not in details:
+        details["message"] = _short_message(report)
+        details["xfailed"] = hasattr(report, "wasxfail")
+    if report.when != "teardown":
+        return
+    details = _live_details.pop(report.nodeid)
+    outcome = "xfailed" if details.pop("xfailed", False) else result["outcome"]
+    _live_report.add(report.nodeid, outcome, result["duration"], retries=_user_property(report, "retries", 0), **details)
+
+
+def _short_message(report):
+    """
+    Return the one-line reason of a failed, skipped or xfailed report.
+    """
+    if hasattr(report, "wasxfail"):
+        return report.wasxfail
+    crash = getattr(report.longrepr, "reprcrash", None)
+    if crash is not None:
+        return crash.message
+    if isinstance(report.longrepr, tuple):  # (path, line, reason) of a skip
+        return report.longrepr[2]
+    return str(report.longrepr or "")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionstart(session):
+    """
+    Clear screenshots and reports once per run, before any worker starts, and start the live report.
+    """
+    global _live_report
+    if not _is_xdist_worker(session.config):
+        clear_artifacts(generated_files=(RESULTS_FILE,))
+        _live_report = LiveReport.from_config(get_folder("reports"))
+        if _live_report is not None:
+            _live_report.open()
+
+
+def pytest_sessionfinish(session):
+    """
+    Write pending screenshots and snapshots, then merge the per-worker screenshots into a single
+    index, write the shard results, update the flakiness and page metrics history and
+    finish the live report once all workers are done.
+    """
+    ScreenshotPipeline.flush()
+    FailureArtifacts.flush()
+    if not _is_xdist_worker(session.config):
+        merge_worker_artifacts()
+        _write_shard_results(session.config)
+        FlakinessTracker.update_history()
+        PageMetrics.update_history()
+        if _live_report is not None:
+            _live_report.close()
+
+
+def _write_shard_results(config):
+    """
+    Write this shard's outcomes and durations for `python -m lib.sharding merge`,
+    and update the durations file when --store-durations is given.
+    """
+    if not _test_results:
+        return
+    startup = {}
+    for stats in read_worker_jsonl("reports", "browser_profiles.jsonl"):
+        startup.setdefault(stats["profile"], []).append(stats["startup_seconds"])
+    results = shard_results(
+        config.getoption("shard_id"),
+        config.getoption("num_shards"),
+        _test_results,
+        {profile: round(sum(times) / len(times), 3) for profile, times in startup.items()},
+    )
+    reports_root = get_folder("reports")
+    os.makedirs(reports_root, exist_ok=True)
+    with open(os.path.join(reports_root, RESULTS_FILE), "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    if config.getoption("store_durations"):
+        update_durations(results)
+
+
+def _capture_failure(item, kind, exception):
+    """
+    Take a screenshot and DOM snapshot of the failing test's browser, if it has one.
+    """
+    driver = item.funcargs.get("driver")
+    if driver is None:
+        return
+    from pages.base_page import BasePage  # Only needed when a browser test fails
+
+    # Prefer the test's own page object, its last wait names the locator that failed
+    page = next((value for value in item.funcargs.values() if isinstance(value, BasePage)), None) or BasePage(driver)
+    try:
+        page.capture_failure(f"{item.name}_failure", {"failure_kind": kind, "error": str(exception)[:1000]})
+    except Exception as e:
+        logger.warning(f"Could not capture failure artifacts for {item.nodeid}: {e}")
+
+
+def _user_property(report, name, default=None):
+    """
+    Return a value stored with request.node.user_properties for a test report.
+    """
+    return dict(report.user_properties).get(name, default)
+
+
+def pytest_runtest_logstart(nodeid, location):
+    """
+    Start collecting timing spans for the test and tag log records with its id.
+    """
+    Tracer.start_test(nodeid)
+    set_log_context(nodeid)
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    """
+    Write the test's timing spans to the worker's spans.jsonl.
+    """
+    Tracer.end_test()
+    set_log_context(None)
+
+
+class _AttemptBoundary:
+    """
+    Stands in for nextitem while a test attempt runs, so the teardown boundary is
+    chosen after the call: when the call failed and will be retried, only the test's
+    own fixtures are torn down and the module and session fixtures (such as the warm
+    driver_pool) stay up for the retry, even for the last test of the session.
+    Otherwise everything the real next item does not share is torn down as usual.
+    """
+    def __init__(self, item, nextitem, retries):
+        self.item = item
+        self.nextitem = nextitem
+        self.retries = retries
+
+    def retrying(self):
+        report = self.item.stash.get(_call_report_key, None)
+        return (report is not None and report.failed
+                and FlakinessTracker.should_retry(_user_property(report, "failure_kind", "error"), self.retries))
+
+    def listchain(self):
+        if self.retrying():
+            return self.item.parent.listchain()
+        return self.nextitem.listchain() if self.nextitem is not None else []
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item, nextitem):
+    """
+    Run a test, running it again when its call fails with a retryable kind of failure.
+
+    Each attempt takes a warm browser from the pool, as the driver fixture returns
+    its browser between attempts. Only the reports of the last attempt are logged.
+    They carry the number of retries, and a final failure of a quarantined test is
+    reported as xfailed so it does not block the run.
+    """
+    item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+    kinds = []
+    while True:
+        item.stash[_call_report_key] = None
+        # runtestprotocol creates a fresh fixture request for every attempt
+        reports = runtestprotocol(item, nextitem=_AttemptBoundary(item, nextitem, len(kinds)), log=False)
+        failure = next((report for report in reports if report.failed), None)
+        if failure is None:
+            break
+        kinds.append(_user_property(failure, "failure_kind", "error"))
+        if failure.when != "call" or not FlakinessTracker.should_retry(kinds[-1], len(kinds) - 1):
+            break
+        logger.warning(f"{item.nodeid} failed ({kinds[-1]}), retrying (attempt {len(kinds) + 1})")
+
+    retries = len(kinds) - (failure is not None)
+    if retries:
+        for report in reports:
+            report.user_properties.append(("retries", retries))
+    reason = FlakinessTracker.quarantine_reason(item.nodeid) if failure is not None and failure.when == "call" else None
+    if reason is not None:
+        failure.outcome = "skipped"
+        failure.wasxfail = reason
+    FlakinessTracker.record(item.nodeid, "failed" if failure else "flaky" if retries else "passed", retries, kinds)
+
+    for report in reports:
+        item.ihook.pytest_runtest_logreport(report=report)
+    item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+    return True
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Classify failures as "failure_kind", store the number of WebDriver commands sent
+    during the test call as "webdriver_commands" and step retries as "step_retries",
+    and attach a flame-style breakdown of the test's steps to the HTML report.
+
+    For the live report, the call report also carries the worker id, the step
+    breakdown and the test's screenshot paths.
+
+    A test call failing for any reason other than an assertion (which ExpectationHandler
+    already captures) or a lost browser gets a failure screenshot and DOM snapshot.
+    """
+    outcome = yield
+    report = outcome.get_result()
+    if report.failed and call.excinfo is not None:
+        kind = classify_failure(call.excinfo.value)
+        report.user_properties.append(("failure_kind", kind))
+        if report.when == "call" and kind in SNAPSHOT_FAILURE_KINDS:
+            _capture_failure(item, kind, call.excinfo.value)
+    if report.when != "call":
+        return
+    item.stash[_call_report_key] = report
+    counter = getattr(item, "command_counter", None)
+    if counter is not None:
+        report.user_properties.append(("webdriver_commands", counter.total - item.commands_before))
+    step_retries = sum(span["attrs"].get("step_retries", 0) for span in Tracer.current_spans())
+    if step_retries:
+        report.user_properties.append(("step_retries", step_retries))
+    flame = render_flame(Tracer.current_spans())
+    screenshots = ScreenshotPipeline.take_captures()
+    if get_section("live_report").get("enabled", True):
+        report.user_properties.append(("worker", get_worker_id()))
+        report.user_properties.append(("step_timings", flame))
+        report.user_properties.append(("screenshots", screenshots))
+    if flame and item.config.pluginmanager.hasplugin("html"):
+        import pytest_html  # Only needed when the HTML report is enabled
+        report.extras = getattr(report, "extras", []) + [pytest_html.extras.html(flame)]
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_table_header(cells):
+    """
+    Add columns with the number of WebDriver commands sent by each test and its retries.
+    """
+    cells.insert(2, "<th>Commands</th>")
+    cells.insert(3, "<th>Retries</th>")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_table_row(report, cells):
+    """
+    Fill the WebDriver commands and retries columns.
+    """
+    cells.insert(2, f"<td>{_user_property(report, 'webdriver_commands', '')}</td>")
+    retries = _user_property(report, "retries", 0)
+    step_retries = _user_property(report, "step_retries", 0)
+    cells.insert(3, f"<td>{retries}{f' (+{step_retries} steps)' if step_retries else ''}</td>")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix, session):
+    """
+    Add a table of the slowest steps across the whole suite to the HTML report.
+    """
+    rows = summarize_spans(read_worker_jsonl("reports", SPANS_FILE))
+    if not rows:
+        return
+    postfix.append(
+        "<h2>Slowest steps</h2><table><tr><th>Step</th><th>Calls</th><th>Total (s)</th>"
+        "<th>Mean (s)</th><th>Max (s)</th><th>Commands</th></tr>"
+        + "".join(
+            f"<tr><td>{html.escape(r['name'])}</td><td>{r['calls']}</td><td>{r['total']:.2f}</td>"
+            f"<td>{r['mean']:.3f}</td><td>{r['max']:.3f}</td><td>{r['commands']}</td></tr>"
+            for r in rows
+        )
+        + "</table>"
+    )
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """
+    Print WebDriver commands per test, retried and quarantined tests, and average
+    browser startup time and memory per browser profile.
+    """
+    if _is_xdist_worker(config):
+        return
+    retried = [run for run in read_worker_jsonl("reports", RUNS_FILE) if run["retries"]]
+    quarantined = [r for r in terminalreporter.stats.get("xfailed", []) if r.wasxfail.startswith("quarantined")]
+    if retried or quarantined:
+        terminalreporter.section("retries")
+        for run in retried:
+            terminalreporter.write_line(
+                f"{run['retries']} retries ({', '.join(run['kinds'])}), {run['outcome']}: {run['nodeid']}"
+            )
+        for report in quarantined:
+            terminalreporter.write_line(f"{report.wasxfail}: {report.nodeid}")
+    reports = [r for stat in terminalreporter.stats.values() for r in stat if getattr(r, "when", None) == "call"]
+    commands = [(r.nodeid, _user_property(r, "webdriver_commands")) for r in reports]
+    commands = [(nodeid, count) for nodeid, count in commands if count is not None]
+    if commands:
+        terminalreporter.section("webdriver commands")
+        for nodeid, count in sorted(commands, key=lambda c: -c[1]):
+            terminalreporter.write_line(f"{count:6d}  {nodeid}")
+
+    stats = read_worker_jsonl("reports", "browser_profiles.jsonl")
+    if not stats:
+        return
+    terminalreporter.section("browser profiles")
+    for profile in sorted({s["profile"] for s in stats}):
+        runs = [s for s in stats if s["profile"] == profile]
+        startup = sum(s["startup_seconds"] for s in runs) / len(runs)
+        rss = [s["rss_mb"] for s in runs if s["rss_mb"] is not None]
+        rss_text = f"{sum(rss) / len(rss):.1f} MB" if rss else "n/a"
+        terminalreporter.write_line(
+            f"{profile}: {len(runs)} browser(s), avg startup {startup:.2f}s, avg RSS {rss_text}"
+        )
@@ -0,0 +1,272 @@
+# driver/cdp_transport.py
+import itertools  # Message ids
+import json  # DevTools messages are JSON
+import logging  # Connection output
+import threading  # Reader thread and send lock
+import urllib.request  # Listing the browser's DevTools targets
+from concurrent.futures import Future, TimeoutError  # One future per pending command
+from selenium.common.exceptions import JavascriptException, WebDriverException  # Errors callers already handle
+
+logger = logging.getLogger("driver_logger")
+
+# Types a script argument can have to be sent as JSON instead of through chromedriver
+JSON_TYPES = (str, int, float, bool, type(None))
+
+
+class CdpError(WebDriverException):
+    """
+    A DevTools command returned an error.
+    """
+
+
+class CdpConnectionError(WebDriverException):
+    """
+    The DevTools socket is closed or was lost before the command was answered.
+
+    The command may already have reached the browser.
+    """
+
+
+class CdpNotSentError(CdpConnectionError):
+    """
+    The DevTools socket was unusable, so the command was never written; it is safe to send it another way.
+    """
+
+
+class CdpSession:
+    """
+    A persistent Chrome DevTools Protocol websocket to the page a WebDriver session controls.
+
+    Commands are written to the socket as soon as they are sent and answered by a
+    reader thread, so several commands can be in flight at once (see `call_many`),
+    and none of them goes through chromedriver's HTTP endpoint. Only operations
+    whose results are plain data belong here: script evaluation returning JSON,
+    screenshots and DevTools domains. Anything that returns WebElements stays on the
+    classic WebDriver commands. The session is bound to the tab that was current when
+    it connected and evaluates in its main frame.
+    """
+    def __init__(self, websocket_url, timeout=10):
+        """
+        Args:
+            websocket_url (str): webSocketDebuggerUrl of the page target.
+            timeout (float): Seconds to wait for the connection and for each command.
+        """
+        import websocket  # websocket-client, only needed when the transport is enabled
+
+        self.timeout = timeout
+        self.alive = True
+        self._ws = websocket.create_connection(websocket_url, timeout=timeout, suppress_origin=True)
+        self._ws.settimeout(None)  # The reader blocks until the next message
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._listeners = {}
+        self._reader = threading.Thread(target=self._read_loop, name="cdp-reader", daemon=True)
+        self._reader.start()
+
+    @classmethod
+    def connect(cls, driver, timeout=10):
+        """
+        Open a session to the tab the driver is on.
+
+        Args:
+            driver (WebDriver): A Chrome WebDriver instance.
+            timeout (float): Seconds to wait for the connection and for each command.
+
+        Returns:
+            CdpSession: The connected session.
+        """
+        address = driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+        if not address:
+            raise WebDriverException("The browser does not expose a DevTools address")
+        with urllib.request.urlopen(f"http://{address}/json/list", timeout=timeout) as response:
+            targets = [t for t in json.load(response) if t.get("type") == "page"]
+        handle = driver.current_window_handle  # chromedriver window handles are DevTools target ids
+        target = next((t for t in targets if t["id"] == handle), None)
+        if target is None:
+            raise WebDriverException(f"No DevTools target for window {handle}")
+        return cls(target["webSocketDebuggerUrl"], timeout)
+
+    def send(self, method, params=None):
+        """
+        Send a command without waiting for its answer.
+
+        Returns:
+            Future: Resolves to the command's result dict.
+        """
+        future = Future()
+        with self._lock:
+            if not self.alive:
+                raise CdpNotSentError("The DevTools connection is closed")
+            message_id = next(self._ids)
+            future.message_id = message_id
+            self._pending[message_id] = future
+            try:
+                self._ws.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+            except Exception as e:
+                self.alive = False
+                self._pending.pop(message_id, None)
+                raise CdpNotSentError(f"The DevTools connection was lost: {e}") from e
+        return future
+
+    def call(self, method, params=None):
+        """
+        Send a command and wait for its result.
+        """
+        return self._result(self.send(method, params), method)
+
+    def call_many(self, commands):
+        """
+        Send several commands back to back, then wait for all of them.
+
+        Args:
+            commands (list): (method, params) pairs.
+
+        Returns:
+            list: The results, in the order of the commands.
+        """
+        futures = [(self.send(method, params), method) for method, params in commands]
+        return [self._result(future, method) for future, method in futures]
+
+    def evaluate(self, expression):
+        """
+        Evaluate a JavaScript expression in the page and return its value as JSON data.
+        """
+        return self._value(self.call("Runtime.evaluate", {"expression": expression, "returnByValue": True}))
+
+    def run_script(self, script, *args):
+        """
+        Run an execute_script-style script body (using `return` and `arguments`) with JSON arguments.
+        """
+        return self.evaluate(self.script_expression(script, args))
+
+    @staticmethod
+    def script_expression(script, args):
+        return f"(function () {{\n{script}\n}}).apply(null, {json.dumps(list(args))})"
+
+    def on(self, event, callback):
+        """
+        Call `callback(params)` for every DevTools event named `event` (e.g. "Network.responseReceived").
+
+        The domain has to be enabled separately, e.g. session.call("Network.enable").
+        """
+        with self._lock:
+            self._listeners.setdefault(event, []).append(callback)
+
+    def close(self):
+        """
+        Close the socket; pending commands fail with CdpConnectionError.
+        """
+        with self._lock:
+            self.alive = False
+        try:
+            self._ws.close()
+        except Exception as e:
+            logger.debug(f"Closing the DevTools connection failed: {e}")
+
+    def _result(self, future, method):
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            with self._lock:  # A late answer has nobody to go to
+                self._pending.pop(future.message_id, None)
+            raise WebDriverException(f"DevTools command {method} got no answer within {self.timeout}s") from None
+
+    @staticmethod
+    def _value(result):
+        details = result.get("exceptionDetails")
+        if details is not None:
+            exception = details.get("exception", {})
+            raise JavascriptException(exception.get("description") or details.get("text", "Script error"))
+        return result["result"].get("value")
+
+    def _read_loop(self):
+        while True:
+            try:
+                message = json.loads(self._ws.recv())
+            except Exception as e:
+                reason = e
+                break
+            if "id" in message:
+                with self._lock:
+                    future = self._pending.pop(message["id"], None)
+                if future is None:
+                    continue
+                if "error" in message:
+                    future.set_exception(CdpError(message["error"].get("message", "DevTools error")))
+                else:
+                    future.set_result(message.get("result", {}))
+            else:
+                for callback in list(self._listeners.get(message.get("method"), ())):
+                    try:
+                        callback(message.get("params", {}))
+                    except Exception as e:
+                        logger.warning(f"DevTools event listener for {message.get('method')} failed: {e}")
+        with self._lock:
+            self.alive = False
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(CdpConnectionError(f"The DevTools connection was lost: {reason}"))
+
+
+def _is_json(value):
+    if isinstance(value, (list, tuple)):
+        return all(_is_json(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_json(item) for key, item in value.items())
+    return isinstance(value, JSON_TYPES)
+
+
+def _can_resend(error, idempotent):
+    """
+    A command can go through WebDriver after a socket failure if it never left, or if running it twice is harmless.
+    """
+    return idempotent or isinstance(error, CdpNotSentError)
+
+
+def run_script(driver, script, *args, idempotent=False):
+    """
+    Run a script that returns plain data, over the driver's DevTools socket when it has one.
+
+    Falls back to execute_script when the transport is off, the socket is gone or an
+    argument is not JSON (e.g. a WebElement). When the socket drops after the script was
+    sent it may already have run, so it is only run again through execute_script for
+    `idempotent` scripts; otherwise CdpConnectionError is raised. Do not use it for
+    scripts returning elements.
+
+    Args:
+        driver (WebDriver): WebDriver instance.
+        script (str): Script body, as for execute_script.
+        *args: Script arguments.
+        idempotent (bool): True for scripts that are safe to run twice (e.g. read-only ones).
+
+    Returns:
+        The script's return value.
+    """
+    session = getattr(driver, "cdp", None)
+    if session is not None and session.alive and _is_json(args):
+        try:
+            return session.run_script(script, *args)
+        except CdpConnectionError as e:
+            if not _can_resend(e, idempotent):
+                raise
+            logger.warning(f"Running the script through WebDriver instead: {e}")
+    return driver.execute_script(script, *args)
+
+
+def cdp_command(driver, method, params=None, idempotent=False):
+    """
+    Send a DevTools command over the driver's socket when it has one, else through chromedriver.
+
+    A command whose socket drops after it was sent is only sent again through chromedriver
+    when it is `idempotent`; otherwise CdpConnectionError is raised.
+    """
+    session = getattr(driver, "cdp", None)
+    if session is not None and session.alive:
+        try:
+            return session.call(method, params)
+        except CdpConnectionError as e:
+            if not _can_resend(e, idempotent):
+                raise
+            logger.warning(f"Sending {method} through chromedriver instead: {e}")
+    return driver.execute_cdp_cmd(method, params or {})
@@ -1,81 +1,285 @@
 import json # Importing the json module to handle JSON files
+import logging  # Standard logging; handlers are set up by lib.logging
 from selenium import webdriver # Importing the webdriver module from Selenium to control web browsers
 import os  # Importing the os module to interact with the operating system
-from lib.logging import setup_logger # Importing a custom logging setup function
+import threading  # Importing threading to guard the driver pool across threads
+import time  # Importing time to measure browser startup
+from driver.cdp_transport import CdpSession  # Optional DevTools websocket transport
+from lib.artifacts import artifact_dir  # Per-worker artifact folders
+from lib.command_counter import CommandCounter  # WebDriver command counting
+from lib.config import device_profile_key, get_section, profile_key, read_config  # Importing the cached config readers
+from lib.failure_artifacts import FailureArtifacts  # Console log kept for failure snapshots
+from lib.tracing import traced  # Per-step timing spans
+from lib.logging import configure_logging # Importing the shared logging setup
 
-# Set up the logger
-logger = setup_logger(name="driver_logger")
+# Handlers are attached on first use (see Driver.get_driver)
+logger = logging.getLogger("driver_logger")
+
+# Resource URL patterns blocked when a profile disables web fonts
+FONT_URL_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
 
 class Driver:
     @staticmethod
     def load_config(config_path="config.json"):
-        """Loads the mobile emulation configuration and folder paths from the provided JSON file."""
+        """Loads the mobile emulation configuration, folder paths and browser profile from the provided JSON file."""
+        # The file is parsed once and cached by lib.config (errors are logged there)
+        config = read_config(config_path)
+        if not config:
+            return "Pixel 4", {"width": 411, "height": 731, "pixelRatio": 2.625}, "screenshots", "reports", {"name": "default"}
+
+        # Get the deviceName from the config, fall back to "Pixel 4" if not found
+        mobile_emulation = config.get("mobile_emulation", {})
+        device_name = config.get("mobile_emulation", {}).get("deviceName", "Pixel 4")
+        device_metrics = mobile_emulation.get("deviceMetrics", {
+        "width": 393,
+        "height": 830,
+        "pixelRatio": 2.75
+     })
+        # Get folder paths from config file
+        folders = config.get("folders", {})
+        screenshot_dir = folders.get("screenshots", "screenshots")
+        reports_dir = folders.get("reports", "reports")
+
+        # Get the active browser profile, the BROWSER_PROFILE env var overrides the config
+        browser_profile = Driver.select_browser_profile(config.get("browser_profile", {}))
+
+        logger.info(f"Loaded config - Device: {device_name}, Device Metrics: {device_metrics}, Screenshots folder: {screenshot_dir}, Reports folder: {reports_dir}, Browser profile: {browser_profile['name']}")
+        return device_name, device_metrics, screenshot_dir, reports_dir, browser_profile
+
+    @staticmethod
+    def load_device_matrix(config_path="config.json"):
+        """
+        Return the device profiles to run, from the "device_matrix" section of config.json.
+
+        The DEVICES environment variable (comma-separated names, or "all" for every
+        configured device) overrides the "run" list.
+
+        Args:
+            config_path (str): Path to the config file (defaults to "config.json").
+
+        Returns:
+            list: Device dicts with "name", "width", "height", "pixelRatio", "mobile" and optionally "userAgent".
+        """
+        matrix = get_section("device_matrix", config_path)
+        devices = matrix.get("devices", {})
+        names = os.environ.get("DEVICES")
+        if names and names.strip().lower() == "all":
+            names = list(devices)
+        elif names:
+            names = [n.strip() for n in names.split(",") if n.strip()]
+        else:
+            names = matrix.get("run", list(devices))
+        unknown = [name for name in names if name not in devices]
+        if unknown:
+            raise ValueError(f"Unknown device(s) {unknown}, known devices: {sorted(devices)}")
+        return [dict(devices[name], name=name) for name in names]
+
+    @staticmethod
+    def get_device(name, config_path="config.json"):
+        """
+        Return one device profile from the "device_matrix" section of config.json.
+
+        Args:
+            name (str): Device name, e.g. "Pixel 7".
+            config_path (str): Path to the config file (defaults to "config.json").
+
+        Returns:
+            dict: The device settings, with its name stored under "name".
+        """
+        devices = get_section("device_matrix", config_path).get("devices", {})
+        if name not in devices:
+            raise ValueError(f"Unknown device {name}, known devices: {sorted(devices)}")
+        return dict(devices[name], name=name)
+
+    @staticmethod
+    def apply_device(driver, device):
+        """
+        Switch a running browser to a device profile through DevTools emulation.
+
+        Viewport, pixel ratio, touch and user agent are overridden in place, so moving
+        between devices costs a few commands instead of a new browser.
+
+        Args:
+            driver (WebDriver): The WebDriver instance to reconfigure.
+            device (dict): Device settings from `get_device`.
+        """
+        if getattr(driver, "device_name", None) == device["name"]:
+            return
+        if getattr(driver, "default_user_agent", None) is None:
+            driver.default_user_agent = driver.execute_cdp_cmd("Browser.getVersion", {})["userAgent"]
+        mobile = device.get("mobile", True)
+        driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+            "width": device["width"],
+            "height": device["height"],
+            "deviceScaleFactor": device.get("pixelRatio", 1),
+            "mobile": mobile,
+        })
+        driver.execute_cdp_cmd("Emulation.setTouchEmulationEnabled", {"enabled": mobile})
+        driver.execute_cdp_cmd("Emulation.setUserAgentOverride", {
+            "userAgent": device.get("userAgent") or driver.default_user_agent
+        })
+        driver.device_name = device["name"]
+        driver.device_profile = profile_key(device["name"], device)
+        logger.info(f"Switched browser to device {device['name']}: {device['width']}x{device['height']}")
+
+    @staticmethod
+    def select_browser_profile(browser_profile_config):
+        """
+        Pick the active profile from the "browser_profile" config section.
+
+        Args:
+            browser_profile_config (dict): The "browser_profile" section of config.json.
+
+        Returns:
+            dict: The profile settings, with its name stored under "name".
+        """
+        name = os.environ.get("BROWSER_PROFILE") or browser_profile_config.get("active", "default")
+        profiles = browser_profile_config.get("profiles", {})
+        if name not in profiles:
+            if name != "default":
+                logger.warning(f"Browser profile '{name}' not found in config, using defaults.")
+            return {"name": name}
+        return dict(profiles[name], name=name)
+
+    @staticmethod
+    def apply_browser_profile(chrome_options, profile):
+        """
+        Add the command-line switches and preferences requested by a browser profile.
+
+        Args:
+            chrome_options (ChromeOptions): Options for the browser about to start.
+            profile (dict): Browser profile settings from config.json.
+        """
+        if profile.get("headless"):
+            chrome_options.add_argument("--headless=new")
+        if profile.get("disable_gpu"):
+            chrome_options.add_argument("--disable-gpu")
+        if profile.get("disable_extensions"):
+            chrome_options.add_argument("--disable-extensions")
+        if profile.get("disable_background_networking"):
+            chrome_options.add_argument("--disable-background-networking")
+            chrome_options.add_argument("--disable-component-update")
+            chrome_options.add_argument("--disable-sync")
+            chrome_options.add_argument("--disable-default-apps")
+            chrome_options.add_argument("--no-first-run")
+        if profile.get("disk_cache_dir"):
+            # Shared between sessions so static assets are only downloaded once
+            chrome_options.add_argument(f"--disk-cache-dir={os.path.abspath(profile['disk_cache_dir'])}")
+        if profile.get("disable_images"):
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+            chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        if profile.get("page_load_strategy"):
+            chrome_options.page_load_strategy = profile["page_load_strategy"]
+
+    @staticmethod
+    def apply_network_blocking(driver, profile):
+        """
+        Block third-party hosts and, if requested, web fonts through the DevTools protocol.
+
+        Args:
+            driver (WebDriver): The freshly started WebDriver instance.
+            profile (dict): Browser profile settings from config.json.
+        """
+        patterns = []
+        for host in profile.get("blocked_hosts", []):
+            patterns.extend([f"*://{host}/*", f"*://*.{host}/*"])
+        if profile.get("disable_fonts"):
+            patterns.extend(FONT_URL_PATTERNS)
+        if patterns:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+            logger.info(f"Blocking {len(patterns)} URL patterns for profile {profile['name']}.")
+
+    @staticmethod
+    def record_startup_stats(driver, profile, startup_seconds):
+        """
+        Log and store the startup time and resident memory of a new browser.
+
+        Stats are appended as JSON lines to browser_profiles.jsonl in this worker's
+        reports folder so profiles can be compared at the end of the run.
+
+        Args:
+            driver (WebDriver): The freshly started WebDriver instance.
+            profile (dict): Browser profile settings from config.json.
+            startup_seconds (float): Time taken to start and configure the browser.
+        """
         try:
-            # Use the relative path to the config file in the root directory
-            with open(config_path, 'r') as config_file:
-                config = json.load(config_file)
-            
-            # Get the deviceName from the config, fall back to "Pixel 4" if not found
-            mobile_emulation = config.get("mobile_emulation", {})
-            device_name = config.get("mobile_emulation", {}).get("deviceName", "Pixel 4")
-            device_metrics = mobile_emulation.get("deviceMetrics", {
-            "width": 393,
-            "height": 830,
-            "pixelRatio": 2.75
-         })
-            # Get folder paths from config file
-            folders = config.get("folders", {})
-            screenshot_dir = folders.get("screenshots", "screenshots")
-            reports_dir = folders.get("reports", "reports")
-            
-            logger.info(f"Loaded config - Device: {device_name}, Device Metrics: {device_metrics}, Screenshots folder: {screenshot_dir}, Screenshots folder: {screenshot_dir}, Reports folder: {reports_dir}")
-            return device_name, device_metrics, screenshot_dir, reports_dir
-        
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.error(f"Error loading config: {e}")
-            return "Pixel 4", {"width": 411, "height": 731, "pixelRatio": 2.625}, "screenshots", "reports"
+            import psutil  # Optional, used to measure the browser's resident memory
+        except ImportError:
+            psutil = None
+
+        rss_mb = None
+        if psutil is not None:
+            try:
+                # chromedriver is the service process, Chrome and its helpers are its children
+                service = psutil.Process(driver.service.process.pid)
+                processes = [service] + service.children(recursive=True)
+                rss_mb = round(sum(p.memory_info().rss for p in processes) / (1024 * 1024), 1)
+            except (psutil.Error, AttributeError):
+                rss_mb = None
+
+        stats = {"profile": profile["name"], "startup_seconds": round(startup_seconds, 3), "rss_mb": rss_mb}
+        logger.info(f"Browser profile stats: {stats}")
+        with open(os.path.join(artifact_dir("reports"), "browser_profiles.jsonl"), "a") as stats_file:
+            stats_file.write(json.dumps(stats) + "\n")
         
     @staticmethod
-    def clear_folder(folder_path):
+    def attach_cdp_transport(driver, config_path="config.json"):
         """
-        Clears all files in the specified folder and creates the folder if it doesn't exist.
-        
-        :param folder_path: Path to the folder to clear.
-        """
-        if os.path.exists(folder_path):
-            for filename in os.listdir(folder_path):
-                file_path = os.path.join(folder_path, filename)
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
-                    logger.info(f"Deleted file: {file_path}")
-            logger.info(f"All files have been deleted from {folder_path}.")
-        else:
-            os.makedirs(folder_path)  # Create the folder if it doesn't exist
-            logger.info(f"Folder {folder_path} created.")
+        Open a DevTools websocket for the driver's tab when "cdp_transport" is enabled in config.json.
+
+        The session is stored as `driver.cdp` (None when disabled or unavailable); hot
+        operations use it through driver.cdp_transport.run_script / cdp_command and
+        fall back to classic WebDriver commands without it.
+
+        Args:
+            driver (WebDriver): The WebDriver instance.
+            config_path (str): Path to the config file (defaults to "config.json").
+
+        Returns:
+            CdpSession: The session, or None.
+        """
+        driver.cdp = None
+        settings = get_section("cdp_transport", config_path)
+        if not settings.get("enabled", False):
+            return None
+        try:
+            driver.cdp = CdpSession.connect(driver, settings.get("timeout", 10))
+            logger.info("DevTools websocket transport attached.")
+        except Exception as e:
+            logger.warning(f"DevTools websocket transport unavailable, using WebDriver commands: {e}")
+        return driver.cdp
 
     @staticmethod
-    def get_driver(mobile=False, config_path="config.json"):
+    @traced()
+    def get_driver(mobile=False, config_path="config.json", device=None):
         """
         Initializes and returns a WebDriver instance with mobile emulation for Chrome.
 
         Args:
             mobile (bool): If True, enables mobile emulation on Chrome.
             config_path (str): Path to the config file (defaults to "config.json").
+            device (str): Name of a "device_matrix" device; the browser is started plainly
+                and switched to the device with `apply_device` (mobile is then ignored).
 
         Returns:
             WebDriver: A Selenium WebDriver instance for the specified setup.
         """
-        # Load device name and folder paths from config
-        device_name, device_metrics, screenshot_dir, reports_dir = Driver.load_config(config_path)
-        
-        # Clear the folder contents before starting the driver
-        Driver.clear_folder(screenshot_dir)
-        Driver.clear_folder(reports_dir)
-        
-        # Initialize ChromeOptions instance
+        configure_logging()  # Create the log handlers on first use
+        # Load device name and browser profile from config (folders are cleared once per session, see conftest.py)
+        device_name, device_metrics, _, _, browser_profile = Driver.load_config(config_path)
+
+        # Initialize ChromeOptions instance with the profile's switches
         chrome_options = webdriver.ChromeOptions()
-        
-        if mobile:
+        Driver.apply_browser_profile(chrome_options, browser_profile)
+        started = time.perf_counter()
+
+        if device is not None:
+            # Emulation is applied through DevTools so the same browser can switch devices later
+            driver = webdriver.Chrome(options=chrome_options)
+            CommandCounter.install(driver)
+            Driver.apply_device(driver, Driver.get_device(device, config_path))
+        elif mobile:
               # Choose mobile emulation mode
             if device_metrics:
                 # Use deviceMetrics and custom user agent (if desired)
@@ -93,16 +297,29 @@ class Driver:
 
             chrome_options.add_experimental_option("mobileEmulation", mobile_emulation)
             driver = webdriver.Chrome(options=chrome_options)
+            CommandCounter.install(driver)
+            driver.device_profile = device_profile_key(config_path)
             # Resize the window based on device metrics (to avoid extra white space)
             driver.set_window_size(device_metrics["width"], device_metrics["height"])
             logger.info("Driver initialized with mobile emulation for device {}: {}".format(device_name, json.dumps(mobile_emulation, indent=2)))
         else:
             # Initialize the Chrome WebDriver without mobile emulation
-            chrome_options = webdriver.ChromeOptions()
             driver = webdriver.Chrome(options=chrome_options)
-            driver.maximize_window()  # Maximize the window for better visibility
+            CommandCounter.install(driver)
+            driver.device_profile = "desktop"
+            if browser_profile.get("headless"):
+                # Headless windows cannot be maximized, use a fixed viewport instead
+                width, height = browser_profile.get("window_size", [1920, 1080])
+                driver.set_window_size(width, height)
+            else:
+                driver.maximize_window()  # Maximize the window for better visibility
             logger.info("Driver initialized with chrome browser.")
 
+        driver.browser_profile_name = browser_profile["name"]  # With device_profile, names the wait history (see AdaptiveTimeouts)
+        Driver.apply_network_blocking(driver, browser_profile)
+        FailureArtifacts.install_console_hook(driver)
+        Driver.attach_cdp_transport(driver, config_path)
+        Driver.record_startup_stats(driver, browser_profile, time.perf_counter() - started)
         return driver # Returns the WebDriver instance
 
     @staticmethod
@@ -114,5 +331,276 @@ class Driver:
             driver (WebDriver): The WebDriver instance to close.
         """
         if driver:
+            session = getattr(driver, "cdp", None)
+            if session is not None:
+                session.close()
             driver.quit()
             logger.info("Driver has been closed.")
+
+
+class PooledSession:
+    """
+    A WebDriver session owned by the DriverPool, with its usage bookkeeping.
+    """
+    def __init__(self, driver, key):
+        self.driver = driver
+        self.key = key
+        self.uses = 0
+
+
+class DriverPool:
+    """
+    Hands out pre-warmed Chrome sessions keyed by driver configuration.
+
+    Sessions are reset between tests instead of being quit, so the browser
+    cold start is only paid once per session slot. Settings are read from
+    the "driver_pool" section of config.json:
+
+        size       -- maximum number of sessions per configuration key.
+        prewarm    -- number of sessions started up front by `warm`.
+        max_uses   -- number of tests a session serves before it is recycled.
+        max_heap_mb -- JS heap size on about:blank above which a session is
+                       considered leaking and recycled.
+    """
+    def __init__(self, size=None, max_uses=None, max_heap_mb=None, config_path="config.json"):
+        """
+        Initialize the pool.
+
+        Args:
+            size (int): Maximum sessions per configuration key (overrides config).
+            max_uses (int): Maximum tests served per session (overrides config).
+            max_heap_mb (int): Leak threshold for the JS heap in MB (overrides config).
+            config_path (str): Path to the config file (defaults to "config.json").
+        """
+        settings = get_section("driver_pool", config_path)
+        self.size = size or settings.get("size", 1)
+        self.max_uses = max_uses or settings.get("max_uses", 50)
+        self.max_heap_mb = max_heap_mb or settings.get("max_heap_mb", 256)
+        self.prewarm = settings.get("prewarm", 1)
+        self.config_path = config_path
+        self._idle = {}  # key -> list of idle PooledSession
+        self._counts = {}  # key -> number of live (idle + busy + starting) sessions
+        self._busy = {}  # id(driver) -> PooledSession
+        self._condition = threading.Condition()
+
+    def config_key(self, mobile, device=None):
+        """
+        Build the pool key for a driver configuration.
+
+        All "device_matrix" devices share one key per browser profile: a pooled
+        browser is switched between them through DevTools emulation.
+
+        Args:
+            mobile (bool): True for mobile emulation, False for desktop Chrome.
+            device (str): Name of a "device_matrix" device, or None.
+
+        Returns:
+            tuple: A hashable key identifying the configuration.
+        """
+        device_name, device_metrics, _, _, browser_profile = Driver.load_config(self.config_path)
+        if device is not None:
+            return ("device", browser_profile["name"])
+        if not mobile:
+            return ("desktop", browser_profile["name"])
+        return ("mobile", browser_profile["name"], device_name, json.dumps(device_metrics, sort_keys=True))
+
+    def warm(self, mobile=False, count=None, device=None):
+        """
+        Start sessions ahead of time so the first tests get a warm browser.
+
+        Args:
+            mobile (bool): Configuration to warm up.
+            count (int): Number of sessions to start (defaults to the "prewarm" setting).
+            device (str): Name of a "device_matrix" device to warm up instead.
+        """
+        key = self.config_key(mobile, device)
+        count = min(count if count is not None else self.prewarm, self.size)
+        with self._condition:  # Reserve the slots at once so a concurrent acquire cannot overshoot `size`
+            missing = max(count - self._counts.get(key, 0), 0)
+            self._counts[key] = self._counts.get(key, 0) + missing
+        threads = []
+        for _ in range(missing):
+            thread = threading.Thread(target=self._start_idle_session, args=(key, mobile, device))
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+
+    def acquire(self, mobile=False, device=None):
+        """
+        Take a healthy session for the given configuration, starting one if needed.
+
+        Blocks while `size` sessions of this configuration are already in use.
+
+        Args:
+            mobile (bool): If True, returns a mobile-emulation session.
+            device (str): Name of a "device_matrix" device; any pooled device session
+                is reused and switched to it.
+
+        Returns:
+            WebDriver: A Selenium WebDriver instance.
+        """
+        key = self.config_key(mobile, device)
+        device_settings = Driver.get_device(device, self.config_path) if device is not None else None
+        while True:
+            session = None
+            with self._condition:
+                while not self._idle.get(key) and self._counts.get(key, 0) >= self.size:
+                    self._condition.wait()
+                if self._idle.get(key):
+                    session = self._idle[key].pop()
+                else:
+                    self._counts[key] = self._counts.get(key, 0) + 1
+
+            if session is None:
+                session = self._start_session(key, mobile, device)
+            elif not self._is_alive(session.driver):
+                logger.warning("Pooled driver failed health check, recycling it.")
+                self._discard(session)
+                continue
+            elif device_settings is not None:
+                Driver.apply_device(session.driver, device_settings)
+
+            with self._condition:
+                self._busy[id(session.driver)] = session
+            return session.driver
+
+    def release(self, driver):
+        """
+        Return a session to the pool, resetting its state for the next test.
+
+        Sessions that hit `max_uses`, fail to reset or look leaky are quit instead.
+
+        Args:
+            driver (WebDriver): A driver previously returned by `acquire`.
+        """
+        with self._condition:
+            session = self._busy.pop(id(driver), None)
+        if session is None:
+            Driver.close_driver(driver)
+            return
+
+        session.uses += 1
+        if session.uses >= self.max_uses:
+            logger.info(f"Pooled driver reached {self.max_uses} uses, recycling it.")
+            self._discard(session)
+            return
+
+        try:
+            self.reset(driver)
+            healthy = self._is_clean(driver)
+        except Exception as e:  # A quit or crashed browser may also fail at the HTTP level
+            logger.warning(f"Failed to reset pooled driver: {e}")
+            healthy = False
+
+        if not healthy:
+            self._discard(session)
+            return
+
+        with self._condition:
+            self._idle.setdefault(session.key, []).append(session)
+            self._condition.notify_all()
+
+    @staticmethod
+    def reset(driver):
+        """
+        Clear per-test browser state without quitting the browser.
+
+        Closes extra tabs, clears cookies and storage of the current origin,
+        and navigates to about:blank.
+
+        Args:
+            driver (WebDriver): The WebDriver instance to reset.
+        """
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        origin = driver.execute_script(
+            "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+            "return window.location.origin;"
+        )
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        if origin and origin.startswith("http"):
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                "origin": origin,
+                "storageTypes": "indexeddb,websql,service_workers,cache_storage"
+            })
+        driver.get("about:blank")
+        cache = getattr(driver, "element_cache", None)  # Element references from the previous test
+        if cache is not None:
+            cache.invalidate()
+
+    def close_all(self):
+        """
+        Quit every session owned by the pool.
+        """
+        with self._condition:
+            sessions = [s for idle in self._idle.values() for s in idle] + list(self._busy.values())
+            self._idle.clear()
+            self._busy.clear()
+            self._counts.clear()
+            self._condition.notify_all()
+        for session in sessions:
+            Driver.close_driver(session.driver)
+
+    def _start_session(self, key, mobile, device=None):
+        """
+        Start a new browser for a slot already reserved in `_counts`.
+        """
+        try:
+            return PooledSession(Driver.get_driver(mobile=mobile, config_path=self.config_path, device=device), key)
+        except Exception:
+            with self._condition:
+                self._counts[key] -= 1
+                self._condition.notify_all()
+            raise
+
+    def _start_idle_session(self, key, mobile, device=None):
+        """
+        Start a new browser and park it in the idle list.
+        """
+        session = self._start_session(key, mobile, device)
+        with self._condition:
+            self._idle.setdefault(key, []).append(session)
+            self._condition.notify_all()
+
+    def _discard(self, session):
+        """
+        Quit a session and free its slot.
+        """
+        try:
+            Driver.close_driver(session.driver)
+        except Exception as e:
+            logger.warning(f"Error while quitting pooled driver: {e}")
+        with self._condition:
+            self._counts[session.key] -= 1
+            self._condition.notify_all()
+
+    @staticmethod
+    def _is_alive(driver):
+        """
+        Check that the browser still answers commands.
+        """
+        try:
+            driver.execute_script("return 1;")
+            return True
+        except Exception:
+            return False
+
+    def _is_clean(self, driver):
+        """
+        Check that a reset session has a single tab and no leaked JS heap.
+        """
+        if len(driver.window_handles) != 1:
+            logger.warning("Pooled driver still has extra tabs after reset.")
+            return False
+        heap = driver.execute_script(
+            "return window.performance.memory ? window.performance.memory.usedJSHeapSize : 0;"
+        )
+        if heap > self.max_heap_mb * 1024 * 1024:
+            logger.warning(f"Pooled driver JS heap is {heap} bytes after reset, recycling it.")
+            return False
+        return True
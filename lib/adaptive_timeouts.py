@@ -0,0 +1,250 @@
+# lib/adaptive_timeouts.py
+import argparse  # Command line interface for inspecting the history
+import atexit  # Save the history when the interpreter exits
+import json  # History is stored as JSON
+import logging  # Budget and persistence output
+import math  # Percentile interpolation
+import os  # OS module for file and directory handling
+import threading  # Guards the shared history
+from lib.config import device_profile_key, get_section  # Importing the config readers
+from lib.constants import TIMEOUTS  # Importing TIMEOUTS from constants
+
+logger = logging.getLogger("wait_logger")
+
+
+def percentile(samples, pct):
+    """
+    Return the pct-th percentile (0-100) of the samples, interpolating between ranks.
+
+    :param samples: Non-empty list of numbers.
+    :param pct: Percentile, e.g. 95.
+    """
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class AdaptiveTimeouts:
+    """
+    Learns how long each named wait takes and derives its timeout from that history.
+
+    Successful wait durations are kept per step (a locator name, or the locator itself)
+    and per profile (browser profile and emulated device of the browser that waited),
+    and persisted between runs. Once a step has enough samples its budget becomes
+    `multiplier` times the configured percentile, clamped to [min_timeout, max_timeout]
+    and to the timeout the caller asked for: a step that usually takes 300 ms then
+    gives up after a few seconds instead of the fixed TIMEOUTS.DEFAULT. Callers that
+    pass allow_longer=True also let a consistently slow step wait past their timeout,
+    up to max_timeout. Waits that time out are recorded at their budget (see
+    `record_timeout`), so when the site gets slower the budget grows back instead of
+    the step failing fast for good.
+
+    Settings are read from the "adaptive_timeouts" section of config.json:
+
+        enabled      -- use learned budgets (durations are recorded either way).
+        history_file -- where the history is stored between runs.
+        percentile   -- percentile of past durations the budget is based on.
+        multiplier   -- budget = multiplier * percentile.
+        min_timeout  -- lower bound of a learned budget, in seconds.
+        max_timeout  -- upper bound of a learned budget, in seconds.
+        min_samples  -- samples needed before the budget replaces the requested timeout.
+        max_samples  -- most recent samples kept per step.
+    """
+    _lock = threading.Lock()
+    _history = None  # profile -> step -> list of durations
+    _new_samples = {}  # samples recorded by this process, merged into the file on save
+    _profile = None
+    _settings = None
+
+    @classmethod
+    def settings(cls):
+        """
+        Return the "adaptive_timeouts" config section, read once.
+        """
+        if cls._settings is None:
+            cls._settings = get_section("adaptive_timeouts")
+        return cls._settings
+
+    @classmethod
+    def enabled(cls):
+        return cls.settings().get("enabled", True)
+
+    @classmethod
+    def profile(cls, driver=None):
+        """
+        Return the profile the history is kept under, e.g. "ci/iPhone_X_375x812@3.0".
+
+        :param driver: The WebDriver instance that waits; Driver.get_driver and
+                       Driver.apply_device tag it with its browser profile and device.
+                       Without one, the configured browser profile and mobile emulation are used.
+        """
+        if cls._profile is None:
+            from driver.driver_setup import Driver  # Imported here: the driver module imports lib
+
+            browser_profile = Driver.select_browser_profile(get_section("browser_profile"))
+            cls._profile = (browser_profile["name"], device_profile_key())
+        browser, device = cls._profile
+        return f"{getattr(driver, 'browser_profile_name', None) or browser}/{getattr(driver, 'device_profile', None) or device}"
+
+    @classmethod
+    def samples(cls, step, profile=None):
+        """
+        Return the recorded durations of a step for a profile (see `profile`).
+        """
+        with cls._lock:
+            return list(cls._load().get(profile or cls.profile(), {}).get(step, []))
+
+    @classmethod
+    def budget(cls, step, requested, profile=None, allow_longer=False):
+        """
+        Return the timeout to use for a step.
+
+        :param step: Step name (see WaitEngine.until).
+        :param requested: The timeout the caller asked for, in seconds.
+        :param profile: History profile of the waiting browser (see `profile`).
+        :param allow_longer: Let the learned budget exceed `requested`, up to max_timeout.
+        :return: The learned budget, or `requested` while there is too little history
+                 (or when adaptive timeouts are disabled).
+        """
+        settings = cls.settings()
+        samples = cls.samples(step, profile)
+        if not cls.enabled() or not requested or len(samples) < settings.get("min_samples", 5):
+            return requested
+        learned = settings.get("multiplier", 3.0) * percentile(samples, settings.get("percentile", 95))
+        lower = min(settings.get("min_timeout", 3.0), requested)
+        upper = settings.get("max_timeout", TIMEOUTS.LONG)
+        if not allow_longer:
+            upper = min(upper, requested)
+        return round(min(max(learned, lower), upper), 3)
+
+    @classmethod
+    def record(cls, step, elapsed, profile=None):
+        """
+        Record the duration of a successful wait.
+
+        :param step: Step name.
+        :param elapsed: Seconds the wait took.
+        :param profile: History profile of the waiting browser (see `profile`).
+        """
+        max_samples = cls.settings().get("max_samples", 100)
+        profile = profile or cls.profile()
+        with cls._lock:
+            history = cls._load().setdefault(profile, {}).setdefault(step, [])
+            history.append(round(elapsed, 4))
+            del history[:-max_samples]
+            cls._new_samples.setdefault(profile, {}).setdefault(step, []).append(round(elapsed, 4))
+
+    @classmethod
+    def record_timeout(cls, step, budget, profile=None):
+        """
+        Record a wait that timed out after `budget` seconds.
+
+        The real duration is unknown but at least the budget, so the budget is stored as
+        the sample: repeated timeouts raise the percentile, and with it the next budget.
+
+        :param step: Step name.
+        :param budget: Seconds the wait was allowed.
+        :param profile: History profile of the waiting browser (see `profile`).
+        """
+        cls.record(step, budget, profile)
+
+    @classmethod
+    def profiles(cls):
+        """
+        Return the names of the profiles that have history.
+        """
+        with cls._lock:
+            return sorted(cls._load())
+
+    @classmethod
+    def stats(cls, profile=None):
+        """
+        Summarize the history of a profile (the configured one by default).
+
+        :return: Dict of step -> {samples, p50, p95, max, budget}.
+        """
+        profile = profile or cls.profile()
+        with cls._lock:
+            steps = dict(cls._load().get(profile, {}))
+        return {
+            step: {
+                "samples": len(samples),
+                "p50": round(percentile(samples, 50), 3),
+                "p95": round(percentile(samples, 95), 3),
+                "max": max(samples),
+                "budget": cls.budget(step, TIMEOUTS.DEFAULT, profile),
+            }
+            for step, samples in sorted(steps.items()) if samples
+        }
+
+    @classmethod
+    def save(cls):
+        """
+        Merge the samples recorded by this process into the history file.
+
+        The file is re-read first, so parallel workers only lose samples if they
+        save at exactly the same moment.
+        """
+        with cls._lock:
+            new_samples, cls._new_samples = cls._new_samples, {}
+        if not new_samples:
+            return
+        path = cls.settings().get("history_file", ".cache/wait_history.json")
+        max_samples = cls.settings().get("max_samples", 100)
+        history = cls._read(path)
+        for profile, steps in new_samples.items():
+            for step, samples in steps.items():
+                merged = history.setdefault(profile, {}).setdefault(step, []) + samples
+                history[profile][step] = merged[-max_samples:]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as history_file:
+            json.dump(history, history_file)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def _load(cls):
+        """
+        Return the in-memory history, reading it from disk on first use. Call with the lock held.
+        """
+        if cls._history is None:
+            cls._history = cls._read(cls.settings().get("history_file", ".cache/wait_history.json"))
+        return cls._history
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path) as history_file:
+                return json.load(history_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable wait history {path}: {e}")
+            return {}
+
+
+atexit.register(AdaptiveTimeouts.save)
+
+
+def main():
+    """
+    Print the learned wait budgets of a profile: python -m lib.adaptive_timeouts [--profile NAME]
+    """
+    parser = argparse.ArgumentParser(description="Show learned wait durations and budgets.")
+    parser.add_argument("--profile", help="Profile to show, e.g. ci/iPhone_X_375x812@3.0 (defaults to the configured one)")
+    parser.add_argument("--list", action="store_true", help="List the profiles that have history")
+    args = parser.parse_args()
+    if args.list:
+        print("\n".join(AdaptiveTimeouts.profiles()))
+        return 0
+    profile = args.profile or AdaptiveTimeouts.profile()
+    print(f"Profile: {profile}")
+    print(f"{'step':60} {'samples':>7} {'p50':>7} {'p95':>7} {'max':>7} {'budget':>7}")
+    for step, row in AdaptiveTimeouts.stats(profile).items():
+        print(f"{step[:60]:60} {row['samples']:>7} {row['p50']:>7} {row['p95']:>7} {row['max']:>7} {row['budget']:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
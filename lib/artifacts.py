@@ -0,0 +1,132 @@
+# lib/artifacts.py
+import html  # Escaping file names for the merged index page
+import json  # Reading JSON lines written by the workers
+import os  # OS module for file and directory handling
+import re  # Recognising per-worker folders
+import shutil  # Removing per-worker artifact folders
+from lib.config import get_section  # Importing the config section reader
+
+# Worker id used when tests are not running under pytest-xdist
+MAIN_WORKER = "main"
+
+# Names of the per-worker folders: MAIN_WORKER or a pytest-xdist worker id
+WORKER_DIR = re.compile(rf"^({MAIN_WORKER}|gw\d+)$")
+
+# Index of all workers' screenshots, written next to the HTML report
+SCREENSHOT_INDEX = "screenshots.html"
+
+
+def get_worker_id():
+    """
+    Return the id of the current pytest-xdist worker (e.g. "gw0").
+
+    :return: The worker id, or MAIN_WORKER when running without xdist.
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", MAIN_WORKER)
+
+
+def get_folder(kind, config_path="config.json"):
+    """
+    Return the root folder for an artifact kind as configured in config.json.
+
+    :param kind: Folder key under "folders" (e.g. "screenshots", "reports").
+    :param config_path: Path to the config file.
+    :return: The configured folder path (defaults to the kind name).
+    """
+    return get_section("folders", config_path).get(kind, kind)
+
+
+def artifact_dir(kind, config_path="config.json"):
+    """
+    Return this worker's private folder for an artifact kind, creating it if needed.
+
+    Each worker writes into <folder>/<worker_id> so parallel runs never touch
+    each other's files.
+
+    :param kind: Folder key under "folders" (e.g. "screenshots", "reports").
+    :param config_path: Path to the config file.
+    :return: Path to the per-worker folder.
+    """
+    path = os.path.join(get_folder(kind, config_path), get_worker_id())
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def clear_artifacts(config_path="config.json", generated_files=()):
+    """
+    Remove the artifacts of previous runs. Called once per test session.
+
+    Only the per-worker folders and the files this run regenerates are removed;
+    anything else kept in the screenshots or reports folder is left alone.
+
+    :param config_path: Path to the config file.
+    :param generated_files: Further file names written to the reports folder by the session (e.g. shard results).
+    """
+    for kind in ("screenshots", "reports"):
+        folder = get_folder(kind, config_path)
+        os.makedirs(folder, exist_ok=True)
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if WORKER_DIR.match(name) and os.path.isdir(path):
+                shutil.rmtree(path)
+            elif kind == "reports" and name in (SCREENSHOT_INDEX, *generated_files) and os.path.isfile(path):
+                os.remove(path)
+
+
+def merge_worker_artifacts(config_path="config.json"):
+    """
+    Merge the screenshots of all workers into a single index page next to the HTML report.
+
+    :param config_path: Path to the config file.
+    :return: Path to the generated index page, or None if there were no screenshots.
+    """
+    screenshot_root = get_folder("screenshots", config_path)
+    reports_root = get_folder("reports", config_path)
+    if not os.path.isdir(screenshot_root):
+        return None
+
+    rows = []
+    for worker in sorted(os.listdir(screenshot_root)):
+        worker_dir = os.path.join(screenshot_root, worker)
+        if not os.path.isdir(worker_dir):
+            continue
+        for filename in sorted(os.listdir(worker_dir)):
+            link = os.path.relpath(os.path.join(worker_dir, filename), reports_root).replace(os.sep, "/")
+            rows.append(
+                f"<tr><td>{html.escape(worker)}</td>"
+                f"<td><a href=\"{html.escape(link)}\">{html.escape(filename)}</a></td></tr>"
+            )
+    if not rows:
+        return None
+
+    os.makedirs(reports_root, exist_ok=True)
+    index_path = os.path.join(reports_root, SCREENSHOT_INDEX)
+    with open(index_path, "w") as index_file:
+        index_file.write(
+            "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Screenshots</title></head><body>"
+            "<h1>Screenshots</h1><table><tr><th>Worker</th><th>File</th></tr>"
+            + "".join(rows)
+            + "</table></body></html>"
+        )
+    return index_path
+
+
+def read_worker_jsonl(kind, filename, config_path="config.json"):
+    """
+    Read a JSON lines file written by every worker into its own artifact folder.
+
+    :param kind: Folder key under "folders" (e.g. "reports").
+    :param filename: Name of the JSON lines file inside each worker folder.
+    :param config_path: Path to the config file.
+    :return: List of parsed records from all workers.
+    """
+    root = get_folder(kind, config_path)
+    records = []
+    if not os.path.isdir(root):
+        return records
+    for worker in sorted(os.listdir(root)):
+        path = os.path.join(root, worker, filename)
+        if os.path.isfile(path):
+            with open(path) as jsonl_file:
+                records.extend(json.loads(line) for line in jsonl_file if line.strip())
+    return records
@@ -0,0 +1,57 @@
+# lib/command_counter.py
+import threading  # Lock for counters shared between threads
+from collections import Counter  # Per-command tallies
+
+# Commands sent from the current thread, across all drivers (used for timing spans)
+_thread_counts = threading.local()
+
+
+class CommandCounter:
+    """
+    Counts the WebDriver commands (HTTP round trips to chromedriver) sent by a driver.
+    """
+    def __init__(self):
+        self.total = 0
+        self.by_command = Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def install(driver):
+        """
+        Attach a counter to the driver, wrapping its `execute` method. Safe to call repeatedly.
+
+        :param driver: WebDriver instance to instrument.
+        :return: The CommandCounter attached to the driver.
+        """
+        counter = getattr(driver, "command_counter", None)
+        if counter is not None:
+            return counter
+
+        counter = CommandCounter()
+        original_execute = driver.execute
+
+        def counted_execute(driver_command, params=None):
+            counter.record(driver_command)
+            return original_execute(driver_command, params)
+
+        driver.execute = counted_execute
+        driver.command_counter = counter
+        return counter
+
+    def record(self, command):
+        """
+        Record a single command.
+
+        :param command: WebDriver command name (e.g. "findElement").
+        """
+        with self._lock:
+            self.total += 1
+            self.by_command[command] += 1
+        _thread_counts.total = getattr(_thread_counts, "total", 0) + 1
+
+    @staticmethod
+    def thread_total():
+        """
+        Return the number of commands sent so far from the current thread, by any driver.
+        """
+        return getattr(_thread_counts, "total", 0)
@@ -0,0 +1,88 @@
+# lib/config.py
+import copy  # Callers get their own copy of the cached config
+import json  # Importing the json module to handle JSON files
+import logging  # Standard logging, used for config load errors
+import os  # File modification times for cache invalidation
+import re  # Making device names safe for file paths
+import threading  # Guards the config cache
+
+logger = logging.getLogger("config_logger")
+
+_lock = threading.Lock()
+_cache = {}  # absolute path -> (modification time, parsed config)
+
+
+def read_config(config_path="config.json"):
+    """
+    Read the JSON configuration file and return its contents.
+
+    The file is parsed once and cached; it is parsed again only if it changes on disk.
+
+    Args:
+        config_path (str): Path to the config file (defaults to "config.json").
+
+    Returns:
+        dict: Parsed configuration, or an empty dict if the file is missing or invalid.
+    """
+    path = os.path.abspath(config_path)
+    try:
+        modified = os.stat(path).st_mtime_ns
+    except FileNotFoundError as e:
+        logger.error(f"Error loading config: {e}")
+        return {}
+    with _lock:
+        cached = _cache.get(path)
+        if cached is None or cached[0] != modified:
+            try:
+                with open(path, 'r') as config_file:
+                    cached = _cache[path] = (modified, json.load(config_file))
+            except (FileNotFoundError, json.JSONDecodeError) as e:
+                logger.error(f"Error loading config: {e}")
+                return {}
+    return copy.deepcopy(cached[1])
+
+
+def get_section(name, config_path="config.json", default=None):
+    """
+    Return a single top-level section of the configuration file.
+
+    Args:
+        name (str): Name of the section (e.g., "driver_pool").
+        config_path (str): Path to the config file (defaults to "config.json").
+        default (dict): Value returned when the section is not present.
+
+    Returns:
+        dict: The section contents, or `default` (an empty dict if not given).
+    """
+    return read_config(config_path).get(name, default if default is not None else {})
+
+
+def device_profile_key(config_path="config.json"):
+    """
+    Build a name for the emulated device from the "mobile_emulation" config, e.g. "iPhone_X_375x812@3.0".
+
+    Args:
+        config_path (str): Path to the config file (defaults to "config.json").
+
+    Returns:
+        str: A name safe to use in file paths.
+    """
+    mobile_emulation = get_section("mobile_emulation", config_path)
+    return profile_key(mobile_emulation.get("deviceName", "default"), mobile_emulation.get("deviceMetrics", {}))
+
+
+def profile_key(name, metrics=None):
+    """
+    Build a path-safe name for a device from its name and metrics, e.g. "iPhone_X_375x812@3.0".
+
+    Args:
+        name (str): Device name.
+        metrics (dict): Optional dict with "width", "height" and "pixelRatio".
+
+    Returns:
+        str: A name safe to use in file paths.
+    """
+    key = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")
+    if metrics:
+        key += f"_{metrics.get('width')}x{metrics.get('height')}@{metrics.get('pixelRatio')}"
+    return key
@@ -5,6 +5,7 @@ class CONSTANTS:
     """
     TWITCH_TITLE = "Twitch"
     TWITCH_SEARCH_STARCRAFT_II = "StarCraft II"
+    TWITCH_SEARCH_TERMS = [TWITCH_SEARCH_STARCRAFT_II, "Just Chatting", "Chess", "Minecraft"]
     SCREENSHOT_NAME = "twitch_player"
     
 class TIMEOUTS:
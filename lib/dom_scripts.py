@@ -0,0 +1,81 @@
+# lib/dom_scripts.py
+# JavaScript helpers shared by the in-page waits and batched queries.
+# They are prepended to scripts sent with execute_script/execute_async_script
+# so a whole lookup runs inside the browser in a single WebDriver command.
+
+# Locator strategies that can be resolved inside the page (values of selenium's By)
+SUPPORTED_STRATEGIES = {
+    "css selector", "xpath", "class name", "id", "name", "tag name", "link text", "partial link text"
+}
+
+# Actions that can be applied to an element in the same script that found it
+ACTIONS = ("click", "scroll_click")
+
+DOM_HELPERS = """
+var __find = function (by, value) {
+    var toArray = function (list) { return Array.prototype.slice.call(list); };
+    switch (by) {
+        case 'css selector': return toArray(document.querySelectorAll(value));
+        case 'class name': return toArray(document.getElementsByClassName(value));
+        case 'name': return toArray(document.getElementsByName(value));
+        case 'tag name': return toArray(document.getElementsByTagName(value));
+        case 'id': var el = document.getElementById(value); return el ? [el] : [];
+        case 'link text':
+            return toArray(document.getElementsByTagName('a')).filter(function (a) { return a.innerText.trim() === value; });
+        case 'partial link text':
+            return toArray(document.getElementsByTagName('a')).filter(function (a) { return a.innerText.indexOf(value) !== -1; });
+        case 'xpath':
+            var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var i = 0; i < snapshot.snapshotLength; i++) { nodes.push(snapshot.snapshotItem(i)); }
+            return nodes;
+    }
+    throw new Error('Unsupported locator strategy: ' + by);
+};
+var __isVisible = function (el) {
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden' || parseFloat(style.opacity) === 0) { return false; }
+    var rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+};
+var __isClickable = function (el) { return __isVisible(el) && !el.disabled; };
+var __conditions = {
+    present: function () { return true; },
+    visible: __isVisible,
+    clickable: __isClickable
+};
+var __actions = {
+    click: function (el) { el.click(); },
+    scroll_click: function (el) { el.scrollIntoView(true); el.click(); }
+};
+var __findFirst = function (locators, condition) {
+    for (var i = 0; i < locators.length; i++) {
+        var matches = __find(locators[i][0], locators[i][1]).filter(__conditions[condition]);
+        if (matches.length) { return {index: i, elements: matches}; }
+    }
+    return null;
+};
+"""
+
+# Applies one of ACTIONS to arguments[0]
+ACTION_SCRIPT = DOM_HELPERS + "__actions[arguments[1]](arguments[0]);"
+
+
+def is_supported(locators):
+    """
+    Check that every locator can be resolved by the in-page helpers.
+
+    :param locators: List of (By, value) tuples.
+    :return: True if all strategies are supported.
+    """
+    return all(by in SUPPORTED_STRATEGIES for by, _ in locators)
+
+
+def to_script_args(locators):
+    """
+    Convert (By, value) tuples into plain lists that can be passed as script arguments.
+
+    :param locators: List of (By, value) tuples.
+    :return: List of [by, value] lists.
+    """
+    return [[by, value] for by, value in locators]
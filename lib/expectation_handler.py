@@ -1,5 +1,7 @@
 from selenium.webdriver.remote.webdriver import WebDriver  # WebDriver import
 from pages.base_page import BasePage  # Import the BasePage class
+from lib.page_metrics import PageMetrics, budget_violations  # Page performance budgets
+from lib.screenshot_pipeline import ScreenshotPipeline  # Background screenshot writer
 
 # This module provides a set of assertion methods for validating conditions in Selenium tests.
 class ExpectationHandler:
@@ -9,28 +11,30 @@ class ExpectationHandler:
         self.base_page = BasePage(driver)  # Initialize BasePage instance
 
     @staticmethod
-    def assert_equal(self, actual, expected, message="Values are not equal"):
+    def assert_equal(driver, actual, expected, message="Values are not equal"):
         """Asserts that actual value equals the expected value."""
         try:
             assert actual == expected, f"{message}: Expected {expected}, but got {actual}"
         except AssertionError:
-            # Take screenshot from BasePage
-            self.base_page.take_screenshot("assert_equal_failure")
+            # Take a screenshot and DOM snapshot on failure
+            base_page = BasePage(driver)
+            base_page.capture_failure("assert_equal_failure")
             raise
 
     @staticmethod
-    def assert_true(self, condition, message="Condition is not true"):
+    def assert_true(driver, condition, message="Condition is not true"):
         """Asserts that the condition is true."""
         try:
             assert condition, f"{message}: Condition is False"
         except AssertionError:
-            # Take screenshot from BasePage
-            self.base_page.take_screenshot("assert_true_failure")
+            # Take a screenshot and DOM snapshot on failure
+            base_page = BasePage(driver)
+            base_page.capture_failure("assert_true_failure")
             raise
 
     @staticmethod
     def assert_in(
-            self,
+            driver,
             item,
             container,
             message="Item not found in container"):
@@ -38,13 +42,14 @@ class ExpectationHandler:
         try:
             assert item in container, f"{message}: Expected '{item}' in '{container}'"
         except AssertionError:
-            # Take screenshot from BasePage
-            self.base_page.take_screenshot("assert_in_failure")
+            # Take a screenshot and DOM snapshot on failure
+            base_page = BasePage(driver)
+            base_page.capture_failure("assert_in_failure")
             raise
 
     @staticmethod
     def assert_contains_text(
-            self,
+            driver,
             element,
             text,
             message="Text not found in element"):
@@ -53,8 +58,9 @@ class ExpectationHandler:
             actual_text = element.text
             assert text in actual_text, f"{message}: Expected '{text}', but got '{actual_text}'"
         except AssertionError:
-            # Take screenshot from BasePage
-            self.base_page.take_screenshot("assert_contains_text_failure")
+            # Take a screenshot and DOM snapshot on failure
+            base_page = BasePage(driver)
+            base_page.capture_failure("assert_contains_text_failure")
             raise
 
     @staticmethod
@@ -63,8 +69,36 @@ class ExpectationHandler:
         try:
             assert expected_title in driver.title, f"Title does not contain '{expected_title}'"
         except AssertionError:
-            # Take a screenshot on failure
-            # Create instance to call take_screenshot
+            # Take a screenshot and DOM snapshot on failure
+            # Create instance to call capture_failure
+            base_page = BasePage(driver)
+            base_page.capture_failure("assert_title_contains_failure")
+            raise
+
+    @staticmethod
+    def assert_performance_budget(driver, metrics, budgets=None):
+        """Ensure page metrics from BasePage.collect_metrics stay within their budgets (configured per label by default)."""
+        budgets = budgets if budgets is not None else PageMetrics.budgets(metrics.get("label"))
+        violations = budget_violations(metrics, budgets)
+        try:
+            assert not violations, f"Performance budget exceeded on {metrics.get('url')}: {'; '.join(violations)}"
+        except AssertionError:
+            # Take a screenshot and DOM snapshot on failure
+            base_page = BasePage(driver)
+            base_page.capture_failure("assert_performance_budget_failure")
+            raise
+
+    @staticmethod
+    def assert_visual_match(driver, screenshot_path, test_name, ignore_regions=()):
+        """Ensure a screenshot matches its golden image for the driver's device profile."""
+        from lib.visual_regression import VisualBaseline  # numpy/Pillow are only loaded for visual checks
+
+        result = VisualBaseline(driver=driver).check(ScreenshotPipeline.resolve(screenshot_path), test_name,
+                                        ignore_regions=ignore_regions)
+        try:
+            assert result.passed, f"Screenshot does not match baseline {result.baseline_path}: {result.message}, diff: {result.diff_path}"
+        except AssertionError:
+            # Take a screenshot and DOM snapshot on failure
             base_page = BasePage(driver)
-            base_page.take_screenshot("assert_title_contains_failure")
+            base_page.capture_failure("assert_visual_match_failure")
             raise
@@ -0,0 +1,335 @@
+# lib/failure_artifacts.py
+import argparse  # Command line viewer
+import atexit  # Flush pending writes when the interpreter exits
+import gzip  # Default snapshot compression
+import json  # Snapshots are stored as compressed JSON
+import logging  # Capture output
+import os  # OS module for file and directory handling
+import threading  # Guards the shared writer state
+import time  # Capture timestamps
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait  # Time-boxed capture and background writer
+from driver.cdp_transport import run_script  # Data-only scripts over the DevTools socket when available
+from lib.artifacts import artifact_dir  # Per-worker artifact folders
+from lib.config import get_section  # Importing the config section reader
+
+logger = logging.getLogger("screenshot_logger")
+
+# Installed with Page.addScriptToEvaluateOnNewDocument when a browser starts, so every
+# document keeps its last console messages and uncaught errors in a small ring buffer.
+CONSOLE_HOOK_SCRIPT = """
+(function () {
+    if (window.__consoleLog) { return; }
+    var log = window.__consoleLog = [], max = %d;
+    var push = function (level, args) {
+        try {
+            var message = Array.prototype.map.call(args, function (arg) {
+                try { return typeof arg === 'string' ? arg : JSON.stringify(arg); } catch (e) { return String(arg); }
+            }).join(' ');
+            log.push({level: level, time: Date.now(), message: message.slice(0, 2000)});
+            if (log.length > max) { log.shift(); }
+        } catch (e) {}
+    };
+    ['log', 'info', 'warn', 'error', 'debug'].forEach(function (level) {
+        var original = console[level];
+        console[level] = function () { push(level, arguments); return original.apply(console, arguments); };
+    });
+    window.addEventListener('error', function (e) { push('uncaught', [e.message + ' at ' + e.filename + ':' + e.lineno]); });
+    window.addEventListener('unhandledrejection', function (e) { push('unhandledrejection', [String(e.reason)]); });
+})();
+"""
+
+# Everything needed to debug a failure offline, in one round trip: the serialized DOM
+# (cut at arguments[0] characters), the console buffer and the last arguments[1] network requests.
+CAPTURE_SCRIPT = """
+var maxDom = arguments[0], maxNetwork = arguments[1];
+var dom = '<!DOCTYPE html>\\n' + document.documentElement.outerHTML;
+var network = performance.getEntriesByType('resource').slice(-maxNetwork).map(function (r) {
+    return {url: r.name, initiator: r.initiatorType, start_ms: Math.round(r.startTime),
+            duration_ms: Math.round(r.duration), transfer_bytes: r.transferSize, status: r.responseStatus || null};
+});
+var active = document.activeElement;
+return {
+    url: location.href,
+    title: document.title,
+    viewport: {width: window.innerWidth, height: window.innerHeight, scroll_x: window.scrollX, scroll_y: window.scrollY},
+    active_element: active ? active.outerHTML.slice(0, 500) : null,
+    dom_length: dom.length,
+    dom_truncated: dom.length > maxDom,
+    dom: dom.slice(0, maxDom),
+    console: (window.__consoleLog || []).slice(),
+    network: network
+};
+"""
+
+
+class FailureArtifacts:
+    """
+    Captures a DOM snapshot, console log and recent network requests when a check fails.
+
+    The capture is one script call and is abandoned if it takes longer than the time
+    budget (later captures then run on a new thread); compression and writing happen
+    in the background. The snapshot is
+    written next to the failure screenshot and can be inspected without a browser:
+    python -m lib.failure_artifacts <snapshot>. Settings are read from the
+    "failure_artifacts" section of config.json:
+
+        enabled         -- capture snapshots on failures.
+        compression     -- "gzip", or "zstd" when the zstandard package is installed.
+        level           -- compression level.
+        time_budget     -- seconds the test waits for the capture before giving up.
+        max_dom_chars   -- the serialized DOM is cut at this length.
+        console_entries -- console messages kept per document.
+        network_entries -- most recent network requests stored.
+    """
+    _lock = threading.Lock()
+    _capture_executor = None
+    _write_executor = None
+    _pending = set()
+    _settings = None
+
+    @classmethod
+    def settings(cls):
+        """
+        Return the "failure_artifacts" config section, read once.
+        """
+        if cls._settings is None:
+            cls._settings = get_section("failure_artifacts")
+        return cls._settings
+
+    @classmethod
+    def enabled(cls):
+        return cls.settings().get("enabled", True)
+
+    @classmethod
+    def install_console_hook(cls, driver):
+        """
+        Keep the console messages of every document the browser loads from now on.
+
+        :param driver: A Chrome WebDriver instance.
+        """
+        if cls.enabled():
+            source = CONSOLE_HOOK_SCRIPT % cls.settings().get("console_entries", 100)
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+
+    @classmethod
+    def capture(cls, driver, screenshot_path=None, name="failure", context=None):
+        """
+        Capture the page state and queue it for writing.
+
+        :param driver: WebDriver instance on the failing page.
+        :param screenshot_path: Path of the failure screenshot; the snapshot is written next to it.
+        :param name: Base name of the file when there is no screenshot.
+        :param context: Extra JSON-serializable details stored with the snapshot (e.g. the test and failing steps).
+        :return: Path the snapshot will be written to, or None if capturing is disabled, failed or ran out of time.
+        """
+        if not cls.enabled():
+            return None
+        settings = cls.settings()
+        started = time.perf_counter()
+        future = cls._executor("_capture_executor", "snapshot-capture").submit(
+            run_script, driver, CAPTURE_SCRIPT,
+            settings.get("max_dom_chars", 5_000_000), settings.get("network_entries", 50),
+        )
+        try:
+            snapshot = future.result(timeout=settings.get("time_budget", 2.0))
+        except TimeoutError:
+            logger.warning(f"DOM snapshot took longer than {settings.get('time_budget', 2.0)}s, skipped.")
+            with cls._lock:  # The hung capture keeps its thread; the next capture gets a fresh one
+                if cls._capture_executor is not None:
+                    cls._capture_executor.shutdown(wait=False)
+                cls._capture_executor = None
+            return None
+        except Exception as e:
+            logger.warning(f"DOM snapshot failed: {e}")
+            return None
+        snapshot.update(time=time.time(), capture_seconds=round(time.perf_counter() - started, 3),
+                        screenshot=screenshot_path, context=context or {})
+
+        if screenshot_path:
+            base = os.path.splitext(screenshot_path)[0]
+        else:
+            base = os.path.join(artifact_dir("screenshots"), f"{name}_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}")
+        path = f"{base}.snapshot.json.{cls._extension()}"
+        write = cls._executor("_write_executor", "snapshot-writer").submit(cls._write, snapshot, path)
+        with cls._lock:
+            cls._pending.add(write)
+        write.add_done_callback(cls._discard_pending)
+        return path
+
+    @classmethod
+    def flush(cls):
+        """
+        Block until every queued snapshot has been written.
+        """
+        with cls._lock:
+            pending = list(cls._pending)
+        if pending:
+            wait(pending)
+
+    @staticmethod
+    def load(path):
+        """
+        Read a snapshot written by `capture`.
+
+        :param path: Path of a .snapshot.json.gz or .snapshot.json.zst file.
+        :return: The snapshot dict.
+        """
+        with open(path, "rb") as snapshot_file:
+            data = snapshot_file.read()
+        if path.endswith(".zst"):
+            import zstandard  # Optional dependency, only needed for zstd snapshots
+
+            data = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            data = gzip.decompress(data)
+        return json.loads(data)
+
+    @classmethod
+    def _extension(cls):
+        if cls.settings().get("compression", "gzip") == "zstd":
+            try:
+                import zstandard  # noqa: F401  Optional dependency
+                return "zst"
+            except ImportError:
+                logger.warning("zstandard is not installed, writing gzip snapshots instead.")
+                cls._settings = dict(cls.settings(), compression="gzip")
+        return "gz"
+
+    @classmethod
+    def _write(cls, snapshot, path):
+        """
+        Compress a snapshot and write it.
+        """
+        data = json.dumps(snapshot).encode("utf-8")
+        level = cls.settings().get("level")
+        if path.endswith(".zst"):
+            import zstandard  # Optional dependency, checked in _extension
+
+            data = zstandard.ZstdCompressor(level=level or 3).compress(data)
+        else:
+            data = gzip.compress(data, compresslevel=level or 6)
+        with open(path, "wb") as snapshot_file:
+            snapshot_file.write(data)
+        logger.info(f"DOM snapshot saved to {path} ({len(data)} bytes)")
+        return path
+
+    @classmethod
+    def _executor(cls, attribute, thread_name_prefix):
+        with cls._lock:
+            if getattr(cls, attribute) is None:
+                setattr(cls, attribute, ThreadPoolExecutor(max_workers=1, thread_name_prefix=thread_name_prefix))
+            return getattr(cls, attribute)
+
+    @classmethod
+    def _discard_pending(cls, future):
+        with cls._lock:
+            cls._pending.discard(future)
+
+
+atexit.register(FailureArtifacts.flush)
+
+
+def locator_xpath(by, value):
+    """
+    Translate a selenium locator into XPath so it can be evaluated with lxml.
+
+    :return: An XPath expression, or None for CSS selectors when cssselect is not installed.
+    """
+    if by == "xpath":
+        return value
+    if by == "id":
+        return f"//*[@id={_xpath_literal(value)}]"
+    if by == "name":
+        return f"//*[@name={_xpath_literal(value)}]"
+    if by == "tag name":
+        return f"//{value}"
+    if by == "class name":
+        return f"//*[contains(concat(' ', normalize-space(@class), ' '), {_xpath_literal(' ' + value + ' ')})]"
+    if by == "link text":
+        return f"//a[normalize-space(.)={_xpath_literal(value.strip())}]"
+    if by == "partial link text":
+        return f"//a[contains(., {_xpath_literal(value)})]"
+    if by == "css selector":
+        try:
+            from cssselect import GenericTranslator  # Optional dependency of the viewer
+        except ImportError:
+            return None
+        return GenericTranslator().css_to_xpath(value)
+    raise ValueError(f"Unsupported locator strategy: {by}")
+
+
+def _xpath_literal(value):
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    return "concat('" + "', \"'\", '".join(value.split("'")) + "')"
+
+
+def replay_locators(snapshot, names=None):
+    """
+    Evaluate registered locators against a snapshot's DOM.
+
+    Only presence can be checked offline: the snapshot has no layout, so a match
+    may still have been hidden in the browser.
+
+    :param snapshot: Snapshot dict from FailureArtifacts.load.
+    :param names: LocatorRegistry names to replay (defaults to all of them).
+    :return: List of (name, [(by, value, match count or None if it cannot be evaluated)]).
+    """
+    from lxml import html as lxml_html  # Optional dependency of the viewer
+    from pages.locators import LocatorRegistry  # Imported here: page objects pull in selenium
+
+    document = lxml_html.document_fromstring(snapshot["dom"])
+    results = []
+    for name in names or LocatorRegistry.names():
+        strategies = []
+        for by, value in LocatorRegistry.get(name).strategies:
+            xpath = locator_xpath(by, value)
+            strategies.append((by, value, len(document.xpath(xpath)) if xpath else None))
+        results.append((name, strategies))
+    return results
+
+
+def main():
+    """
+    Inspect a failure snapshot offline: python -m lib.failure_artifacts <snapshot> [--locator NAME] [--dom out.html]
+    """
+    parser = argparse.ArgumentParser(description="Show a failure snapshot and replay locators against its DOM.")
+    parser.add_argument("snapshot", help=".snapshot.json.gz or .snapshot.json.zst file")
+    parser.add_argument("--locator", action="append", help="LocatorRegistry name to replay (default: all)")
+    parser.add_argument("--dom", help="Also write the DOM to this HTML file, to open in a browser")
+    args = parser.parse_args()
+
+    snapshot = FailureArtifacts.load(args.snapshot)
+    print(f"URL:      {snapshot['url']}")
+    print(f"Title:    {snapshot['title']}")
+    print(f"Captured: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snapshot['time']))} "
+          f"in {snapshot['capture_seconds']}s, DOM {snapshot['dom_length']} chars"
+          f"{' (truncated)' if snapshot['dom_truncated'] else ''}")
+    for key, value in sorted(snapshot.get("context", {}).items()):
+        print(f"{key}: {value}")
+
+    print(f"\nConsole ({len(snapshot['console'])} messages)")
+    for entry in snapshot["console"]:
+        print(f"  [{entry['level']}] {entry['message']}")
+    print(f"\nNetwork (last {len(snapshot['network'])} requests)")
+    for request in snapshot["network"]:
+        print(f"  {request['status'] or '-':>4} {request['duration_ms']:>6} ms {request['transfer_bytes']:>9} B  {request['url'][:100]}")
+
+    print("\nLocators")
+    for name, strategies in replay_locators(snapshot, args.locator):
+        matched = any(count for _, _, count in strategies)
+        print(f"  {'ok     ' if matched else 'MISSING'} {name}")
+        for by, value, count in strategies:
+            print(f"      {'?' if count is None else count:>3}  {by}={value}")
+
+    if args.dom:
+        with open(args.dom, "w", encoding="utf-8") as dom_file:
+            dom_file.write(snapshot["dom"])
+        print(f"\nDOM written to {args.dom}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+# lib/live_report.py
+import html  # Escaping test ids, messages and links
+import os  # OS module for file and directory handling
+import threading  # Guards the report file
+import time  # Run start and elapsed time
+from lib.config import get_section  # Importing the config section reader
+
+# Written once at the top of the file. Rows are counted in the browser, so appending a
+# row is the only write per test; the page reloads itself until the closing marker is
+# written and keeps its scroll position across reloads.
+HEADER = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Live report</title>
+<style>
+body {{ font-family: sans-serif; font-size: 13px; }}
+table {{ border-collapse: collapse; width: 100%; }}
+td, th {{ border: 1px solid #ddd; padding: 3px 6px; vertical-align: top; text-align: left; }}
+tr.passed td.outcome {{ color: #2a7a2a; }}
+tr.failed td.outcome, tr.error td.outcome {{ color: #b02a2a; font-weight: bold; }}
+tr.skipped td.outcome, tr.xfailed td.outcome {{ color: #8a6d00; }}
+#progress {{ position: sticky; top: 0; background: #fff; padding: 6px 0; }}
+pre {{ margin: 0; white-space: pre-wrap; }}
+</style>
+<script>
+var refreshSeconds = {refresh};
+function updateProgress() {{
+    var counts = {{}}, rows = document.querySelectorAll("tr.result");
+    rows.forEach(function (row) {{ counts[row.dataset.outcome] = (counts[row.dataset.outcome] || 0) + 1; }});
+    var parts = Object.keys(counts).sort().map(function (k) {{ return counts[k] + " " + k; }});
+    var done = document.getElementById("done");
+    document.getElementById("progress").textContent =
+        rows.length + " tests: " + (parts.join(", ") || "none yet") + (done ? " (finished, " + done.dataset.elapsed + "s)" : " (running)");
+    return done;
+}}
+document.addEventListener("DOMContentLoaded", function () {{
+    window.scrollTo(0, Number(sessionStorage.getItem("liveReportScroll") || 0));
+    if (!updateProgress() && refreshSeconds > 0) {{
+        setTimeout(function () {{
+            sessionStorage.setItem("liveReportScroll", window.scrollY);
+            location.reload();
+        }}, refreshSeconds * 1000);
+    }}
+}});
+</script></head><body>
+<h1>Live report</h1><p>Started {started}</p><div id="progress"></div>
+<table><tr><th>#</th><th>Test</th><th>Outcome</th><th>Duration (s)</th><th>Worker</th><th>Retries</th><th>Details</th></tr>
+"""
+
+
+class LiveReport:
+    """
+    Streams test results to an HTML file as the tests finish.
+
+    Every finished test is appended as one table row and flushed to disk, so the
+    report can be opened (and refreshes itself) while the suite is still running.
+    Nothing is kept in memory once a row is written. Screenshots are linked
+    relative to the report, never inlined. Settings are read from the
+    "live_report" section of config.json:
+
+        enabled         -- write the live report.
+        file            -- report path, relative to the reports folder.
+        refresh_seconds -- how often an open report reloads itself (0 to never reload).
+    """
+    def __init__(self, path, refresh_seconds=5):
+        """
+        :param path: Path of the HTML file; an existing file is replaced.
+        :param refresh_seconds: Reload interval of the page while the run is in progress.
+        """
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._started = None
+
+    @classmethod
+    def from_config(cls, reports_root, config_path="config.json"):
+        """
+        Create the report configured in the "live_report" config section.
+
+        :param reports_root: The reports folder.
+        :return: A LiveReport, or None if it is disabled.
+        """
+        settings = get_section("live_report", config_path)
+        if not settings.get("enabled", True):
+            return None
+        return cls(os.path.join(reports_root, settings.get("file", "live_report.html")),
+                   settings.get("refresh_seconds", 5))
+
+    def open(self):
+        """
+        Create the file and write the page header.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._started = time.time()
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(HEADER.format(refresh=self.refresh_seconds, started=time.strftime("%Y-%m-%d %H:%M:%S")))
+        self._file.flush()
+
+    def add(self, nodeid, outcome, duration, worker="", retries=0, message="", step_timings="", screenshots=()):
+        """
+        Append the row of a finished test and flush it to disk.
+
+        :param nodeid: The pytest node id.
+        :param outcome: "passed", "failed", "error", "skipped" or "xfailed".
+        :param duration: Seconds spent in setup, call and teardown.
+        :param worker: pytest-xdist worker id.
+        :param retries: Number of retries the test needed.
+        :param message: Failure or skip message.
+        :param step_timings: Flame-style HTML of the test's spans (see lib.tracing.render_flame).
+        :param screenshots: Paths of the screenshots taken by the test.
+        """
+        links = " ".join(
+            f"<a href=\"{html.escape(self._link(path))}\">{html.escape(os.path.basename(path))}</a>"
+            for path in screenshots
+        )
+        details = ""
+        if message:
+            details += f"<pre>{html.escape(message)}</pre>"
+        if links:
+            details += f"<div>Screenshots: {links}</div>"
+        if step_timings:
+            details += f"<details><summary>Step timings</summary>{step_timings}</details>"
+        with self._lock:
+            if self._file is None:
+                return
+            self.count += 1
+            self._file.write(
+                f"<tr class=\"result {outcome}\" data-outcome=\"{outcome}\"><td>{self.count}</td>"
+                f"<td>{html.escape(nodeid)}</td><td class=\"outcome\">{outcome}</td><td>{duration:.2f}</td>"
+                f"<td>{html.escape(worker)}</td><td>{retries or ''}</td><td>{details}</td></tr>\n"
+            )
+            self._file.flush()
+
+    def close(self):
+        """
+        Finish the page, which stops it from reloading.
+        """
+        with self._lock:
+            if self._file is None:
+                return
+            elapsed = time.time() - self._started
+            self._file.write(f"</table><div id=\"done\" data-elapsed=\"{elapsed:.1f}\"></div></body></html>\n")
+            self._file.close()
+            self._file = None
+
+    def _link(self, path):
+        return os.path.relpath(path, os.path.dirname(os.path.abspath(self.path))).replace(os.sep, "/")
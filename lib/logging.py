@@ -1,36 +1,173 @@
+import atexit  # Stop the listener (and flush the queue) when the interpreter exits
+import json  # JSON-lines output
 import logging # This module provides a simple logging setup for an application.
+import logging.handlers  # Queue and rotating file handlers
+import os  # Per-worker log file names
+import queue  # Hand-off between test threads and the writer thread
+import threading  # Guards the one-time setup
+from datetime import datetime, timezone  # Timestamps for JSON lines
+from lib.artifacts import MAIN_WORKER, get_worker_id  # Worker id for log context
+from lib.config import get_section  # Importing the config section reader
 
-def setup_logger(name="app_logger", log_file="app.log", level=logging.INFO):
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - [%(worker)s %(test_id)s] %(name)s - %(message)s'
+
+_lock = threading.Lock()
+_listener = None
+_context = {"test_id": None}  # Test currently running in this process (set from conftest)
+
+
+class ContextFilter(logging.Filter):
     """
-    Set up a logger that outputs to both the console and a file.
+    Adds the current test id and xdist worker id to every record.
 
-    :param name: The name of the logger.
-    :param log_file: The file where the logs will be stored.
-    :param level: The logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL).
-    :return: A logger instance.
+    Runs on the thread that logs, before the record is queued.
     """
-    # Create a custom logger
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
+    def filter(self, record):
+        record.test_id = _context["test_id"] or "-"
+        record.worker = get_worker_id()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as single-line JSON objects.
+    """
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "test_id": getattr(record, "test_id", None),
+            "worker": getattr(record, "worker", None),
+            "thread": record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def set_log_context(test_id=None):
+    """
+    Set the test id added to log records (None once the test has finished).
+
+    :param test_id: The pytest node id of the running test.
+    """
+    _context["test_id"] = test_id
+
+
+def _log_file_for_worker(log_file):
+    """
+    Give each xdist worker its own file (app.gw0.log, ...) so rotation never races between processes.
+    """
+    worker = get_worker_id()
+    if worker == MAIN_WORKER:
+        return log_file
+    root, extension = os.path.splitext(log_file)
+    return f"{root}.{worker}{extension}"
+
+
+def _build_file_handler(settings, log_file):
+    """
+    Create the rotating file handler described by the "logging" config section.
+    """
+    if settings.get("rotation", "size") == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file,
+            when=settings.get("when", "midnight"),
+            interval=settings.get("interval", 1),
+            backupCount=settings.get("backup_count", 3),
+            delay=True,
+        )
+    return logging.handlers.RotatingFileHandler(
+        log_file,
+        maxBytes=settings.get("max_bytes", 1024 * 1024),
+        backupCount=settings.get("backup_count", 3),
+        delay=True,
+    )
+
+
+def configure_logging(log_file=None, config_path="config.json"):
+    """
+    Route all logging through a queue to a background writer thread. Safe to call repeatedly.
+
+    The log file is only opened when the first record is written.
+
+    Settings are read from the "logging" section of config.json:
+
+        file         -- log file (per-worker suffix under xdist).
+        format       -- "text" or "json" (JSON lines) for the file.
+        rotation     -- "size" (max_bytes) or "time" (when/interval).
+        max_bytes    -- size at which the file is rotated.
+        when         -- rotation interval unit for time-based rotation (e.g. "midnight", "H").
+        interval     -- number of `when` units between rotations.
+        backup_count -- rotated files kept.
+        console      -- also log to the console (off by default; use pytest's log_cli instead).
+        levels       -- logger name -> level, e.g. {"root": "WARNING", "wait_logger": "DEBUG"};
+                        loggers not listed follow the root level.
+
+    :param log_file: Log file to use instead of the configured one.
+    :param config_path: Path to the config file.
+    :return: The QueueListener writing the records.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        settings = get_section("logging", config_path)
+        text_formatter = logging.Formatter(TEXT_FORMAT)
 
-    # Create a formatter to structure the log messages
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        file_handler = _build_file_handler(settings, _log_file_for_worker(log_file or settings.get("file", "app.log")))
+        file_handler.setFormatter(JsonFormatter() if settings.get("format", "text") == "json" else text_formatter)
+        handlers = [file_handler]
+        if settings.get("console", False):
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(text_formatter)
+            handlers.append(console_handler)
 
-    # Create a console handler and set the level to INFO
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
+        # The calling thread only puts records on the queue; the listener thread does the I/O
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+        root = logging.getLogger()
+        root.addHandler(queue_handler)
 
-    # Create a file handler and set the level to INFO
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(formatter)
+        for name, level in settings.get("levels", {"root": "WARNING"}).items():
+            logging.getLogger(None if name == "root" else name).setLevel(level.upper())
 
-    # Add the handlers to the logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        return _listener
 
+
+def setup_logger(name="app_logger", log_file=None, level=None):
+    """
+    Return a logger whose records go to the shared console and log file handlers.
+
+    Calling it again for the same name adds no handlers, so lines are never duplicated.
+
+    :param name: The name of the logger.
+    :param log_file: The file where the logs will be stored (defaults to the configured file;
+                     only used if logging is not configured yet).
+    :param level: The logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL); a level
+                  set for this logger under "logging.levels" in config.json takes precedence,
+                  and without either the logger follows the root level.
+    :return: A logger instance.
+    """
+    configure_logging(log_file)
+    logger = logging.getLogger(name)
+    if level is not None and logger.level == logging.NOTSET:
+        logger.setLevel(level)
     return logger
 
-# You can also directly set up a default logger instance
-default_logger = setup_logger()
+def __getattr__(name):
+    """
+    Create the default logger on first access, so importing this module opens no files.
+    """
+    if name == "default_logger":
+        return setup_logger()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,272 @@
+# lib/network_recorder.py
+import base64  # Response bodies are stored base64-encoded
+import gzip  # Compact on-disk archive
+import hashlib  # Keys for requests with a body
+import json  # Archive entries are JSON lines
+import logging  # Progress and miss reporting
+import os  # OS module for file and directory handling
+import threading  # The interceptor runs on its own thread
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit  # URL normalization
+from lib.config import get_section  # Importing the config section reader
+
+logger = logging.getLogger("network_logger")
+
+MODES = ("live", "record", "replay", "replay_only")
+
+# Headers that no longer describe the body once Chrome has decoded it for us
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class UnrecordedRequestError(Exception):
+    """
+    Raised in replay_only mode when the page requested something that is not in the archive.
+    """
+
+
+class NetworkArchive:
+    """
+    Recorded HTTP responses, stored as gzip-compressed JSON lines.
+    """
+    def __init__(self, path, ignore_query_params=()):
+        """
+        :param path: Path of the archive file (e.g. "recordings/test_search.jsonl.gz").
+        :param ignore_query_params: Query parameters left out of request keys (cache busters, timestamps).
+        """
+        self.path = path
+        self.ignore_query_params = set(ignore_query_params)
+        self.entries = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Read the archive from disk, if it exists.
+
+        :return: self, for chaining.
+        """
+        if os.path.exists(self.path):
+            with gzip.open(self.path, "rt", encoding="utf-8") as archive_file:
+                for line in archive_file:
+                    entry = json.loads(line)
+                    self.entries[entry["key"]] = entry
+        logger.info(f"Loaded {len(self.entries)} recorded responses from {self.path}")
+        return self
+
+    def save(self):
+        """
+        Write the archive to disk.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            entries = list(self.entries.values())
+        with gzip.open(self.path, "wt", encoding="utf-8") as archive_file:
+            for entry in entries:
+                archive_file.write(json.dumps(entry) + "\n")
+        logger.info(f"Saved {len(entries)} recorded responses to {self.path}")
+
+    def key(self, method, url, post_data=None):
+        """
+        Build the lookup key of a request.
+
+        :param method: HTTP method.
+        :param url: Request URL; fragments and ignored query parameters are dropped and the
+                    remaining parameters are sorted, so their order does not matter.
+        :param post_data: Request body, hashed into the key when present.
+        :return: The key string.
+        """
+        parts = urlsplit(url)
+        query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                                 if k not in self.ignore_query_params))
+        key = f"{method} {urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))}"
+        if post_data:
+            key += " " + hashlib.sha1(post_data.encode("utf-8")).hexdigest()
+        return key
+
+    def get(self, key):
+        """
+        Return the recorded entry for a key, or None.
+        """
+        return self.entries.get(key)
+
+    def put(self, key, status, headers, body_b64):
+        """
+        Store a response.
+
+        :param key: Key from `key()`.
+        :param status: HTTP status code.
+        :param headers: List of [name, value] pairs.
+        :param body_b64: Base64-encoded body.
+        """
+        with self._lock:
+            self.entries[key] = {"key": key, "status": status, "headers": headers, "body": body_b64}
+
+
+class NetworkRecorder:
+    """
+    Records or replays the HTTP traffic of a driver session through Chrome DevTools request interception.
+
+    Modes:
+        live        -- no interception.
+        record      -- every response is saved to the archive.
+        replay      -- responses are served from the archive, unrecorded requests go to the network.
+        replay_only -- as replay, but unrecorded requests fail and raise UnrecordedRequestError.
+
+    Settings are read from the "network" section of config.json; the NETWORK_MODE
+    environment variable overrides "mode".
+    """
+    def __init__(self, driver, archive_name, mode=None, config_path="config.json"):
+        """
+        :param driver: WebDriver instance whose page traffic is intercepted.
+        :param archive_name: Archive file name inside "archive_dir" (usually the test name).
+        :param mode: One of MODES (overrides config and NETWORK_MODE).
+        :param config_path: Path to the config file.
+        """
+        settings = get_section("network", config_path)
+        self.driver = driver
+        self.mode = mode or os.environ.get("NETWORK_MODE") or settings.get("mode", "live")
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown network mode: {self.mode}")
+        self.skip_resource_types = set(settings.get("skip_resource_types", []))
+        self.max_body_bytes = settings.get("max_body_bytes", 5 * 1024 * 1024)
+        self.archive = NetworkArchive(
+            os.path.join(settings.get("archive_dir", "recordings"), f"{archive_name}.jsonl.gz"),
+            settings.get("ignore_query_params", []),
+        )
+        self.misses = []
+        self.served = 0
+        self._ready = threading.Event()
+        self._thread = None
+        self._trio_token = None
+        self._cancel_scope = None
+        self._error = None
+
+    @property
+    def active(self):
+        """
+        True when the recorder intercepts traffic (any mode but "live").
+        """
+        return self.mode != "live"
+
+    def start(self):
+        """
+        Start intercepting on a background thread and wait until interception is enabled.
+        """
+        if not self.active:
+            return
+        if self.mode != "record":
+            self.archive.load()
+        self.driver.network_recorder = self  # Lets the wait engine fail fast on misses
+        self._thread = threading.Thread(target=self._run, name="network-recorder", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=30)
+        if self._error is not None:
+            raise self._error
+
+    def stop(self):
+        """
+        Stop intercepting and, in record mode, write the archive.
+        """
+        if self._thread is None:
+            return
+        import trio  # Selenium's CDP client runs on trio
+
+        if self._trio_token is not None:
+            try:
+                trio.from_thread.run_sync(self._cancel_scope.cancel, trio_token=self._trio_token)
+            except trio.RunFinishedError:
+                pass
+        self._thread.join(timeout=10)
+        self._thread = None
+        self.driver.network_recorder = None
+        if self.mode == "record":
+            self.archive.save()
+        elif self.active:
+            logger.info(f"Served {self.served} responses from {self.archive.path}, {len(self.misses)} misses")
+
+    def raise_for_misses(self):
+        """
+        Raise UnrecordedRequestError if, in replay_only mode, any request was not in the archive.
+        """
+        if self.mode == "replay_only" and self.misses:
+            raise UnrecordedRequestError(
+                f"{len(self.misses)} request(s) not recorded in {self.archive.path}, first: {self.misses[0]}"
+            )
+
+    def _run(self):
+        """
+        Thread entry point running the trio event loop.
+        """
+        import trio  # Selenium's CDP client runs on trio
+
+        try:
+            trio.run(self._intercept)
+        except Exception as e:
+            logger.error(f"Network interception stopped: {e}")
+            self._error = e
+        finally:
+            self._ready.set()
+
+    async def _intercept(self):
+        """
+        Enable Fetch interception and handle paused requests until cancelled.
+        """
+        import trio  # Selenium's CDP client runs on trio
+
+        async with self.driver.bidi_connection() as connection:
+            session, devtools = connection.session, connection.devtools
+            stage = devtools.fetch.RequestStage.RESPONSE if self.mode == "record" else devtools.fetch.RequestStage.REQUEST
+            events = session.listen(devtools.fetch.RequestPaused, buffer_size=256)
+            await session.execute(devtools.fetch.enable(
+                patterns=[devtools.fetch.RequestPattern(url_pattern="*", request_stage=stage)]
+            ))
+            with trio.CancelScope() as cancel_scope:
+                self._cancel_scope = cancel_scope
+                self._trio_token = trio.lowlevel.current_trio_token()
+                self._ready.set()
+                async with trio.open_nursery() as nursery:
+                    async for event in events:
+                        handler = self._record if self.mode == "record" else self._replay
+                        nursery.start_soon(handler, session, devtools, event)
+
+    async def _record(self, session, devtools, event):
+        """
+        Save a response paused at the response stage, then let it through.
+        """
+        request = event.request
+        try:
+            if event.response_status_code is not None and event.resource_type.value not in self.skip_resource_types:
+                headers = [[h.name, h.value] for h in (event.response_headers or [])
+                           if h.name.lower() not in DROPPED_HEADERS]
+                body_b64 = ""
+                if not 300 <= event.response_status_code < 400:  # Redirects have no body
+                    body, is_base64 = await session.execute(devtools.fetch.get_response_body(event.request_id))
+                    body_b64 = body if is_base64 else base64.b64encode(body.encode("utf-8")).decode("ascii")
+                if len(body_b64) * 3 // 4 <= self.max_body_bytes:
+                    key = self.archive.key(request.method, request.url, request.post_data)
+                    self.archive.put(key, event.response_status_code, headers, body_b64)
+        except Exception as e:
+            logger.warning(f"Could not record {request.url}: {e}")
+        await session.execute(devtools.fetch.continue_request(event.request_id))
+
+    async def _replay(self, session, devtools, event):
+        """
+        Answer a request paused at the request stage from the archive.
+        """
+        request = event.request
+        entry = self.archive.get(self.archive.key(request.method, request.url, request.post_data))
+        if entry is not None:
+            self.served += 1
+            await session.execute(devtools.fetch.fulfill_request(
+                event.request_id,
+                entry["status"],
+                response_headers=[devtools.fetch.HeaderEntry(name=n, value=v) for n, v in entry["headers"]],
+                body=entry["body"],
+            ))
+        elif self.mode == "replay_only":
+            self.misses.append(f"{request.method} {request.url}")
+            logger.error(f"Unrecorded request in replay_only mode: {request.method} {request.url}")
+            await session.execute(devtools.fetch.fail_request(
+                event.request_id, devtools.network.ErrorReason.BLOCKED_BY_CLIENT
+            ))
+        else:
+            self.misses.append(f"{request.method} {request.url}")
+            await session.execute(devtools.fetch.continue_request(event.request_id))
@@ -0,0 +1,210 @@
+# lib/page_metrics.py
+import argparse  # Command line interface for showing trends
+import json  # Metrics are stored as JSON
+import logging  # Persistence output
+import os  # OS module for file and directory handling
+import time  # Timestamps of metric records
+from driver.cdp_transport import run_script  # Data-only scripts over the DevTools socket when available
+from lib.adaptive_timeouts import percentile  # Medians of the stored runs
+from lib.artifacts import artifact_dir, get_worker_id, read_worker_jsonl  # Per-worker metric records
+from lib.config import get_section  # Importing the config section reader
+
+logger = logging.getLogger("metrics_logger")
+
+METRICS_FILE = "page_metrics.jsonl"
+
+# Navigation Timing, Largest Contentful Paint, long tasks, JS heap and transferred bytes
+# of the current document, in one round trip. Buffered observers hand over the entries
+# recorded so far through takeRecords(), so nothing has to be installed before the page loads.
+# transferSize is 0 for cross-origin resources without Timing-Allow-Origin, so byte counts
+# are a lower bound. When the SPA has moved to another URL since the document loaded, the
+# load and paint metrics describe that earlier page and are returned as null.
+COLLECT_SCRIPT = """
+var buffered = function (type) {
+    if (!window.PerformanceObserver || PerformanceObserver.supportedEntryTypes.indexOf(type) === -1) { return []; }
+    var observer = new PerformanceObserver(function () {});
+    observer.observe({type: type, buffered: true});
+    var entries = observer.takeRecords();
+    observer.disconnect();
+    return entries;
+};
+var nav = performance.getEntriesByType('navigation')[0];
+var softNavigation = !!nav && nav.name.split('#')[0] !== location.href.split('#')[0];
+var documentMetric = function (value) { return softNavigation ? null : value; };
+var resources = performance.getEntriesByType('resource');
+var lcp = buffered('largest-contentful-paint');
+var longTasks = buffered('longtask');
+var paints = performance.getEntriesByType('paint');
+var fcp = paints.filter(function (p) { return p.name === 'first-contentful-paint'; })[0];
+var transfer = nav ? nav.transferSize || 0 : 0, decoded = nav ? nav.decodedBodySize || 0 : 0;
+resources.forEach(function (r) { transfer += r.transferSize || 0; decoded += r.decodedBodySize || 0; });
+var longTaskTotal = 0, blocking = 0;
+longTasks.forEach(function (t) { longTaskTotal += t.duration; blocking += Math.max(0, t.duration - 50); });
+return {
+    url: location.href,
+    page_age_ms: performance.now(),
+    soft_navigation: softNavigation,
+    ttfb_ms: documentMetric(nav ? nav.responseStart - nav.requestStart : null),
+    dom_content_loaded_ms: documentMetric(nav ? nav.domContentLoadedEventEnd : null),
+    load_ms: documentMetric(nav ? nav.loadEventEnd : null),
+    fcp_ms: documentMetric(fcp ? fcp.startTime : null),
+    lcp_ms: documentMetric(lcp.length ? lcp[lcp.length - 1].startTime : null),
+    long_tasks: longTasks.length,
+    long_task_ms: longTaskTotal,
+    total_blocking_ms: blocking,
+    js_heap_bytes: performance.memory ? performance.memory.usedJSHeapSize : null,
+    resource_count: resources.length,
+    transfer_bytes: transfer,
+    decoded_bytes: decoded
+};
+"""
+
+
+def collect(driver):
+    """
+    Collect the performance metrics of the page currently loaded in the browser.
+
+    Load and paint metrics (ttfb_ms, dom_content_loaded_ms, load_ms, fcp_ms, lcp_ms)
+    belong to the document load. A view reached by SPA navigation (a click that
+    changes the URL without loading a new document, like the search -> player flow)
+    has no load of its own, so for it they are None and soft_navigation is True.
+    Long tasks, transferred bytes and the JS heap still cover the whole document
+    lifetime; time the view itself in the page object (e.g. player_visible_ms).
+
+    :param driver: WebDriver instance.
+    :return: Dict of metric name -> value (times in ms since navigation start, sizes in bytes).
+    """
+    metrics = run_script(driver, COLLECT_SCRIPT, idempotent=True)
+    return {name: round(value, 1) if isinstance(value, float) else value for name, value in metrics.items()}
+
+
+def budget_violations(metrics, budgets):
+    """
+    Compare metrics with their budgets.
+
+    :param metrics: Dict of metric name -> value.
+    :param budgets: Dict of metric name -> maximum allowed value.
+    :return: List of messages, one per metric over its budget (missing metrics are reported too).
+    """
+    violations = []
+    for name, limit in sorted(budgets.items()):
+        value = metrics.get(name)
+        if value is None:
+            violations.append(f"{name} was not measured (budget {limit})")
+        elif value > limit:
+            violations.append(f"{name} = {value} exceeds budget {limit}")
+    return violations
+
+
+class PageMetrics:
+    """
+    Stores page performance metrics per run, so regressions show up as trends.
+
+    Every collection is appended to <reports>/<worker>/page_metrics.jsonl; at the end
+    of the session the median of each metric per label is added to the history file.
+    Settings are read from the "page_metrics" section of config.json:
+
+        history_file -- where the per-run medians are kept.
+        max_runs     -- runs kept per label.
+        budgets      -- label -> {metric: maximum}, used by ExpectationHandler.assert_performance_budget.
+    """
+    _settings = None
+
+    @classmethod
+    def settings(cls):
+        """
+        Return the "page_metrics" config section, read once.
+        """
+        if cls._settings is None:
+            cls._settings = get_section("page_metrics")
+        return cls._settings
+
+    @classmethod
+    def budgets(cls, label):
+        """
+        Return the configured budgets of a label, e.g. "player".
+        """
+        return cls.settings().get("budgets", {}).get(label, {})
+
+    @staticmethod
+    def record(label, metrics, test_id=None):
+        """
+        Append a collection to this worker's page_metrics.jsonl.
+
+        :param label: Name of the page or state the metrics describe, e.g. "player".
+        :param metrics: Dict of metric name -> value.
+        :param test_id: The test that collected them.
+        """
+        record = {"label": label, "test": test_id, "worker": get_worker_id(), "time": time.time(), "metrics": metrics}
+        with open(os.path.join(artifact_dir("reports"), METRICS_FILE), "a") as metrics_file:
+            metrics_file.write(json.dumps(record) + "\n")
+
+    @classmethod
+    def history(cls):
+        """
+        Return the stored runs, label -> list of {"time", "samples", "metrics"} (oldest first).
+        """
+        try:
+            with open(cls.settings().get("history_file", ".cache/page_metrics.json")) as history_file:
+                return json.load(history_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable page metrics history: {e}")
+            return {}
+
+    @classmethod
+    def update_history(cls):
+        """
+        Add the medians of this session's collections to the history file. Called once per session.
+
+        :return: Label -> medians of this session.
+        """
+        records = read_worker_jsonl("reports", METRICS_FILE)
+        if not records:
+            return {}
+        by_label = {}
+        for record in records:
+            for name, value in record["metrics"].items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    by_label.setdefault(record["label"], {}).setdefault(name, []).append(value)
+        medians = {
+            label: {name: round(percentile(values, 50), 1) for name, values in sorted(metrics.items())}
+            for label, metrics in by_label.items()
+        }
+        settings = cls.settings()
+        path = settings.get("history_file", ".cache/page_metrics.json")
+        history = cls.history()
+        now = time.time()
+        for label, metrics in medians.items():
+            runs = history.setdefault(label, [])
+            samples = sum(record["label"] == label for record in records)
+            runs.append({"time": now, "samples": samples, "metrics": metrics})
+            del runs[:-settings.get("max_runs", 50)]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as history_file:
+            json.dump(history, history_file, indent=1, sort_keys=True)
+        return medians
+
+
+def main():
+    """
+    Print the stored page metrics per label, one row per run: python -m lib.page_metrics [--last N]
+    """
+    parser = argparse.ArgumentParser(description="Show page performance metrics over recent runs.")
+    parser.add_argument("--last", type=int, default=10, help="Number of recent runs to show")
+    parser.add_argument("--metrics", default="lcp_ms,player_visible_ms,total_blocking_ms,transfer_bytes,js_heap_bytes",
+                        help="Comma separated metrics to show")
+    args = parser.parse_args()
+    names = args.metrics.split(",")
+    for label, runs in sorted(PageMetrics.history().items()):
+        print(f"\n{label}")
+        print(f"{'run':19} " + " ".join(f"{name:>18}" for name in names))
+        for run in runs[-args.last:]:
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["time"]))
+            print(f"{started:19} " + " ".join(f"{str(run['metrics'].get(name, '-')):>18}" for name in names))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
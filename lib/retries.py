@@ -0,0 +1,189 @@
+# lib/retries.py
+import functools  # Preserving wrapped function metadata
+import json  # History is stored as JSON
+import logging  # Retry output
+import os  # OS module for file and directory handling
+import time  # Timestamps of run records
+from selenium.common.exceptions import (  # Selenium errors, grouped by failure kind below
+    InvalidSessionIdException, NoSuchWindowException, SessionNotCreatedException, TimeoutException, WebDriverException,
+)
+from lib.artifacts import artifact_dir, read_worker_jsonl  # Per-worker run records
+from lib.config import get_section  # Importing the config section reader
+from lib.network_recorder import UnrecordedRequestError  # Replay misses are never worth retrying
+from lib.tracing import Tracer  # Step retries are recorded on the open span
+
+logger = logging.getLogger("retry_logger")
+
+RUNS_FILE = "test_runs.jsonl"
+
+FAILURE_KINDS = ("timeout", "assertion", "webdriver_crash", "webdriver", "replay_miss", "error")
+
+# Messages of WebDriverExceptions raised when the browser or chromedriver went away
+CRASH_MESSAGES = ("disconnected", "crashed", "not reachable", "target window already closed", "session deleted")
+
+
+def classify_failure(exception):
+    """
+    Sort an exception into one of FAILURE_KINDS.
+
+    :param exception: The exception a test or step raised.
+    :return: "timeout", "assertion", "webdriver_crash", "webdriver", "replay_miss" or "error".
+    """
+    if isinstance(exception, TimeoutException):
+        return "timeout"
+    if isinstance(exception, AssertionError):
+        return "assertion"
+    if isinstance(exception, UnrecordedRequestError):
+        return "replay_miss"
+    if isinstance(exception, (InvalidSessionIdException, NoSuchWindowException, SessionNotCreatedException, ConnectionError)):
+        return "webdriver_crash"
+    if isinstance(exception, WebDriverException):
+        message = (exception.msg or "").lower()
+        return "webdriver_crash" if any(m in message for m in CRASH_MESSAGES) else "webdriver"
+    if type(exception).__module__.startswith("urllib3"):  # chromedriver stopped answering
+        return "webdriver_crash"
+    return "error"
+
+
+class FlakinessTracker:
+    """
+    Keeps a persisted history of test outcomes and decides which tests are quarantined.
+
+    A run is "passed" (first attempt), "flaky" (passed after retries) or "failed".
+    The flakiness score of a test is the share of its recent runs that did not pass
+    on the first attempt, counted only for tests that passed at least once in that
+    window, so a consistently broken test is reported as failing, not as flaky.
+    Settings are read from the "retries" section of config.json:
+
+        max_retries          -- extra attempts for a failing test.
+        retry_on             -- failure kinds that are retried (assertions are deterministic).
+        step_retries         -- extra attempts for steps decorated with retry_step.
+        history_file         -- where run outcomes are kept between runs.
+        window               -- recent runs the score is computed over.
+        min_runs             -- runs needed before a test can be quarantined.
+        quarantine_threshold -- score at which a test is quarantined.
+        quarantine           -- node ids that are always quarantined.
+    """
+    _history = None
+    _settings = None
+
+    @classmethod
+    def settings(cls):
+        """
+        Return the "retries" config section, read once.
+        """
+        if cls._settings is None:
+            cls._settings = get_section("retries")
+        return cls._settings
+
+    @classmethod
+    def history(cls):
+        """
+        Return the stored outcomes, node id -> list of run records, read once.
+        """
+        if cls._history is None:
+            try:
+                with open(cls.settings().get("history_file", ".cache/flakiness.json")) as history_file:
+                    cls._history = json.load(history_file)
+            except (FileNotFoundError, json.JSONDecodeError):
+                cls._history = {}
+        return cls._history
+
+    @classmethod
+    def should_retry(cls, kind, attempt):
+        """
+        Decide whether a test that failed with `kind` gets another attempt.
+
+        :param kind: Failure kind from classify_failure.
+        :param attempt: Number of retries already made.
+        """
+        settings = cls.settings()
+        return attempt < settings.get("max_retries", 2) and kind in settings.get("retry_on", ["timeout", "webdriver_crash"])
+
+    @classmethod
+    def score(cls, nodeid):
+        """
+        Return the flakiness score (0-1) of a test from its stored history.
+        """
+        runs = cls.history().get(nodeid, [])[-cls.settings().get("window", 20):]
+        if not any(run["outcome"] in ("passed", "flaky") for run in runs):
+            return 0.0
+        return sum(run["outcome"] != "passed" for run in runs) / len(runs)
+
+    @classmethod
+    def quarantine_reason(cls, nodeid):
+        """
+        Return why a test is quarantined, or None if it is not.
+        """
+        settings = cls.settings()
+        if nodeid in settings.get("quarantine", []):
+            return "quarantined in config.json"
+        runs = len(cls.history().get(nodeid, []))
+        score = cls.score(nodeid)
+        if runs >= settings.get("min_runs", 5) and score >= settings.get("quarantine_threshold", 0.3):
+            return f"quarantined as flaky (score {score:.2f} over the last {min(runs, settings.get('window', 20))} runs)"
+        return None
+
+    @staticmethod
+    def record(nodeid, outcome, retries, kinds):
+        """
+        Append a run record to this worker's test_runs.jsonl.
+
+        :param nodeid: The pytest node id.
+        :param outcome: "passed", "flaky" or "failed".
+        :param retries: Number of retries the test needed.
+        :param kinds: Failure kinds of the failed attempts, in order.
+        """
+        record = {"nodeid": nodeid, "outcome": outcome, "retries": retries, "kinds": kinds, "time": time.time()}
+        with open(os.path.join(artifact_dir("reports"), RUNS_FILE), "a") as runs_file:
+            runs_file.write(json.dumps(record) + "\n")
+
+    @classmethod
+    def update_history(cls):
+        """
+        Fold the run records of all workers into the history file. Called once per session.
+
+        :return: The run records of this session.
+        """
+        runs = read_worker_jsonl("reports", RUNS_FILE)
+        if not runs:
+            return runs
+        settings = cls.settings()
+        path = settings.get("history_file", ".cache/flakiness.json")
+        cls._history = None  # Re-read in case another session saved meanwhile
+        history = cls.history()
+        for run in runs:
+            entries = history.setdefault(run["nodeid"], [])
+            entries.append({"outcome": run["outcome"], "kinds": run["kinds"], "time": run["time"]})
+            del entries[:-settings.get("window", 20)]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as history_file:
+            json.dump(history, history_file, indent=1, sort_keys=True)
+        return runs
+
+
+def retry_step(retries=None, on=("timeout", "webdriver")):
+    """
+    Decorator re-running a single page step when it fails with a retryable kind.
+
+    Only the step is repeated, on the same driver and page. Retries are added to
+    the open span as "step_retries", so they show up in the report.
+
+    :param retries: Extra attempts (defaults to "step_retries" from the "retries" config section).
+    :param on: Failure kinds that are retried.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            attempts = retries if retries is not None else FlakinessTracker.settings().get("step_retries", 1)
+            for attempt in range(attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    kind = classify_failure(e)
+                    if attempt >= attempts or kind not in on:
+                        raise
+                    Tracer.annotate(step_retries=attempt + 1)
+                    logger.warning(f"{func.__qualname__} failed ({kind}), retrying: {e}")
+        return wrapper
+    return decorator
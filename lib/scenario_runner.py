@@ -0,0 +1,118 @@
+# lib/scenario_runner.py
+import logging  # Progress output for scenarios
+import threading  # Per-scenario timeout timers
+import time  # Wall-clock measurement
+from concurrent.futures import ThreadPoolExecutor  # Bounded concurrency
+from lib.config import get_section  # Importing the config section reader
+
+logger = logging.getLogger("scenario_logger")
+
+
+class ScenarioResult:
+    """
+    Outcome of a single scenario run by the ScenarioRunner.
+    """
+    def __init__(self, name, passed, elapsed, value=None, error=None, timed_out=False):
+        self.name = name
+        self.passed = passed
+        self.elapsed = elapsed
+        self.value = value
+        self.error = error
+        self.timed_out = timed_out
+
+    def __repr__(self):
+        status = "timed out" if self.timed_out else ("passed" if self.passed else "failed")
+        return f"<ScenarioResult {self.name}: {status} in {self.elapsed:.2f}s>"
+
+
+class ScenarioRunner:
+    """
+    Runs many scenarios concurrently, each on its own pooled driver session.
+
+    A scenario is a callable that takes a WebDriver and drives the page objects.
+    Settings are read from the "scenario_runner" section of config.json:
+
+        max_concurrency -- scenarios running at the same time (defaults to the pool size).
+        timeout         -- seconds a single scenario may run before its browser is quit.
+    """
+    def __init__(self, pool, max_concurrency=None, timeout=None, mobile=True, config_path="config.json"):
+        """
+        Initialize the runner.
+
+        :param pool: DriverPool the sessions are taken from.
+        :param max_concurrency: Maximum scenarios running at once (overrides config).
+        :param timeout: Per-scenario timeout in seconds (overrides config).
+        :param mobile: Run the scenarios with mobile emulation.
+        :param config_path: Path to the config file.
+        """
+        settings = get_section("scenario_runner", config_path)
+        self.pool = pool
+        self.max_concurrency = min(max_concurrency or settings.get("max_concurrency", pool.size), pool.size)
+        self.timeout = timeout or settings.get("timeout", 120)
+        self.mobile = mobile
+        self.wall_time = None
+
+    def run(self, scenarios):
+        """
+        Run the scenarios and wait for all of them to finish.
+
+        Wall-clock time is that of the slowest batch of scenarios rather than the sum.
+
+        :param scenarios: Dict of name -> callable(driver), or a list of (name, callable) pairs.
+        :return: List of ScenarioResult, in the order the scenarios were given.
+        """
+        scenarios = list(scenarios.items()) if isinstance(scenarios, dict) else list(scenarios)
+        started = time.perf_counter()
+        # Start the browsers in parallel before the scenarios need them
+        self.pool.warm(mobile=self.mobile, count=min(self.max_concurrency, len(scenarios)))
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="scenario") as executor:
+            futures = [executor.submit(self._run_one, name, scenario) for name, scenario in scenarios]
+            results = [future.result() for future in futures]
+        self.wall_time = time.perf_counter() - started
+        logger.info(self.summary(results))
+        return results
+
+    def summary(self, results):
+        """
+        Aggregate results into a single line.
+
+        :param results: List of ScenarioResult returned by `run`.
+        :return: Summary string with pass/fail counts and timings.
+        """
+        passed = sum(1 for r in results if r.passed)
+        total_time = sum(r.elapsed for r in results)
+        slowest = max((r.elapsed for r in results), default=0)
+        wall_time = self.wall_time if self.wall_time is not None else 0
+        return (f"{passed}/{len(results)} scenarios passed - wall time {wall_time:.2f}s, "
+                f"slowest {slowest:.2f}s, sum of scenario times {total_time:.2f}s")
+
+    def _run_one(self, name, scenario):
+        """
+        Run one scenario on a pooled driver, quitting the browser if it exceeds the timeout.
+        """
+        driver = self.pool.acquire(mobile=self.mobile)
+        timed_out = threading.Event()
+
+        def on_timeout():
+            timed_out.set()
+            logger.warning(f"Scenario {name} exceeded {self.timeout}s, quitting its browser.")
+            try:
+                driver.quit()  # Makes the scenario's next WebDriver command fail
+            except Exception as e:
+                logger.warning(f"Error while quitting timed out browser: {e}")
+
+        timer = threading.Timer(self.timeout, on_timeout)
+        started = time.perf_counter()
+        timer.start()
+        try:
+            value = scenario(driver)
+            result = ScenarioResult(name, not timed_out.is_set(), time.perf_counter() - started, value=value,
+                                    timed_out=timed_out.is_set())
+        except Exception as e:
+            result = ScenarioResult(name, False, time.perf_counter() - started, error=e,
+                                    timed_out=timed_out.is_set())
+        finally:
+            timer.cancel()
+            self.pool.release(driver)  # A quit browser fails its reset and is recycled by the pool
+        logger.info(f"Scenario {result!r}")
+        return result
@@ -0,0 +1,177 @@
+# lib/screenshot_pipeline.py
+import atexit  # Flush pending writes when the interpreter exits
+import base64  # Screenshots arrive base64-encoded from the browser
+import hashlib  # Content hashes for de-duplication
+import itertools  # Sequence numbers for collision-free names
+import logging  # Pipeline output
+import os  # OS module for file and directory handling
+import threading  # Guards the shared pipeline state
+from concurrent.futures import ThreadPoolExecutor, wait  # Background writer
+from datetime import datetime  # Date and time utilities
+from driver.cdp_transport import cdp_command  # DevTools commands over the websocket when available
+from lib.artifacts import artifact_dir  # Per-worker artifact folders
+from lib.config import get_section  # Importing the config section reader
+
+logger = logging.getLogger("screenshot_logger")
+
+# Formats Chrome can encode itself (Page.captureScreenshot)
+FORMATS = ("png", "jpeg", "webp")
+
+# Page coordinates of an element, for clipped captures
+ELEMENT_CLIP_SCRIPT = """
+var rect = arguments[0].getBoundingClientRect();
+return {x: rect.left + window.scrollX, y: rect.top + window.scrollY, width: rect.width, height: rect.height};
+"""
+
+
+class ScreenshotPipeline:
+    """
+    Captures screenshots on the test thread and decodes, de-duplicates and writes them in the background.
+
+    Settings are read from the "screenshot_pipeline" section of config.json:
+
+        format  -- default image format: "png", "jpeg" or "webp" (lossy formats are encoded by Chrome).
+        quality -- quality (0-100) for jpeg/webp.
+        workers -- number of background writer threads.
+        dedupe  -- skip writing frames identical to one already written.
+    """
+    _lock = threading.Lock()
+    _executor = None
+    _pending = set()
+    _hashes = {}  # content hash -> path of the file holding that content
+    _aliases = {}  # requested path -> path actually written (differs for duplicates)
+    _captures = []  # paths captured since the last take_captures call
+    _sequence = itertools.count()
+    _settings = None
+
+    @classmethod
+    def settings(cls):
+        """
+        Return the "screenshot_pipeline" config section, read once.
+        """
+        if cls._settings is None:
+            cls._settings = get_section("screenshot_pipeline")
+        return cls._settings
+
+    @classmethod
+    def capture(cls, driver, name="screenshot", element=None, clip=None, image_format=None, quality=None):
+        """
+        Capture a screenshot and queue it for writing.
+
+        Only the capture itself runs on the calling thread.
+
+        :param driver: WebDriver instance to capture.
+        :param name: Base name of the file.
+        :param element: Optional WebElement; only that element is captured.
+        :param clip: Optional dict with x, y, width, height (CSS pixels, page coordinates) to capture.
+        :param image_format: "png", "jpeg" or "webp" (defaults to the configured format).
+        :param quality: Quality for jpeg/webp (defaults to the configured quality).
+        :return: Path the screenshot will be written to; pass it to `resolve` to get the
+                 final path once duplicates have been folded.
+        """
+        settings = cls.settings()
+        image_format = image_format or settings.get("format", "png")
+        if image_format not in FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {image_format}")
+
+        if element is not None:
+            clip = driver.execute_script(ELEMENT_CLIP_SCRIPT, element)
+
+        if clip is None and image_format == "png" and getattr(driver, "cdp", None) is None:
+            payload = driver.get_screenshot_as_base64()
+        else:
+            params = {"format": image_format}
+            if image_format != "png":
+                params["quality"] = quality or settings.get("quality", 80)
+            if clip is not None:
+                params["clip"] = dict(clip, scale=1)
+                params["captureBeyondViewport"] = True
+            payload = cdp_command(driver, "Page.captureScreenshot", params, idempotent=True)["data"]
+
+        # Microseconds plus a sequence number keep names unique within and across threads
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        extension = "jpg" if image_format == "jpeg" else image_format
+        filename = f"{name}_{timestamp}_{next(cls._sequence):04d}.{extension}"
+        path = os.path.join(artifact_dir("screenshots"), filename)
+
+        future = cls._get_executor().submit(cls._write, payload, path)
+        with cls._lock:
+            cls._pending.add(future)
+            cls._captures.append(path)
+        future.add_done_callback(cls._discard_pending)
+        return path
+
+    @classmethod
+    def resolve(cls, path):
+        """
+        Wait for pending writes and return the file that holds the screenshot.
+
+        :param path: Path returned by `capture`.
+        :return: The path of the written file (an earlier identical frame for duplicates).
+        """
+        cls.flush()
+        with cls._lock:
+            return cls._aliases.get(path, path)
+
+    @classmethod
+    def take_captures(cls):
+        """
+        Return the files of the screenshots captured since the last call, e.g. by one test.
+
+        Waits for pending writes, like `resolve`.
+        """
+        with cls._lock:
+            captures, cls._captures = cls._captures, []
+        if captures:
+            cls.flush()
+        with cls._lock:
+            return list(dict.fromkeys(cls._aliases.get(path, path) for path in captures))
+
+    @classmethod
+    def flush(cls):
+        """
+        Block until every queued screenshot has been written.
+        """
+        with cls._lock:
+            pending = list(cls._pending)
+        if pending:
+            wait(pending)
+
+    @classmethod
+    def _get_executor(cls):
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=cls.settings().get("workers", 1), thread_name_prefix="screenshot"
+                )
+            return cls._executor
+
+    @classmethod
+    def _discard_pending(cls, future):
+        with cls._lock:
+            cls._pending.discard(future)
+
+    @classmethod
+    def _write(cls, payload, path):
+        """
+        Decode a payload and write it, unless an identical frame was already written.
+        """
+        data = base64.b64decode(payload)
+        if cls.settings().get("dedupe", True):
+            digest = hashlib.sha256(data).hexdigest()
+            with cls._lock:
+                existing = cls._hashes.get(digest)
+                if existing is None:
+                    cls._hashes[digest] = path
+                else:
+                    cls._aliases[path] = existing
+            if existing is not None:
+                logger.info(f"Screenshot {path} is identical to {existing}, not written again.")
+                return existing
+        with open(path, "wb") as screenshot_file:
+            screenshot_file.write(data)
+        logger.info(f"Screenshot saved to {path}")
+        return path
+
+
+atexit.register(ScreenshotPipeline.flush)
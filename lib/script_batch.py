@@ -0,0 +1,124 @@
+# lib/script_batch.py
+from selenium.common.exceptions import JavascriptException  # Raised when a batched snippet throws
+from lib.dom_scripts import DOM_HELPERS  # In-page locator helpers
+
+
+class ScriptBatch:
+    """
+    Collects JavaScript snippets and runs them all in a single execute_script call.
+
+    Each snippet is a function body that receives its own arguments; the batch
+    returns a list with the value returned by every snippet, in order. A snippet
+    that throws does not stop the ones after it; the batch raises JavascriptException
+    once all of them have run.
+
+    Usage:
+        with page.batch() as batch:
+            batch.scroll_by(200)
+            texts = batch.read_texts((By.CLASS_NAME, "tw-image"))
+        print(batch.results[texts])
+    """
+    def __init__(self, driver):
+        """
+        Initialize an empty batch for a WebDriver instance.
+
+        :param driver: WebDriver instance used to run the batch.
+        """
+        self.driver = driver
+        self.snippets = []
+        self.arguments = []
+        self.results = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+        return False
+
+    def add(self, snippet, *args):
+        """
+        Queue a snippet. Its arguments are available as `arguments[0..n]` inside it.
+
+        :param snippet: JavaScript function body; may use the dom_scripts helpers.
+        :param args: Arguments for the snippet (WebElements, strings, numbers, lists).
+        :return: Index of the snippet's result in `results`.
+        """
+        self.snippets.append(snippet)
+        self.arguments.append(list(args))
+        return len(self.snippets) - 1
+
+    def scroll_by(self, pixels):
+        """
+        Queue a vertical scroll by the given number of pixels.
+        """
+        return self.add("window.scrollBy(0, arguments[0]);", pixels)
+
+    def scroll_into_view(self, element):
+        """
+        Queue scrolling an element into view.
+        """
+        return self.add("arguments[0].scrollIntoView(true);", element)
+
+    def click(self, element):
+        """
+        Queue a JavaScript click on an element.
+        """
+        return self.add("arguments[0].click();", element)
+
+    def read_texts(self, locator):
+        """
+        Queue reading the visible text of every element matching the locator.
+        """
+        return self.add(
+            "return __find(arguments[0], arguments[1]).map(function (el) { return el.innerText; });",
+            *locator
+        )
+
+    def read_attributes(self, locator, names):
+        """
+        Queue reading the given attributes of every element matching the locator.
+        """
+        return self.add(
+            "var names = arguments[2];"
+            "return __find(arguments[0], arguments[1]).map(function (el) {"
+            "    var values = {};"
+            "    names.forEach(function (name) { values[name] = el.getAttribute(name); });"
+            "    return values;"
+            "});",
+            locator[0], locator[1], list(names)
+        )
+
+    def build_script(self):
+        """
+        Build the single script that runs every queued snippet.
+
+        Each snippet's outcome is returned as {value: ...} or, if it threw, {error: "message"}.
+
+        :return: The JavaScript source.
+        """
+        calls = "".join(
+            f"try {{ results.push({{value: (function () {{ {snippet} }}).apply(null, calls[{index}])}}); }}"
+            f" catch (e) {{ results.push({{error: String(e && e.message || e)}}); }}\n"
+            for index, snippet in enumerate(self.snippets)
+        )
+        return DOM_HELPERS + "var calls = arguments[0], results = [];\n" + calls + "return results;"
+
+    def execute(self):
+        """
+        Run all queued snippets in one round trip.
+
+        :return: List of the snippets' return values.
+        :raises JavascriptException: If a snippet threw; `results` still holds the other values (None for it).
+        """
+        if not self.snippets:
+            self.results = []
+            return self.results
+        outcomes = self.driver.execute_script(self.build_script(), self.arguments)
+        self.results = [outcome.get("value") for outcome in outcomes]
+        errors = [(index, outcome["error"]) for index, outcome in enumerate(outcomes) if "error" in outcome]
+        if errors:
+            index, message = errors[0]
+            raise JavascriptException(f"Batched snippet #{index} failed: {message} ({self.snippets[index]})")
+        return self.results
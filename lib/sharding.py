@@ -0,0 +1,202 @@
+# lib/sharding.py
+import argparse  # Command line interface for merging shard results
+import html  # Escaping test ids in the merged report
+import json  # Durations and shard results are stored as JSON
+import os  # OS module for file and directory handling
+from lib.config import get_section  # Importing the config section reader
+
+# Results of one shard, written next to the HTML report by the controller process
+RESULTS_FILE = "shard_results.json"
+
+
+def durations_path(config_path="config.json"):
+    """
+    Return the path of the durations file from the "sharding" config section.
+    """
+    return get_section("sharding", config_path).get("durations_file", ".test_durations.json")
+
+
+def load_durations(path=None):
+    """
+    Read the durations file.
+
+    :param path: Durations file (defaults to the configured one).
+    :return: Dict with "tests" (node id -> seconds) and "driver_startup" (browser profile -> seconds).
+    """
+    try:
+        with open(path or durations_path()) as durations_file:
+            durations = json.load(durations_file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        durations = {}
+    durations.setdefault("tests", {})
+    durations.setdefault("driver_startup", {})
+    return durations
+
+
+def update_durations(results, path=None, smoothing=None):
+    """
+    Fold measured durations into the durations file.
+
+    New measurements are blended with the stored value (exponential smoothing) so a
+    single slow run does not reshuffle every shard.
+
+    :param results: Shard results (see `shard_results`), one dict or a list of them.
+    :param path: Durations file (defaults to the configured one).
+    :param smoothing: Weight of the new measurement, 0-1 (defaults to the configured value).
+    :return: The updated durations.
+    """
+    path = path or durations_path()
+    if smoothing is None:
+        smoothing = get_section("sharding").get("smoothing", 0.5)
+    durations = load_durations(path)
+    for result in results if isinstance(results, list) else [results]:
+        for section, measured in (("tests", {t["nodeid"]: t["duration"] for t in result["tests"]}),
+                                  ("driver_startup", result.get("driver_startup", {}))):
+            stored = durations[section]
+            for key, seconds in measured.items():
+                previous = stored.get(key)
+                stored[key] = round(seconds if previous is None else previous + smoothing * (seconds - previous), 3)
+    with open(path, "w") as durations_file:
+        json.dump(durations, durations_file, indent=2, sort_keys=True)
+    return durations
+
+
+def partition(tests, num_shards, durations=None, startup=None, default_duration=None):
+    """
+    Split tests into balanced shards with longest-processing-time-first bin packing.
+
+    Tests are placed longest first on the shard that would finish earliest. A shard
+    that has no test of a test's driver group yet is charged that group's browser
+    startup, and when choosing a shard that startup counts once more as wasted work,
+    so tests sharing a driver configuration stay on one shard and reuse its pooled
+    browsers unless splitting them clearly shortens the run.
+
+    :param tests: List of (node id, driver group) pairs; the group is any hashable or None for no browser.
+    :param num_shards: Number of shards.
+    :param durations: Node id -> seconds from earlier runs.
+    :param startup: Driver group -> browser startup seconds.
+    :param default_duration: Duration assumed for unknown tests (defaults to the mean of the known ones).
+    :return: List of num_shards lists of node ids, each ordered by driver group.
+    """
+    if num_shards < 1:
+        raise ValueError("num_shards must be at least 1")
+    durations = durations or {}
+    startup = startup or {}
+    if default_duration is None:
+        known = [durations[nodeid] for nodeid, _ in tests if nodeid in durations]
+        default_duration = sum(known) / len(known) if known else 1.0
+
+    loads = [0.0] * num_shards
+    groups = [set() for _ in range(num_shards)]
+    assigned = [[] for _ in range(num_shards)]
+    order = {nodeid: position for position, (nodeid, _) in enumerate(tests)}
+
+    for nodeid, group in sorted(tests, key=lambda t: (-durations.get(t[0], default_duration), t[0])):
+        cost = durations.get(nodeid, default_duration)
+
+        def extra_startup(shard):
+            return startup.get(group, 0.0) if group is not None and group not in groups[shard] else 0.0
+
+        shard = min(range(num_shards), key=lambda s: (loads[s] + cost + 2 * extra_startup(s), s))
+        loads[shard] += cost + extra_startup(shard)
+        groups[shard].add(group)
+        assigned[shard].append((nodeid, group))
+
+    return [
+        [nodeid for nodeid, _ in sorted(shard, key=lambda t: (str(t[1]), order[t[0]]))]
+        for shard in assigned
+    ]
+
+
+def shard_results(shard_id, num_shards, reports, driver_startup=None):
+    """
+    Build the results record of one shard.
+
+    :param shard_id: Index of the shard (0-based).
+    :param num_shards: Total number of shards.
+    :param reports: Dict of node id -> {"outcome", "duration"} (setup, call and teardown combined).
+    :param driver_startup: Browser profile -> mean startup seconds measured in this shard.
+    """
+    return {
+        "shard_id": shard_id,
+        "num_shards": num_shards,
+        "tests": [dict(report, nodeid=nodeid) for nodeid, report in sorted(reports.items())],
+        "driver_startup": driver_startup or {},
+    }
+
+
+def merge_results(paths, output_dir):
+    """
+    Combine the results of several shards into one JSON file and one HTML summary.
+
+    :param paths: Paths of shard_results.json files.
+    :param output_dir: Folder the merged files are written to.
+    :return: The merged results.
+    """
+    shards = []
+    for path in paths:
+        with open(path) as results_file:
+            shards.append(json.load(results_file))
+    tests = sorted(
+        (dict(test, shard_id=shard["shard_id"]) for shard in shards for test in shard["tests"]),
+        key=lambda t: t["nodeid"],
+    )
+    outcomes = {}
+    for test in tests:
+        outcomes[test["outcome"]] = outcomes.get(test["outcome"], 0) + 1
+    merged = {
+        "shards": [
+            {"shard_id": s["shard_id"], "tests": len(s["tests"]),
+             "duration": round(sum(t["duration"] for t in s["tests"]), 3)}
+            for s in sorted(shards, key=lambda s: s["shard_id"])
+        ],
+        "outcomes": outcomes,
+        "tests": tests,
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "merged_results.json"), "w") as merged_file:
+        json.dump(merged, merged_file, indent=2)
+    rows = "".join(
+        f"<tr><td>{t['shard_id']}</td><td>{html.escape(t['nodeid'])}</td>"
+        f"<td>{html.escape(t['outcome'])}</td><td>{t['duration']:.2f}</td></tr>"
+        for t in tests
+    )
+    shard_rows = "".join(f"<li>Shard {s['shard_id']}: {s['tests']} tests, {s['duration']:.1f}s</li>" for s in merged["shards"])
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items()))
+    with open(os.path.join(output_dir, "merged_report.html"), "w") as report_file:
+        report_file.write(
+            "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Merged report</title></head><body>"
+            f"<h1>Merged report</h1><p>{html.escape(summary)}</p><ul>{shard_rows}</ul>"
+            "<table><tr><th>Shard</th><th>Test</th><th>Outcome</th><th>Duration (s)</th></tr>"
+            + rows
+            + "</table></body></html>"
+        )
+    return merged
+
+
+def main():
+    """
+    Merge shard results: python -m lib.sharding merge shard0/shard_results.json shard1/shard_results.json
+    """
+    parser = argparse.ArgumentParser(description="Combine the results of test shards.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    merge = subparsers.add_parser("merge", help="Merge shard results into one report")
+    merge.add_argument("results", nargs="+", help="shard_results.json files")
+    merge.add_argument("--output", default="reports", help="Folder for merged_results.json and merged_report.html")
+    merge.add_argument("--update-durations", action="store_true", help="Also fold the durations into the durations file")
+    args = parser.parse_args()
+
+    merged = merge_results(args.results, args.output)
+    if args.update_durations:
+        shards = []
+        for path in args.results:
+            with open(path) as results_file:
+                shards.append(json.load(results_file))
+        update_durations(shards)
+    print(f"Merged {len(merged['tests'])} tests from {len(merged['shards'])} shards: {merged['outcomes']}")
+    return 0 if not {"failed", "error"} & set(merged["outcomes"]) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
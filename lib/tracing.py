@@ -0,0 +1,249 @@
+# lib/tracing.py
+import functools  # Preserving wrapped function metadata
+import html  # Escaping span names in the HTML breakdown
+import json  # Spans are written as JSON lines
+import os  # OS module for file and directory handling
+import threading  # Per-thread span stacks
+import time  # High resolution timer
+from driver.cdp_transport import run_script  # Data-only scripts over the DevTools socket when available
+from lib.artifacts import artifact_dir, get_worker_id  # Per-worker artifact folders
+from lib.command_counter import CommandCounter  # Commands sent per span
+from lib.config import get_section  # Importing the config section reader
+
+SPANS_FILE = "spans.jsonl"
+
+# Navigation Timing and a Resource Timing summary for the current page
+BROWSER_TIMING_SCRIPT = """
+var nav = performance.getEntriesByType('navigation')[0];
+var resources = performance.getEntriesByType('resource');
+var transfer = 0, slowest = 0;
+resources.forEach(function (r) { transfer += r.transferSize || 0; slowest = Math.max(slowest, r.duration); });
+return {
+    url: location.href,
+    ttfb_ms: nav ? nav.responseStart - nav.requestStart : null,
+    dom_content_loaded_ms: nav ? nav.domContentLoadedEventEnd : null,
+    load_ms: nav ? nav.loadEventEnd : null,
+    resource_count: resources.length,
+    resource_transfer_bytes: transfer,
+    slowest_resource_ms: slowest
+};
+"""
+
+
+class Tracer:
+    """
+    Records timing spans for the test that is currently running.
+
+    A span holds the wall time, the WebDriver commands sent and, for waits, the
+    unused part of the timeout ("wait_slack"). Spans are kept in memory for the
+    current test and appended as JSON lines to <reports>/<worker>/spans.jsonl when
+    the test ends. Settings are read from the "tracing" section of config.json:
+
+        enabled        -- turn span recording on or off.
+        browser_timing -- after each page load, also record Navigation/Resource Timing.
+    """
+    _lock = threading.Lock()
+    _local = threading.local()
+    _test_id = None
+    _test_started = None
+    _spans = []
+    _settings = None
+
+    @classmethod
+    def settings(cls):
+        """
+        Return the "tracing" config section, read once.
+        """
+        if cls._settings is None:
+            cls._settings = get_section("tracing")
+        return cls._settings
+
+    @classmethod
+    def enabled(cls):
+        return cls.settings().get("enabled", True)
+
+    @classmethod
+    def start_test(cls, test_id):
+        """
+        Start collecting spans for a test.
+
+        :param test_id: The pytest node id.
+        """
+        with cls._lock:
+            cls._test_id = test_id
+            cls._test_started = time.perf_counter()
+            cls._spans = []
+
+    @classmethod
+    def end_test(cls):
+        """
+        Stop collecting spans for the current test and write them to the spans file.
+
+        :return: The test's spans.
+        """
+        with cls._lock:
+            spans, cls._spans, cls._test_id = cls._spans, [], None
+        if spans:
+            with open(os.path.join(artifact_dir("reports"), SPANS_FILE), "a") as spans_file:
+                for span in spans:
+                    spans_file.write(json.dumps(span, default=str) + "\n")
+        return spans
+
+    @classmethod
+    def current_test(cls):
+        """
+        Return the node id of the test that is running, or None outside a test.
+        """
+        return cls._test_id
+
+    @classmethod
+    def current_spans(cls):
+        """
+        Return a copy of the spans finished so far for the current test.
+        """
+        with cls._lock:
+            return list(cls._spans)
+
+    @classmethod
+    def annotate(cls, **attributes):
+        """
+        Add attributes to the innermost open span of the current thread.
+        """
+        stack = getattr(cls._local, "stack", None)
+        if stack:
+            stack[-1]["attrs"].update(attributes)
+
+    @classmethod
+    def span(cls, name):
+        """
+        Context manager timing a block as a span.
+
+        :param name: Span name, e.g. "BasePage.find_element".
+        """
+        return _Span(cls, name)
+
+    @classmethod
+    def _finish(cls, span):
+        with cls._lock:
+            span["test"] = cls._test_id or "session"
+            span["worker"] = get_worker_id()
+            if cls._test_started is not None and cls._test_id is not None:
+                span["start"] = round(span["start"] - cls._test_started, 6)
+            else:
+                span["start"] = 0.0
+            cls._spans.append(span)
+
+
+class _Span:
+    """
+    A single open span; see Tracer.span.
+    """
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.record = None
+
+    def __enter__(self):
+        if not self.tracer.enabled():
+            return self
+        stack = getattr(self.tracer._local, "stack", None)
+        if stack is None:
+            stack = self.tracer._local.stack = []
+        self.record = {
+            "name": self.name,
+            "depth": len(stack),
+            "start": time.perf_counter(),
+            "commands": CommandCounter.thread_total(),
+            "attrs": {},
+        }
+        stack.append(self.record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.record is None:
+            return False
+        self.tracer._local.stack.pop()
+        record = self.record
+        record["duration"] = round(time.perf_counter() - record["start"], 6)
+        record["commands"] = CommandCounter.thread_total() - record["commands"]
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        self.tracer._finish(record)
+        return False
+
+
+def traced(name=None):
+    """
+    Decorator recording every call of a function or method as a span.
+
+    :param name: Span name (defaults to the function's qualified name, e.g. "BasePage.load").
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_browser_timing(driver):
+    """
+    Attach Navigation and Resource Timing of the current page to the open span.
+
+    :param driver: WebDriver instance on the loaded page.
+    """
+    if Tracer.enabled() and Tracer.settings().get("browser_timing", True):
+        Tracer.annotate(browser_timing=run_script(driver, BROWSER_TIMING_SCRIPT, idempotent=True))
+
+
+def render_flame(spans):
+    """
+    Render spans as a flame-style HTML breakdown: one row per span, indented by
+    nesting depth, with a bar positioned on the test's timeline.
+
+    :param spans: Spans of one test.
+    :return: HTML string.
+    """
+    if not spans:
+        return ""
+    origin = min(s["start"] for s in spans)
+    total = (max(s["start"] + s["duration"] for s in spans) - origin) or 1
+    rows = []
+    for span in sorted(spans, key=lambda s: (s["start"], s["depth"])):
+        left = 100 * (span["start"] - origin) / total
+        width = max(100 * span["duration"] / total, 0.2)
+        slack = span["attrs"].get("wait_slack")
+        label = f"{span['name']} {span['duration'] * 1000:.0f} ms, {span['commands']} cmd"
+        if slack is not None:
+            label += f", slack {slack:.2f}s"
+        color = "#e07b7b" if span.get("error") else "#7bafe0"
+        rows.append(
+            f"<div style=\"position:relative;height:16px;margin-left:{span['depth'] * 12}px\" title=\"{html.escape(label)}\">"
+            f"<div style=\"position:absolute;left:{left:.2f}%;width:{width:.2f}%;height:14px;background:{color};"
+            f"overflow:hidden;white-space:nowrap;font-size:11px\">{html.escape(label)}</div></div>"
+        )
+    return f"<div class=\"flame\" style=\"width:100%\"><b>Step timings ({total:.2f}s)</b>{''.join(rows)}</div>"
+
+
+def summarize_spans(spans, limit=15):
+    """
+    Aggregate spans of a whole suite by name, slowest total time first.
+
+    :param spans: Spans from all tests.
+    :param limit: Number of rows to return.
+    :return: List of dicts with name, calls, total, mean, max, commands.
+    """
+    by_name = {}
+    for span in spans:
+        entry = by_name.setdefault(span["name"], {"name": span["name"], "calls": 0, "total": 0.0, "max": 0.0, "commands": 0})
+        entry["calls"] += 1
+        entry["total"] += span["duration"]
+        entry["max"] = max(entry["max"], span["duration"])
+        entry["commands"] += span["commands"]
+    rows = sorted(by_name.values(), key=lambda e: -e["total"])[:limit]
+    for row in rows:
+        row["mean"] = row["total"] / row["calls"]
+    return rows
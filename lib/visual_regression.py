@@ -0,0 +1,299 @@
+# lib/visual_regression.py
+import argparse  # Command line interface for batch comparisons
+import logging  # Comparison output
+import os  # OS module for file and directory handling
+import re  # Stripping timestamps from screenshot names
+import shutil  # Copying new baselines into place
+import time  # Timing comparisons
+from concurrent.futures import ProcessPoolExecutor  # Batch comparisons across cores
+import numpy as np  # Vectorized pixel arithmetic
+from PIL import Image  # Image decoding and encoding
+from lib.artifacts import artifact_dir  # Per-worker artifact folders
+from lib.config import device_profile_key, get_section  # Importing the config readers
+
+logger = logging.getLogger("visual_logger")
+
+# Maximum YIQ delta between two pixels (black vs white), see compare_images
+MAX_YIQ_DELTA = 35215.0
+
+# Timestamp and sequence suffix added by the screenshot pipeline, e.g. "_20250422_205949_123456_0001"
+SCREENSHOT_SUFFIX = re.compile(r"_\d{8}_\d{6}(_\d{6})?(_\d{4})?$")
+
+# Bounding box of an element in device pixels, matching the screenshot's resolution
+ELEMENT_REGION_SCRIPT = """
+var rect = arguments[0].getBoundingClientRect(), ratio = window.devicePixelRatio || 1;
+return [rect.left * ratio, rect.top * ratio, rect.width * ratio, rect.height * ratio];
+"""
+
+
+class DiffResult:
+    """
+    Outcome of comparing a capture with its golden image.
+    """
+    def __init__(self, name, passed, mismatch_ratio=0.0, mismatched_pixels=0, baseline_path=None,
+                 diff_path=None, created_baseline=False, elapsed=0.0, message=""):
+        self.name = name
+        self.passed = passed
+        self.mismatch_ratio = mismatch_ratio
+        self.mismatched_pixels = mismatched_pixels
+        self.baseline_path = baseline_path
+        self.diff_path = diff_path
+        self.created_baseline = created_baseline
+        self.elapsed = elapsed
+        self.message = message
+
+    def __repr__(self):
+        status = "passed" if self.passed else "failed"
+        return f"<DiffResult {self.name}: {status}, {self.mismatch_ratio:.4%} mismatched in {self.elapsed * 1000:.0f} ms>"
+
+
+def load_image(path):
+    """
+    Load an image as an RGB uint8 array of shape (height, width, 3).
+    """
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def mismatch_mask(actual, expected, threshold=0.1, ignore_regions=()):
+    """
+    Per-pixel perceptual comparison of two RGB arrays.
+
+    Colour difference is measured in YIQ space (as pixelmatch does), which
+    tracks perceived difference better than raw RGB distance.
+
+    :param actual: RGB array of the new capture.
+    :param expected: RGB array of the golden image, same shape as actual.
+    :param threshold: Per-pixel tolerance from 0 (exact) to 1 (anything goes).
+    :param ignore_regions: Iterable of (x, y, width, height) boxes in image pixels to skip.
+    :return: Boolean array, True where pixels differ.
+    """
+    # Only pixels whose bytes differ need the floating point colour math
+    differs = actual != expected
+    mask = differs[..., 0] | differs[..., 1] | differs[..., 2]
+    changed = np.nonzero(mask)
+    if changed[0].size:
+        delta = actual[changed].astype(np.float32) - expected[changed].astype(np.float32)
+        dr, dg, db = delta[:, 0], delta[:, 1], delta[:, 2]
+        y = dr * 0.29889531 + dg * 0.58662247 + db * 0.11448223
+        i = dr * 0.59597799 - dg * 0.27417610 - db * 0.32180189
+        q = dr * 0.21147017 - dg * 0.52261711 + db * 0.31114694
+        mask[changed] = (0.5053 * y * y + 0.299 * i * i + 0.1957 * q * q) > MAX_YIQ_DELTA * threshold * threshold
+
+    height, width = mask.shape
+    for x, y0, w, h in ignore_regions:
+        left, top = max(int(x), 0), max(int(y0), 0)
+        mask[top:min(int(y0 + h), height), left:min(int(x + w), width)] = False
+    return mask
+
+
+def render_diff(actual, mask):
+    """
+    Build a diff image: the capture faded to grey with mismatched pixels in red.
+    """
+    grey = (actual.astype(np.float32).mean(axis=2) * 0.3 + 178).astype(np.uint8)
+    diff = np.repeat(grey[..., None], 3, axis=2)
+    diff[mask] = (255, 0, 0)
+    return diff
+
+
+def compare_images(actual_path, expected_path, threshold=0.1, ignore_regions=(), max_mismatch_ratio=0.0,
+                   diff_path=None, name=None):
+    """
+    Compare a capture with a golden image file.
+
+    :param actual_path: Path of the new capture.
+    :param expected_path: Path of the golden image.
+    :param threshold: Per-pixel tolerance from 0 to 1, see mismatch_mask.
+    :param ignore_regions: Iterable of (x, y, width, height) boxes in image pixels to skip.
+    :param max_mismatch_ratio: Fraction of pixels allowed to differ.
+    :param diff_path: Where to write the diff image when the comparison fails.
+    :param name: Name used in the result (defaults to the capture's file name).
+    :return: DiffResult.
+    """
+    name = name or os.path.basename(actual_path)
+    actual, expected = load_image(actual_path), load_image(expected_path)
+    started = time.perf_counter()
+    if actual.shape != expected.shape:
+        return DiffResult(name, False, 1.0, actual.shape[0] * actual.shape[1], expected_path,
+                          elapsed=time.perf_counter() - started,
+                          message=f"Size {actual.shape[1]}x{actual.shape[0]} differs from baseline "
+                                  f"{expected.shape[1]}x{expected.shape[0]}")
+
+    mask = mismatch_mask(actual, expected, threshold, ignore_regions)
+    mismatched = int(np.count_nonzero(mask))
+    ratio = mismatched / mask.size
+    passed = ratio <= max_mismatch_ratio
+    elapsed = time.perf_counter() - started
+
+    if not passed and diff_path:
+        os.makedirs(os.path.dirname(diff_path) or ".", exist_ok=True)
+        Image.fromarray(render_diff(actual, mask)).save(diff_path)
+    return DiffResult(name, passed, ratio, mismatched, expected_path, diff_path if not passed else None,
+                      elapsed=elapsed, message=f"{mismatched} pixels ({ratio:.4%}) differ")
+
+
+def _compare_job(job):
+    """
+    Process pool entry point; job is a dict of compare_images keyword arguments.
+    """
+    return compare_images(**job)
+
+
+def compare_batch(jobs, max_workers=None):
+    """
+    Run many comparisons across a process pool.
+
+    :param jobs: List of dicts of compare_images keyword arguments.
+    :param max_workers: Number of processes (defaults to the CPU count).
+    :return: List of DiffResult in the order of jobs.
+    """
+    if len(jobs) <= 1:
+        return [_compare_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_compare_job, jobs))
+
+
+def element_region(driver, element):
+    """
+    Return an element's box in screenshot pixels, for use as an ignore region.
+
+    :param driver: WebDriver instance.
+    :param element: WebElement to ignore (e.g. the live video).
+    :return: (x, y, width, height) tuple.
+    """
+    return tuple(driver.execute_script(ELEMENT_REGION_SCRIPT, element))
+
+
+class VisualBaseline:
+    """
+    Golden images per test and device profile, and the comparisons against them.
+
+    Baselines live in <baseline_dir>/<device profile>/<test>/<name>.png. A missing
+    baseline is created from the capture. Setting UPDATE_BASELINES=1 replaces existing
+    ones. Settings are read from the "visual_regression" section of config.json:
+
+        enabled            -- compare at all (when false, checks always pass).
+        baseline_dir       -- folder holding the golden images.
+        threshold          -- per-pixel perceptual tolerance from 0 to 1.
+        max_mismatch_ratio -- fraction of pixels allowed to differ.
+    """
+    def __init__(self, config_path="config.json", driver=None, profile=None):
+        """
+        :param config_path: Path to the config file.
+        :param driver: WebDriver that took the captures; its device profile names the baseline folder.
+        :param profile: Device profile folder to use instead (e.g. for captures compared offline).
+        """
+        settings = get_section("visual_regression", config_path)
+        self.enabled = settings.get("enabled", True)
+        self.baseline_dir = settings.get("baseline_dir", "baselines")
+        self.threshold = settings.get("threshold", 0.1)
+        self.max_mismatch_ratio = settings.get("max_mismatch_ratio", 0.001)
+        self.update = os.environ.get("UPDATE_BASELINES") == "1"
+        self.profile = profile or self.profile_key(config_path, driver)
+
+    @staticmethod
+    def profile_key(config_path="config.json", driver=None):
+        """
+        Return the folder name of the device profile, e.g. "iPhone_X_375x812@3.0".
+
+        Browsers started by Driver.get_driver carry their profile (desktop, the
+        "mobile_emulation" device or a "device_matrix" device) as `device_profile`;
+        without one, the "mobile_emulation" config is used.
+        """
+        return getattr(driver, "device_profile", None) or device_profile_key(config_path)
+
+    @staticmethod
+    def baseline_name(screenshot_path):
+        """
+        Derive a baseline name from a screenshot file name by dropping its timestamp suffix.
+        """
+        return SCREENSHOT_SUFFIX.sub("", os.path.splitext(os.path.basename(screenshot_path))[0])
+
+    def baseline_path(self, test_name, name):
+        """
+        Return the golden image path for a test and capture name.
+        """
+        return os.path.join(self.baseline_dir, self.profile, test_name, f"{name}.png")
+
+    def job(self, screenshot_path, test_name, name=None, ignore_regions=()):
+        """
+        Build the compare_images arguments for a capture; creates the baseline if it is missing.
+
+        :return: Dict for compare_images/compare_batch, or a DiffResult if nothing needs comparing.
+        """
+        name = name or self.baseline_name(screenshot_path)
+        baseline = self.baseline_path(test_name, name)
+        if not self.enabled:
+            return DiffResult(name, True, message="Visual regression disabled")
+        if self.update or not os.path.exists(baseline):
+            os.makedirs(os.path.dirname(baseline), exist_ok=True)
+            shutil.copyfile(screenshot_path, baseline)
+            logger.info(f"Stored new baseline {baseline}")
+            return DiffResult(name, True, baseline_path=baseline, created_baseline=True, message="Baseline created")
+        return {
+            "actual_path": screenshot_path,
+            "expected_path": baseline,
+            "threshold": self.threshold,
+            # Regions may be callables so they are only measured when a comparison runs
+            "ignore_regions": [tuple(r() if callable(r) else r) for r in ignore_regions],
+            "max_mismatch_ratio": self.max_mismatch_ratio,
+            "diff_path": os.path.join(artifact_dir("reports"), "visual_diffs", f"{test_name}_{name}_diff.png"),
+            "name": name,
+        }
+
+    def check(self, screenshot_path, test_name, name=None, ignore_regions=()):
+        """
+        Compare a capture with its golden image.
+
+        :param screenshot_path: Path of the capture (PNG).
+        :param test_name: Test the baseline belongs to.
+        :param name: Capture name (defaults to the file name without its timestamp).
+        :param ignore_regions: Iterable of (x, y, width, height) boxes in image pixels to skip,
+                               or callables returning one (e.g. HomePage.video_region).
+        :return: DiffResult.
+        """
+        job = self.job(screenshot_path, test_name, name, ignore_regions)
+        result = job if isinstance(job, DiffResult) else compare_images(**job)
+        logger.info(f"Visual check {result!r}")
+        return result
+
+    def check_batch(self, captures, max_workers=None):
+        """
+        Compare many captures across a process pool.
+
+        :param captures: List of (screenshot_path, test_name) tuples.
+        :param max_workers: Number of processes (defaults to the CPU count).
+        :return: List of DiffResult in the order of captures.
+        """
+        jobs = [self.job(path, test_name) for path, test_name in captures]
+        pending = [job for job in jobs if not isinstance(job, DiffResult)]
+        compared = iter(compare_batch(pending, max_workers))
+        return [job if isinstance(job, DiffResult) else next(compared) for job in jobs]
+
+
+def main():
+    """
+    Compare every screenshot of a run against its baseline: python -m lib.visual_regression <test name> [folders...]
+    """
+    parser = argparse.ArgumentParser(description="Compare screenshots against their golden images.")
+    parser.add_argument("test_name", help="Test the baselines belong to")
+    parser.add_argument("folders", nargs="*", default=["screenshots"], help="Folders holding PNG captures")
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes")
+    parser.add_argument("--profile", help="Device profile folder of the baselines (defaults to the mobile_emulation device)")
+    args = parser.parse_args()
+
+    captures = [
+        (os.path.join(root, filename), args.test_name)
+        for folder in args.folders
+        for root, _, filenames in os.walk(folder)
+        for filename in sorted(filenames) if filename.endswith(".png")
+    ]
+    results = VisualBaseline(profile=args.profile).check_batch(captures, args.workers)
+    for result in results:
+        print(result, result.message)
+    return 0 if all(r.passed for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
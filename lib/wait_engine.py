@@ -0,0 +1,237 @@
+# lib/wait_engine.py
+import logging  # Debug output for individual waits
+import time  # Monotonic clock for deadlines
+from selenium.common.exceptions import JavascriptException, TimeoutException, WebDriverException  # Selenium errors
+from selenium.webdriver.support.ui import WebDriverWait  # Polling fallback
+from lib.adaptive_timeouts import AdaptiveTimeouts  # Timeouts learned from past waits
+from lib.command_counter import CommandCounter  # Round trip counting
+from lib.config import get_section  # Importing the config section reader
+from lib.constants import TIMEOUTS  # Importing TIMEOUTS from constants
+from lib.tracing import Tracer  # Per-step timing spans
+from lib.dom_scripts import ACTION_SCRIPT, ACTIONS, DOM_HELPERS, is_supported, to_script_args  # In-page locator helpers
+
+logger = logging.getLogger("wait_logger")
+
+# Upper bound for a single in-page wait; longer waits are split into several calls
+MAX_SCRIPT_WAIT = TIMEOUTS.LONG
+
+# Resolves as soon as one of the locators matches the condition. A MutationObserver
+# re-checks on DOM changes and a requestAnimationFrame loop catches layout/style
+# changes (e.g. an element becoming visible) that do not mutate the DOM. An optional
+# action (see dom_scripts.ACTIONS) is applied to the match before returning.
+# Resolves to [index of the matching locator, element(s)] or null on timeout.
+OBSERVER_SCRIPT = DOM_HELPERS + """
+var locators = arguments[0], condition = arguments[1], timeoutMs = arguments[2], returnAll = arguments[3];
+var action = arguments[4];
+var done = arguments[arguments.length - 1];
+var finished = false, observer = null, timer = null, frame = null;
+var check = function () {
+    var match = __findFirst(locators, condition);
+    if (!match) { return null; }
+    return [match.index, returnAll ? match.elements : match.elements[0]];
+};
+var finish = function (value) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearTimeout(timer);
+    cancelAnimationFrame(frame);
+    if (value && action) { __actions[action](returnAll ? value[1][0] : value[1]); }
+    done(value);
+};
+var initial = check();
+if (initial) { finish(initial); return; }
+observer = new MutationObserver(function () { var value = check(); if (value) { finish(value); } });
+observer.observe(document, {childList: true, subtree: true, attributes: true});
+var onFrame = function () { var value = check(); if (value) { finish(value); } else { frame = requestAnimationFrame(onFrame); } };
+frame = requestAnimationFrame(onFrame);
+timer = setTimeout(function () { finish(null); }, timeoutMs);
+"""
+
+
+class WaitEngine:
+    """
+    Waits for elements either inside the page (one round trip per wait) or by polling WebDriverWait.
+
+    Settings are read from the "waits" section of config.json:
+
+        backend       -- "observer" for in-page waits, "poll" for WebDriverWait polling.
+        poll_interval -- seconds between polls for the "poll" backend and fallbacks.
+    """
+    CONDITIONS = ("present", "visible", "clickable")
+
+    def __init__(self, driver, backend=None, poll_interval=None, config_path="config.json"):
+        """
+        Initialize the wait engine for a WebDriver instance.
+
+        :param driver: WebDriver instance to wait on.
+        :param backend: "observer" or "poll" (overrides config).
+        :param poll_interval: Poll interval in seconds (overrides config).
+        :param config_path: Path to the config file.
+        """
+        settings = get_section("waits", config_path)
+        self.driver = driver
+        self.backend = backend or settings.get("backend", "observer")
+        self.poll_interval = poll_interval or settings.get("poll_interval", 0.5)
+        self.counter = CommandCounter.install(driver)
+        self.stats = {"waits": 0, "round_trips": 0, "timeouts": 0, "fail_fast": 0}
+        self.last_wait = None
+        self._matched = None  # Index of the locator that satisfied the current wait
+
+    def until(self, locators, condition="present", timeout=TIMEOUTS.DEFAULT, return_all=False, action=None, step=None,
+              allow_longer=False):
+        """
+        Wait until one of the locators matches the condition.
+
+        Locators are tried in order on every check, so fallbacks cost no extra time.
+        Once the step has enough history for this browser's profile, the learned
+        AdaptiveTimeouts budget is used instead of `timeout` (never longer than it,
+        unless allow_longer is True).
+
+        :param locators: A (By, value) tuple or a list of them.
+        :param condition: "present", "visible" or "clickable".
+        :param timeout: Timeout in seconds.
+        :param return_all: Return all matching elements of the first matching locator.
+        :param action: Optional action from dom_scripts.ACTIONS applied to the first match
+                       (in the same round trip for the observer backend).
+        :param step: Name the duration history is kept under (defaults to the condition and first locator).
+        :param allow_longer: Let a step that is usually slow wait past `timeout`, up to the configured max_timeout.
+        :return: The first matching WebElement, or a list of WebElements if return_all is True.
+        :raises TimeoutException: If nothing matches within the timeout.
+        """
+        if isinstance(locators, tuple):
+            locators = [locators]
+        if condition not in self.CONDITIONS:
+            raise ValueError(f"Unknown wait condition: {condition}")
+        if action is not None and action not in ACTIONS:
+            raise ValueError(f"Unknown wait action: {action}")
+
+        step = step or f"{condition}:{locators[0][0]}={locators[0][1]}"
+        profile = AdaptiveTimeouts.profile(self.driver)
+        requested, timeout = timeout, AdaptiveTimeouts.budget(step, timeout, profile, allow_longer)
+
+        self._raise_for_network_misses()
+        started = time.perf_counter()
+        commands_before = self.counter.total
+        backend = self.backend if is_supported(locators) else "poll"
+        result = None
+        self._matched = None
+        try:
+            if backend == "observer":
+                try:
+                    result = self._wait_in_page(locators, condition, timeout, return_all, action)
+                except JavascriptException as e:
+                    # e.g. an invalid selector; the poll backend reports it the usual way
+                    logger.debug(f"In-page wait failed, falling back to polling: {e}")
+                    backend = "poll"
+            if backend == "poll":
+                remaining = max(0, timeout - (time.perf_counter() - started))
+                result = self._wait_polling(locators, condition, remaining, return_all)
+                if action is not None:
+                    self.driver.execute_script(ACTION_SCRIPT, result[0] if return_all else result, action)
+            AdaptiveTimeouts.record(step, time.perf_counter() - started, profile)
+            return result
+        except TimeoutException as e:
+            self.stats["timeouts"] += 1
+            AdaptiveTimeouts.record_timeout(step, timeout, profile)
+            self._raise_for_network_misses()  # A missing recording explains the timeout better
+            if timeout < requested:
+                self.stats["fail_fast"] += 1
+                raise TimeoutException(
+                    f"{step} failed fast after {timeout}s, far above its usual duration "
+                    f"({len(AdaptiveTimeouts.samples(step, profile))} past runs; requested timeout {requested}s)"
+                ) from e
+            raise
+        finally:
+            round_trips = self.counter.total - commands_before
+            self.stats["waits"] += 1
+            self.stats["round_trips"] += round_trips
+            self.last_wait = {
+                "locators": locators,
+                "condition": condition,
+                "step": step,
+                "backend": backend,
+                "timeout": timeout,
+                "elapsed": time.perf_counter() - started,
+                "round_trips": round_trips,
+                "found": result is not None,
+                "matched_index": self._matched,
+            }
+            Tracer.annotate(wait_timeout=timeout, wait_slack=round(timeout - self.last_wait["elapsed"], 3),
+                            wait_round_trips=round_trips)
+            logger.debug(f"Wait finished: {self.last_wait}")
+
+    def _wait_in_page(self, locators, condition, timeout, return_all, action):
+        """
+        Run the observer script until it resolves, retrying across page navigations.
+        """
+        self._ensure_script_timeout()
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                result = self.driver.execute_async_script(
+                    OBSERVER_SCRIPT,
+                    to_script_args(locators),
+                    condition,
+                    int(min(remaining, MAX_SCRIPT_WAIT) * 1000),
+                    return_all,
+                    action,
+                )
+            except JavascriptException as e:
+                # The document was replaced while waiting; start over on the new page
+                if "unloaded" not in str(e) and "navigat" not in str(e):
+                    raise
+                continue
+            if result:
+                self._matched, value = result
+                return value
+        raise TimeoutException(f"No element matched {locators} ({condition}) within {timeout}s")
+
+    def _wait_polling(self, locators, condition, timeout, return_all):
+        """
+        Poll with WebDriverWait at the configured interval.
+        """
+        def check(driver):
+            for index, (by, value) in enumerate(locators):
+                elements = driver.find_elements(by, value)
+                if condition != "present":
+                    elements = [e for e in elements if self._matches(e, condition)]
+                if elements:
+                    self._matched = index
+                    return elements if return_all else elements[0]
+            return False
+
+        return WebDriverWait(self.driver, timeout, poll_frequency=self.poll_interval).until(
+            check, f"No element matched {locators} ({condition}) within {timeout}s"
+        )
+
+    @staticmethod
+    def _matches(element, condition):
+        """
+        Check a visibility condition on a single element, treating stale elements as non-matching.
+        """
+        try:
+            if not element.is_displayed():
+                return False
+            return condition != "clickable" or element.is_enabled()
+        except WebDriverException:
+            return False
+
+    def _raise_for_network_misses(self):
+        """
+        Fail fast when a replay_only NetworkRecorder has seen unrecorded requests.
+        """
+        recorder = getattr(self.driver, "network_recorder", None)
+        if recorder is not None:
+            recorder.raise_for_misses()
+
+    def _ensure_script_timeout(self):
+        """
+        Raise the driver's async script timeout once so in-page waits are not cut short.
+        """
+        if not getattr(self.driver, "wait_engine_script_timeout", False):
+            self.driver.set_script_timeout(MAX_SCRIPT_WAIT + 5)
+            self.driver.wait_engine_script_timeout = True
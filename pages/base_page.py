@@ -1,14 +1,38 @@
 from selenium.webdriver.common.by import By  # Locator strategy class for Selenium
-from selenium.common.exceptions import TimeoutException  # Exception for timeouts
+from selenium.common.exceptions import (  # Exceptions for timeouts and unusable cached elements
+    ElementClickInterceptedException, ElementNotInteractableException, StaleElementReferenceException, TimeoutException,
+)
 from selenium.webdriver.common.keys import Keys  # Keys class for keyboard actions
-from selenium.webdriver.support.ui import WebDriverWait  # Explicit wait for elements
-from selenium.webdriver.support import expected_conditions as EC  # Expected conditions for waits
-import os  # OS module for file and directory handling
-from datetime import datetime  # Date and time utilities
+from driver.cdp_transport import run_script  # Data-only scripts over the DevTools socket when available
 from lib.constants import TIMEOUTS  # Importing TIMEOUTS from constants
+from lib.failure_artifacts import FailureArtifacts  # DOM snapshots of failing pages
+from lib.page_metrics import PageMetrics, collect  # Browser-side performance metrics
+from lib.screenshot_pipeline import ScreenshotPipeline  # Background screenshot writer
+from lib.wait_engine import WaitEngine  # In-page / polling wait backends
+from lib.dom_scripts import ACTION_SCRIPT, DOM_HELPERS, to_script_args  # In-page locator helpers
+from lib.script_batch import ScriptBatch  # Several script commands in one round trip
+from lib.tracing import Tracer, record_browser_timing, traced  # Per-step timing spans
+from pages.locators import ElementCache, LocatorRegistry  # Named locators and resolved elements
+
+# Returns the first visible modal among the given locators in a single round trip
+FIND_MODAL_SCRIPT = DOM_HELPERS + """
+var match = __findFirst(arguments[0], 'visible');
+return match ? {index: match.index, element: match.elements[0]} : null;
+"""
+
+# Errors meaning a cached element can no longer be used as-is and must be looked up again
+CACHE_MISS_ERRORS = (ElementClickInterceptedException, ElementNotInteractableException, StaleElementReferenceException)
 
 
 class BasePage:
+    # Candidate modal locators, checked together by is_modal_present (see register_modal_selector)
+    MODAL_SELECTORS = [
+        (By.CSS_SELECTOR, '[aria-modal="true"]'),
+        (By.CSS_SELECTOR, '[role="dialog"]'),
+        (By.CLASS_NAME, 'modal'),
+        (By.CLASS_NAME, 'popup'),
+    ]
+
     def __init__(self, driver):
         """
         Initialize the BasePage with the provided WebDriver instance.
@@ -16,7 +40,11 @@ class BasePage:
         :param driver: WebDriver instance to interact with the browser.
         """
         self.driver = driver
+        self.waits = WaitEngine(driver)  # Backend used by all waiting helpers
+        self.elements = ElementCache.for_driver(driver)  # Shared by every page of this session
+        self.timings = {}  # Durations measured by page steps (ms), merged into collect_metrics
 
+    @traced()
     def load(self, url):
         """
         Navigate to the specified URL using the WebDriver.
@@ -24,7 +52,10 @@ class BasePage:
         :param url: The URL to be loaded in the browser.
         """
         self.driver.get(url)
+        self.elements.invalidate()  # References into the previous document are stale
+        record_browser_timing(self.driver)  # Navigation/Resource Timing for the load span
 
+    @traced()
     def find_element(self, by, value):
         """
         Find an element by the provided locator.
@@ -35,25 +66,67 @@ class BasePage:
         :param value: Locator value for the element.
         :return: The WebElement.
         """
-        return WebDriverWait(self.driver, TIMEOUTS.DEFAULT).until(
-            EC.presence_of_element_located((by, value))
-        )
+        return self.waits.until((by, value), "present", TIMEOUTS.DEFAULT)
+
+    @traced()
+    def locate(self, name, condition="present", timeout=TIMEOUTS.DEFAULT, step=None):
+        """
+        Resolve a named locator from the LocatorRegistry and cache the element.
+
+        The primary strategy and all fallbacks are checked together in one in-page lookup.
+
+        :param name: Registry name, e.g. "home.search_input".
+        :param condition: "present", "visible" or "clickable".
+        :param timeout: Timeout in seconds (default is TIMEOUTS.DEFAULT seconds).
+        :param step: Name the wait's duration history is kept under (defaults to `name`).
+        :return: The WebElement.
+        """
+        element = self.waits.until(LocatorRegistry.get(name).strategies, condition, timeout, step=step or name)
+        LocatorRegistry.report_match(name, self.waits.last_wait["matched_index"])
+        self.elements.put(name, element)
+        return element
+
+    @traced()
+    def with_element(self, name, action, condition="present", timeout=TIMEOUTS.DEFAULT):
+        """
+        Run an action on a named element, reusing the cached reference when it is still usable.
+
+        A cached element costs no lookup; if using it fails because it went stale, is
+        hidden or is covered, the element is resolved again and the action retried once.
+
+        :param name: Registry name, e.g. "home.search_input".
+        :param action: Callable taking the WebElement.
+        :param condition: Condition for a fresh lookup: "present", "visible" or "clickable".
+        :param timeout: Timeout in seconds for a fresh lookup.
+        :return: Whatever the action returns.
+        """
+        element = self.elements.get(name)
+        if element is not None:
+            try:
+                return action(element)
+            except CACHE_MISS_ERRORS:
+                self.elements.invalidate(name)
+        return action(self.locate(name, condition, timeout))
 
+    @traced()
     def click_element(self, locator):
         """
         Click an element located by the given locator.
 
-        :param locator: A tuple (By, locator_value) to identify the element.
+        :param locator: A tuple (By, locator_value), or a LocatorRegistry name.
         """
-        # Unpack the locator tuple into 'by' and 'value'
-        by, value = locator
+        if isinstance(locator, str):
+            self.with_element(locator, lambda element: element.click(), "clickable")
+        else:
+            # Unpack the locator tuple into 'by' and 'value'
+            by, value = locator
 
-        # Wait for the element to be clickable before clicking
-        element = WebDriverWait(self.driver, TIMEOUTS.DEFAULT).until(
-            EC.element_to_be_clickable((by, value))
-        )
-        element.click()
+            # Wait for the element to be clickable before clicking
+            element = self.waits.until((by, value), "clickable", TIMEOUTS.DEFAULT)
+            element.click()
+        self.elements.invalidate()  # The click may have navigated the SPA to another view
 
+    @traced()
     def send_keys(self, by, value, keys):
         """
         Find an element, clear it, and send the provided keys.
@@ -65,35 +138,111 @@ class BasePage:
         element = self.find_element(by, value)
         element.clear()
         element.send_keys(keys)
+        if Keys.ENTER in keys or Keys.RETURN in keys:
+            self.elements.invalidate()  # Submitting may have navigated the SPA to another view
 
+    @traced()
     def press_enter_key(self):
         """
         Press the Enter key on the currently active element.
         """
         active_element = self.driver.switch_to.active_element
         active_element.send_keys(Keys.ENTER)
+        self.elements.invalidate()  # Submitting may have navigated the SPA to another view
 
+    @traced()
     def click_element_with_js(self, target):
         """
         Click an element using JavaScript, identified by a (By, value) tuple.
+
+        Scrolling into view and clicking happen in one script call; for a locator the
+        lookup is part of the same call.
         """
         if isinstance(target, tuple):
-            by, value = target
-            element = self.find_element(by, value)
+            self.waits.until(target, "present", TIMEOUTS.DEFAULT, action="scroll_click")
+        else:
+            self.driver.execute_script(ACTION_SCRIPT, target, "scroll_click")
+        self.elements.invalidate()  # The click may have navigated the SPA to another view
+
+    @traced()
+    def click_first_visible(self, locator, timeout=TIMEOUTS.DEFAULT):
+        """
+        Wait for the first visible element matching the locator, scroll to it and click it.
+
+        :param locator: A tuple (By, locator_value), or a LocatorRegistry name.
+        :param timeout: Timeout in seconds (default is TIMEOUTS.DEFAULT seconds).
+        :return: The clicked WebElement.
+        """
+        if isinstance(locator, str):
+            element = self.waits.until(
+                LocatorRegistry.get(locator).strategies, "visible", timeout, action="scroll_click", step=locator
+            )
+            LocatorRegistry.report_match(locator, self.waits.last_wait["matched_index"])
         else:
-            element = target
+            element = self.waits.until(locator, "visible", timeout, action="scroll_click")
+        self.elements.invalidate()  # The click may have navigated the SPA to another view
+        return element
+
+    @traced()
+    def read_texts(self, locator):
+        """
+        Read the text of every element matching the locator in one round trip.
+
+        :param locator: A tuple (By, locator_value) to identify the elements.
+        :return: List of strings.
+        """
+        with self.batch() as batch:
+            batch.read_texts(locator)
+        return batch.results[0]
+
+    @traced()
+    def read_attributes(self, locator, names):
+        """
+        Read attributes of every element matching the locator in one round trip.
+
+        :param locator: A tuple (By, locator_value) to identify the elements.
+        :param names: Attribute names to read.
+        :return: List of {name: value} dicts, one per element.
+        """
+        with self.batch() as batch:
+            batch.read_attributes(locator, names)
+        return batch.results[0]
+
+    @traced()
+    def collect_metrics(self, label):
+        """
+        Collect performance metrics of the current page and store them for trends.
+
+        Navigation Timing, Largest Contentful Paint, long tasks, JS heap size and
+        transferred bytes are read in one script call; durations measured by page
+        steps (self.timings, e.g. "player_visible_ms") are merged in.
 
-        self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-        self.driver.execute_script("arguments[0].click();", element)
+        :param label: Name of the page or state, e.g. "player"; budgets are configured per label.
+        :return: Dict of metric name -> value, with the label under "label".
+        """
+        metrics = dict(collect(self.driver), **self.timings)
+        PageMetrics.record(label, metrics, Tracer.current_test())
+        Tracer.annotate(page_metrics=metrics)
+        return dict(metrics, label=label)
 
+    def batch(self):
+        """
+        Start a ScriptBatch; queued commands run in one round trip when the with-block exits.
+
+        :return: A new ScriptBatch for this page's driver.
+        """
+        return ScriptBatch(self.driver)
+
+    @traced()
     def scroll_vertical(self, pixels):
         """
         Scroll the page vertically by the specified number of pixels.
 
         :param pixels: Number of pixels to scroll vertically.
         """
-        self.driver.execute_script(f"window.scrollBy(0, {pixels});")
+        run_script(self.driver, "window.scrollBy(0, arguments[0]);", pixels)
 
+    @traced()
     def get_all_elements(self, by, value):
         """
         Get all elements matching the locator.
@@ -102,60 +251,114 @@ class BasePage:
         :param value: Locator value for the elements.
         :return: List of WebElements.
         """
-        WebDriverWait(self.driver, TIMEOUTS.DEFAULT).until(
-        EC.presence_of_element_located((by, value))
-        )
-        elements = self.driver.find_elements(by, value)
+        # The wait returns every match, so no second lookup is needed
+        elements = self.waits.until((by, value), "present", TIMEOUTS.DEFAULT, return_all=True)
 
         print(f"[INFO] Found {len(elements)} elements using locator ({by}, '{value}')")
         return elements
 
-    def take_screenshot(self, screenshot_name="screenshot"):
+    @traced()
+    def take_screenshot(self, screenshot_name="screenshot", element=None, clip=None, image_format=None):
         """
         Take a screenshot and save it with the specified name.
 
+        The image is decoded and written by a background worker; only the capture blocks.
+
         :param screenshot_name: The base name for the screenshot file (default is "screenshot").
+        :param element: Optional WebElement, locator tuple or LocatorRegistry name; only that element is captured.
+        :param clip: Optional dict with x, y, width, height (CSS pixels) to capture.
+        :param image_format: "png", "jpeg" or "webp" (defaults to the configured format).
+        :return: Path of the screenshot file.
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")  # Timestamp for uniqueness
-        screenshot_filename = f"{screenshot_name}_{timestamp}.png"
-        screenshot_dir = "screenshots"  # Directory to store screenshots
+        if isinstance(element, tuple):
+            element = self.find_element(*element)
+        elif isinstance(element, str):
+            element = self.locate(element)
+        screenshot_path = ScreenshotPipeline.capture(
+            self.driver, screenshot_name, element=element, clip=clip, image_format=image_format
+        )
+        print(f"Screenshot queued for {screenshot_path}")
+        return screenshot_path
 
-        if not os.path.exists(screenshot_dir):
-            os.makedirs(screenshot_dir)  # Create directory if it doesn't exist
+    @traced()
+    def capture_failure(self, name="failure", context=None):
+        """
+        Take a failure screenshot plus a DOM snapshot, console log and recent network requests.
 
-        # Save the screenshot
-        screenshot_path = os.path.join(screenshot_dir, screenshot_filename)
-        self.driver.save_screenshot(screenshot_path)
-        print(f"Screenshot saved to {screenshot_path}")
+        The snapshot is captured in one round trip within a time budget and written next to
+        the screenshot in the background; inspect it with `python -m lib.failure_artifacts`.
 
-    def is_element_displayed(self, element, timeout=TIMEOUTS.DEFAULT):
+        :param name: Base name of the files.
+        :param context: Extra details stored with the snapshot.
+        :return: Path of the screenshot file.
+        """
+        screenshot_path = self.take_screenshot(name)
+        details = {
+            "test": Tracer.current_test(),
+            "failed_steps": [span["name"] for span in Tracer.current_spans() if span.get("error")],
+        }
+        if self.waits.last_wait and not self.waits.last_wait["found"]:
+            details["failed_wait"] = self.waits.last_wait
+        FailureArtifacts.capture(self.driver, screenshot_path, context=dict(details, **(context or {})))
+        return screenshot_path
+
+    @traced()
+    def is_element_displayed(self, element, timeout=TIMEOUTS.DEFAULT, step=None):
         """
         Check if an element is visible on the page within the specified timeout.
 
-        :param element: Locator tuple (By, locator_value) for the element.
+        :param element: Locator tuple (By, locator_value), or a LocatorRegistry name.
         :param timeout: Timeout in seconds to wait for the element to become visible (default is TIMEOUTS.DEFAULT seconds).
+        :param step: Name the wait's duration history is kept under; give checks with
+                     different expected latencies (e.g. a load wait and a quick probe) their own.
         :return: True if the element is visible, False otherwise.
         """
         try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.visibility_of_element_located(element)
-            )
+            if isinstance(element, str):
+                self.locate(element, "visible", timeout, step=step)
+            else:
+                self.waits.until(element, "visible", timeout, step=step)
             return True
         except TimeoutException:
             return False  # Return False if the element is not visible within the timeout
             
-    def is_modal_present(self):
+    @classmethod
+    def register_modal_selector(cls, locator):
+        """
+        Add a locator to the modal candidates checked by is_modal_present.
+
+        The class gets its own copy of the list, so a selector registered for one page
+        applies to that page and its subclasses only.
+
+        :param locator: Locator tuple (By, locator_value) identifying a modal.
+        """
+        if locator not in cls.MODAL_SELECTORS:
+            cls.MODAL_SELECTORS = cls.MODAL_SELECTORS + [locator]
+
+    @traced()
+    def find_modal(self, timeout=0):
+        """
+        Find the first visible modal among MODAL_SELECTORS.
+
+        All selectors are evaluated inside the page in one round trip.
+
+        :param timeout: Seconds to wait for a modal to appear (default 0, check once).
+        :return: The modal WebElement, or None if no modal is visible.
+        """
+        if timeout:
+            try:
+                return self.waits.until(self.MODAL_SELECTORS, "visible", timeout)
+            except TimeoutException:
+                return None
+        match = self.driver.execute_script(FIND_MODAL_SCRIPT, to_script_args(self.MODAL_SELECTORS))
+        return match["element"] if match else None
+
+    @traced()
+    def is_modal_present(self, timeout=0):
         """
         Heuristically checks for common modal structures on the page.
+
+        :param timeout: Seconds to wait for a modal to appear (default 0, check once).
+        :return: True if a modal is visible, False otherwise.
         """
-        possible_modal_selectors = [
-            (By.CSS_SELECTOR, '[aria-modal="true"]'),
-            (By.CSS_SELECTOR, '[role="dialog"]'),
-            (By.CLASS_NAME, 'modal'),
-            (By.CLASS_NAME, 'popup'),
-        ]
-
-        for selector in possible_modal_selectors:
-            if self.is_element_displayed(selector, TIMEOUTS.SHORT): 
-                return True
-        return False
+        return self.find_modal(timeout) is not None
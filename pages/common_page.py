@@ -1,9 +1,42 @@
 # Import the necessary modules and classes
+import time  # Short pauses while a dismissed modal animates out
 from pages.base_page import BasePage  # Import the BasePage class from the correct location
+from lib.tracing import traced  # Per-step timing spans
 from selenium.webdriver.common.keys import Keys  # Keys class for keyboard actions
 from selenium.webdriver.common.action_chains import ActionChains  # Action chains for complex user interactions
+from lib.constants import TIMEOUTS  # Importing TIMEOUTS from constants
+
+# Clicks a close button inside the modal, returns True if one was found
+CLICK_CLOSE_BUTTON_SCRIPT = """
+var modal = arguments[0], selectors = arguments[1];
+for (var i = 0; i < selectors.length; i++) {
+    var button = modal.querySelector(selectors[i]);
+    if (button) { button.click(); return true; }
+}
+return false;
+"""
+
+# Clicks the page outside the modal (top-left corner), returns True if that point is not inside the modal
+CLICK_OUTSIDE_SCRIPT = """
+var modal = arguments[0];
+var target = document.elementFromPoint(2, 2);
+if (!target || modal.contains(target)) { return false; }
+target.click();
+return true;
+"""
 
 class CommonPage(BasePage):
+    # CSS selectors tried, in order, by the "close_button" dismiss strategy
+    CLOSE_BUTTON_SELECTORS = [
+        'button[aria-label*="Close"]',
+        'button[aria-label*="close"]',
+        'button[data-a-target*="close"]',
+        '[class*="close"]',
+    ]
+
+    # Dismiss strategies tried in order by close_modal_popup (see register_dismiss_strategy)
+    DISMISS_STRATEGIES = []
+
     def __init__(self, driver):
         """
         Initialize the HomePage with the provided WebDriver instance.
@@ -11,6 +44,7 @@ class CommonPage(BasePage):
         """
         super().__init__(driver)  # Call the parent constructor to initialize the driver
 
+    @traced()
     def scroll_down(self, pixels):
         """
         Scroll down the page by a specified number of pixels.
@@ -19,20 +53,88 @@ class CommonPage(BasePage):
         """
         self.scroll_vertical(pixels)  # Scrolls down the page by the given pixel value
         
+    @traced()
     def screenshot(self, screenshot_name):
         """
         Take a screenshot and save it with the given name.
 
         Calls the parent method from BasePage to handle screenshot taking.
+        Returns the path of the screenshot file.
         """
-        self.take_screenshot(screenshot_name)
+        return self.take_screenshot(screenshot_name)
 
-    def close_modal_popup(self):
+    @classmethod
+    def register_dismiss_strategy(cls, name, strategy, first=False):
         """
-        Uses BasePage's modal detection. If modal found, dismiss it via ESC.
+        Register a way of dismissing modals.
+
+        :param name: Name shown in the log output.
+        :param strategy: Callable taking (page, modal_element); should try to close the modal.
+        :param first: If True, try this strategy before the existing ones.
         """
-        if self.is_modal_present():
-            print("Modal detected. Sending ESC to dismiss it.")
-            ActionChains(self.driver).send_keys(Keys.ESCAPE).perform()
+        cls.DISMISS_STRATEGIES = [s for s in cls.DISMISS_STRATEGIES if s[0] != name]
+        if first:
+            cls.DISMISS_STRATEGIES.insert(0, (name, strategy))
         else:
-            print("No modal detected. Continuing.")
\ No newline at end of file
+            cls.DISMISS_STRATEGIES.append((name, strategy))
+
+    @traced()
+    def dismiss_with_escape(self, modal):
+        """
+        Dismiss a modal by sending the ESC key.
+        """
+        ActionChains(self.driver).send_keys(Keys.ESCAPE).perform()
+
+    @traced()
+    def dismiss_with_close_button(self, modal):
+        """
+        Dismiss a modal by clicking its close button, if it has one.
+        """
+        self.driver.execute_script(CLICK_CLOSE_BUTTON_SCRIPT, modal, self.CLOSE_BUTTON_SELECTORS)
+
+    @traced()
+    def dismiss_with_click_outside(self, modal):
+        """
+        Dismiss a modal by clicking the page outside of it.
+        """
+        self.driver.execute_script(CLICK_OUTSIDE_SCRIPT, modal)
+
+    def _wait_for_modal_to_close(self, timeout):
+        """
+        Give a dismissed modal a moment to animate out.
+
+        :return: The modal still visible after the timeout, or None once it is gone.
+        """
+        deadline = time.monotonic() + timeout
+        modal = self.find_modal()
+        while modal is not None and time.monotonic() < deadline:
+            time.sleep(0.1)
+            modal = self.find_modal()
+        return modal
+
+    @traced()
+    def close_modal_popup(self):
+        """
+        Uses BasePage's modal detection. If modal found, tries each dismiss strategy until it is gone.
+
+        :return: True if no modal is left on the page, False otherwise.
+        """
+        modal = self.find_modal()
+        if modal is None:
+            print("No modal detected. Continuing.")
+            return True
+
+        for name, strategy in self.DISMISS_STRATEGIES:
+            print(f"Modal detected. Trying to dismiss it with {name}.")
+            strategy(self, modal)
+            modal = self._wait_for_modal_to_close(TIMEOUTS.SHORT)
+            if modal is None:
+                return True
+        print("Modal could not be dismissed.")
+        return False
+
+
+# Default dismiss strategies, in the order they are tried
+CommonPage.register_dismiss_strategy("ESC", CommonPage.dismiss_with_escape)
+CommonPage.register_dismiss_strategy("close button", CommonPage.dismiss_with_close_button)
+CommonPage.register_dismiss_strategy("click outside", CommonPage.dismiss_with_click_outside)
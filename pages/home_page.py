@@ -1,6 +1,8 @@
 # Import the necessary modules and classes
+import time  # Measuring how long the player takes to appear
 from pages.base_page import BasePage  # Import the BasePage class from the correct location
-from selenium.webdriver.common.by import By  # Locator strategy class for Selenium
+from lib.retries import retry_step  # Re-running a flaky step
+from lib.tracing import traced  # Per-step timing spans
 from selenium.webdriver.common.keys import Keys  # Keys class for keyboard actions
 from selenium.webdriver.support.ui import WebDriverWait  # Explicit wait for elements
 from selenium.webdriver.support import expected_conditions as EC  # Conditions for waiting
@@ -15,17 +17,16 @@ class HomePage(BasePage):
         """
         super().__init__(driver)  # Call the parent constructor to initialize the driver
 
+    @traced()
     def click_browse_button(self):
         """
         Click the 'Browse' button on the homepage.
 
         Waits for the button to be visible and then clicks it using the reusable method.
         """
-        browse_button = (By.XPATH, "//div[text()='Browse']")  # Locator for 'Browse' button
-
-        # Click the element
-        self.click_element(browse_button)
+        self.click_element("home.browse_button")
 
+    @traced()
     def enter_search_text(self, search_text):
         """
         Enter a search term into the search input field.
@@ -33,55 +34,73 @@ class HomePage(BasePage):
         Clears any pre-existing text and enters the provided search_text. 
         Then, presses the Enter key to initiate the search.
         """
-        search_input = (By.CSS_SELECTOR, 'input[placeholder="Search"]')  # Locator for the search input field
-
-        # Find the search input field and clear any existing value
-        search_element = self.find_element(search_input[0], search_input[1])
-        search_element.clear()
+        def type_search(search_element):
+            # Clear any existing value and enter the provided search text
+            search_element.clear()
+            search_element.send_keys(search_text)
 
-        # Enter the provided search text
-        search_element.send_keys(search_text)
+        self.with_element("home.search_input", type_search)
 
         # Press the Enter key to perform the search
         self.press_enter_key()
 
+    @traced()
     def click_twitch_image(self):
         """
         Click on the first visible Twitch image found on the page.
 
-        Waits for the image element to be visible and clicks the first one in the list.
+        Waits for an image element to be visible, then scrolls to it and clicks it
+        in the same round trip.
         """
-        # Get all the elements with the class 'tw-image'
-        elements = self.get_all_elements(By.CLASS_NAME, "tw-image")
-        if elements:
-            self.click_element_with_js(elements[0])
+        self.click_first_visible("search.result_image")
+        self._player_requested = time.perf_counter()
 
+    @traced()
+    @retry_step()
     def wait_for_player_load(self):
         """
         Wait for the video player to load and become visible.
 
         This ensures that the player is fully loaded before interacting with it.
+        A timeout is retried once (see retries.step_retries in config.json).
+        The time from the result click until the player is visible is stored as
+        timings["player_visible_ms"] for collect_metrics.
         """
-        element = (By.CSS_SELECTOR, 'button[data-a-target="player-fullscreen-button"]')  # Locator for player button
-        
-         # Check if the element is displayed and raise an error if not found
-        if not self.is_element_displayed(element):
+        started = getattr(self, "_player_requested", time.perf_counter())
+        # Check if the element is displayed and raise an error if not found
+        if not self.is_element_displayed("player.fullscreen_button", step="player.fullscreen_button:load"):
             raise TimeoutException(f"Video player button not found within the timeout period.")
+        self.timings["player_visible_ms"] = round((time.perf_counter() - started) * 1000, 1)
 
+    @traced()
     def screenshot(self, screenshot_name):
         """
         Take a screenshot and save it with the given name.
 
         Calls the parent method from BasePage to handle screenshot taking.
+        Returns the path of the screenshot file.
         """
-        self.take_screenshot(screenshot_name)
+        return self.take_screenshot(screenshot_name)
 
+    @traced()
     def is_player_visible(self):
         """
         Check if the video player is visible on the page.
 
         Returns True if the player is visible, otherwise False.
         """
-        element = (By.CSS_SELECTOR, 'button[data-a-target="player-fullscreen-button"]')  # Locator for player button
-        return self.is_element_displayed(element)  # Return True if the element is displayed
+        # Its own history: the player is normally already up, unlike in wait_for_player_load
+        return self.is_element_displayed("player.fullscreen_button", step="player.fullscreen_button:visible")
     
+
+    @traced()
+    def video_region(self):
+        """
+        Return the live video's box in screenshot pixels.
+
+        Used as an ignore region for visual comparisons of the player view.
+        """
+        from lib.visual_regression import element_region  # numpy/Pillow are only loaded for visual checks
+
+        video = self.locate("player.video")
+        return element_region(self.driver, video)
@@ -0,0 +1,164 @@
+# pages/locators.py
+import logging  # Reporting fallback matches
+import threading  # Guards the shared registry
+from selenium.webdriver.common.by import By  # Locator strategy class for Selenium
+
+logger = logging.getLogger("locator_logger")
+
+
+class Locator:
+    """
+    A named element locator: a primary (By, value) strategy followed by ordered fallbacks.
+    """
+    def __init__(self, name, strategies):
+        """
+        :param name: Registry name, e.g. "home.search_input".
+        :param strategies: (By, value) tuples, primary first.
+        """
+        if not strategies:
+            raise ValueError(f"Locator {name} needs at least one strategy")
+        self.name = name
+        self.strategies = [tuple(strategy) for strategy in strategies]
+        self.fallback_hits = 0  # Times the primary strategy missed and a fallback matched
+
+    @property
+    def primary(self):
+        return self.strategies[0]
+
+    def __repr__(self):
+        return f"Locator({self.name!r}, {self.strategies!r})"
+
+
+class LocatorRegistry:
+    """
+    Central registry of named locators shared by all page objects.
+
+    Pages refer to elements by name (e.g. `self.click_element("home.browse_button")`);
+    every strategy of a locator is checked together in one in-page lookup, so a
+    missing primary selector falls back immediately instead of after a timeout.
+    """
+    _lock = threading.Lock()
+    _locators = {}
+
+    @classmethod
+    def register(cls, name, *strategies):
+        """
+        Register (or replace) a named locator.
+
+        :param name: Registry name, e.g. "home.search_input".
+        :param strategies: (By, value) tuples, primary first.
+        :return: The Locator.
+        """
+        locator = Locator(name, strategies)
+        with cls._lock:
+            cls._locators[name] = locator
+        return locator
+
+    @classmethod
+    def get(cls, name):
+        """
+        Return a registered locator.
+
+        :param name: Registry name.
+        :raises KeyError: If no locator has that name.
+        """
+        try:
+            return cls._locators[name]
+        except KeyError:
+            raise KeyError(f"No locator registered as {name!r}") from None
+
+    @classmethod
+    def names(cls):
+        return sorted(cls._locators)
+
+    @classmethod
+    def report_match(cls, name, index):
+        """
+        Record which strategy of a locator matched, warning when it was a fallback.
+
+        :param name: Registry name.
+        :param index: Index of the matching strategy (0 is the primary).
+        """
+        if not index:
+            return
+        locator = cls.get(name)
+        locator.fallback_hits += 1
+        logger.warning(
+            f"Locator {name}: primary {locator.primary} did not match, "
+            f"fallback #{index} {locator.strategies[index]} did; consider updating the registry"
+        )
+
+
+class ElementCache:
+    """
+    Resolved element references of one browser session, by locator name.
+
+    The whole cache is dropped when the page navigates (BasePage.load), after the
+    BasePage click and Enter helpers (which may move the SPA to another view without
+    a page load) and when a pooled browser is reset. An entry is also dropped as soon
+    as using it raises a stale/detached element error, so a reference is not reused
+    after the DOM it came from has changed.
+    """
+    def __init__(self):
+        self._elements = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def for_driver(driver):
+        """
+        Return the cache attached to a driver, creating it on first use.
+        """
+        cache = getattr(driver, "element_cache", None)
+        if cache is None:
+            cache = driver.element_cache = ElementCache()
+        return cache
+
+    def get(self, name):
+        element = self._elements.get(name)
+        if element is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return element
+
+    def put(self, name, element):
+        self._elements[name] = element
+
+    def invalidate(self, name=None):
+        """
+        Drop one cached element, or all of them when no name is given.
+        """
+        if name is None:
+            self._elements.clear()
+        else:
+            self._elements.pop(name, None)
+
+
+# Twitch locators; the first strategy is the one the site uses today
+LocatorRegistry.register(
+    "home.browse_button",
+    (By.XPATH, "//div[text()='Browse']"),
+    (By.CSS_SELECTOR, 'a[data-a-target="browse-link"]'),
+    (By.CSS_SELECTOR, 'a[href="/directory"]'),
+)
+LocatorRegistry.register(
+    "home.search_input",
+    (By.CSS_SELECTOR, 'input[placeholder="Search"]'),
+    (By.CSS_SELECTOR, 'input[type="search"]'),
+    (By.CSS_SELECTOR, 'input[aria-label*="Search"]'),
+)
+LocatorRegistry.register(
+    "search.result_image",
+    (By.CLASS_NAME, "tw-image"),
+    (By.CSS_SELECTOR, 'img[class*="tw-image"]'),
+)
+LocatorRegistry.register(
+    "player.fullscreen_button",
+    (By.CSS_SELECTOR, 'button[data-a-target="player-fullscreen-button"]'),
+    (By.CSS_SELECTOR, 'button[aria-label*="ullscreen"]'),
+)
+LocatorRegistry.register(
+    "player.video",
+    (By.CSS_SELECTOR, "video"),
+)
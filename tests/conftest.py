@@ -0,0 +1,67 @@
+import pytest # Import pytest for testing framework
+from driver.driver_setup import Driver, DriverPool  # Import the Driver and DriverPool classes
+from lib.command_counter import CommandCounter  # WebDriver command counting
+from lib.network_recorder import NetworkRecorder  # Record/replay of HTTP traffic
+from pages.home_page import HomePage  # Import the HomePage
+from pages.common_page import CommonPage # Import the CommonPage
+
+
+def pytest_generate_tests(metafunc):
+    """
+    Run tests that take a `device` argument once per device of the configured device matrix.
+    """
+    if "device" in metafunc.fixturenames:
+        metafunc.parametrize("device", [device["name"] for device in Driver.load_device_matrix()])
+
+
+@pytest.fixture(scope="session")
+def driver_pool():
+    """
+    Session-scoped pool of pre-warmed WebDriver instances,
+    closed once all tests have completed.
+    """
+    pool = DriverPool()
+    pool.warm(mobile=True)  # Start the mobile emulation browser up front
+    yield pool
+    pool.close_all()
+
+
+@pytest.fixture
+def driver(driver_pool, request):
+    """
+    Pytest fixture to take a WebDriver instance from the pool,
+    then reset and return it after the test completes.
+
+    Tests parametrized with `device` share one pooled browser that is switched to the
+    device through DevTools emulation.
+
+    In record/replay network modes the test's traffic goes through a NetworkRecorder.
+    The command counter is attached to the test item so the number of
+    WebDriver commands sent by the test can be reported (see conftest.py).
+    """
+    if "device" in request.fixturenames:
+        driver = driver_pool.acquire(device=request.getfixturevalue("device"))
+    else:
+        marker = request.node.get_closest_marker("driver_config")  # @pytest.mark.driver_config(mobile=False) for desktop
+        driver = driver_pool.acquire(mobile=marker.kwargs.get("mobile", True) if marker else True)  # Mobile emulation by default
+    recorder = None
+    try:
+        # Record or replay the test's HTTP traffic when a network mode is configured
+        recorder = NetworkRecorder(driver, archive_name=request.node.name)
+        recorder.start()
+        request.node.command_counter = CommandCounter.install(driver)
+        request.node.commands_before = request.node.command_counter.total
+        yield driver
+        recorder.stop()
+    finally:
+        driver_pool.release(driver)  # Always hand the slot back, even if the recorder failed
+    recorder.raise_for_misses()
+
+
+@pytest.fixture
+def home_page(driver):
+    return HomePage(driver)
+
+@pytest.fixture
+def common_page(driver):
+    return CommonPage(driver)
@@ -0,0 +1,56 @@
+import pytest  # Fixtures
+from lib.adaptive_timeouts import AdaptiveTimeouts  # Class under test
+
+SETTINGS = {"enabled": True, "percentile": 95, "multiplier": 3.0, "min_timeout": 3.0, "max_timeout": 30,
+            "min_samples": 5, "max_samples": 20}
+
+
+@pytest.fixture(autouse=True)
+def history(tmp_path, monkeypatch):
+    """
+    An empty in-memory history that is never saved to the real file.
+    """
+    monkeypatch.setattr(AdaptiveTimeouts, "_settings", dict(SETTINGS, history_file=str(tmp_path / "waits.json")))
+    monkeypatch.setattr(AdaptiveTimeouts, "_history", {})
+    monkeypatch.setattr(AdaptiveTimeouts, "_new_samples", {})
+
+
+def test_requested_timeout_is_used_until_there_are_enough_samples():
+    """
+    Below min_samples the caller's timeout is returned unchanged.
+    """
+    for _ in range(4):
+        AdaptiveTimeouts.record("step", 0.2, "ci/desktop")
+
+    assert AdaptiveTimeouts.budget("step", 20, "ci/desktop") == 20
+    AdaptiveTimeouts.record("step", 0.2, "ci/desktop")
+    assert AdaptiveTimeouts.budget("step", 20, "ci/desktop") == 3.0
+    assert AdaptiveTimeouts.budget("step", 20, "ci/Pixel_7_412x915@2.625") == 20  # Other profiles learn separately
+
+
+def test_budget_is_percentile_times_multiplier_clamped_to_the_requested_timeout():
+    """
+    The learned budget lies between min_timeout and the requested timeout (or max_timeout when allowed).
+    """
+    for _ in range(10):
+        AdaptiveTimeouts.record("slow", 2.0, "p")
+        AdaptiveTimeouts.record("very_slow", 15.0, "p")
+
+    assert AdaptiveTimeouts.budget("slow", 20, "p") == 6.0
+    assert AdaptiveTimeouts.budget("slow", 2, "p") == 2  # Never longer than asked for
+    assert AdaptiveTimeouts.budget("very_slow", 20, "p") == 20
+    assert AdaptiveTimeouts.budget("very_slow", 20, "p", allow_longer=True) == 30
+
+
+def test_budget_grows_back_after_timeouts():
+    """
+    When a step gets slower, its timeouts are recorded at the budget and raise the next budget.
+    """
+    for _ in range(20):
+        AdaptiveTimeouts.record("step", 0.5, "p")
+    budget = AdaptiveTimeouts.budget("step", 20, "p")
+    assert budget == 3.0
+
+    for _ in range(2):
+        AdaptiveTimeouts.record_timeout("step", budget, "p")
+    assert AdaptiveTimeouts.budget("step", 20, "p") > budget
@@ -0,0 +1,143 @@
+import queue  # Messages the fake socket hands to the reader thread
+import pytest  # Checking the errors raised
+import websocket  # Patched so the session connects to a fake socket
+from selenium.common.exceptions import WebDriverException  # Raised for unanswered commands
+from driver.cdp_transport import (  # Functions under test
+    CdpConnectionError, CdpNotSentError, CdpSession, cdp_command, run_script
+)
+
+
+class RecordingDriver:
+    """
+    Records which transport a script went through.
+    """
+    def __init__(self, session=None):
+        self.cdp = session
+        self.classic = []
+
+    def execute_script(self, script, *args):
+        self.classic.append(args)
+        return "classic"
+
+    def execute_cdp_cmd(self, method, params):
+        self.classic.append((method, params))
+        return "classic"
+
+
+class RecordingSession:
+    alive = True
+
+    def __init__(self):
+        self.expressions = []
+
+    def run_script(self, script, *args):
+        self.expressions.append(CdpSession.script_expression(script, args))
+        return "cdp"
+
+
+def test_json_scripts_use_the_websocket_and_others_fall_back():
+    """
+    Scripts with JSON arguments go over the DevTools socket; element arguments or a missing socket use WebDriver.
+    """
+    session = RecordingSession()
+    driver = RecordingDriver(session)
+
+    assert run_script(driver, "window.scrollBy(0, arguments[0]);", 200) == "cdp"
+    assert session.expressions == ["(function () {\nwindow.scrollBy(0, arguments[0]);\n}).apply(null, [200])"]
+    assert run_script(driver, "arguments[0].click();", object()) == "classic"
+    session.alive = False
+    assert run_script(driver, "return 1;") == "classic"
+    assert run_script(RecordingDriver(), "return 1;") == "classic"
+
+
+class DroppingSocket:
+    """
+    A websocket that goes away as soon as a command is written to it.
+    """
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.sent = []
+
+    def settimeout(self, timeout):
+        pass
+
+    def send(self, message):
+        self.sent.append(message)
+        self.messages.put(ConnectionResetError("socket closed by the browser"))
+
+    def recv(self):
+        message = self.messages.get()
+        if isinstance(message, Exception):
+            raise message
+        return message
+
+    def close(self):
+        self.messages.put(ConnectionResetError("closed"))
+
+
+def test_only_idempotent_commands_fall_back_when_the_socket_drops_during_the_call(monkeypatch):
+    """
+    A socket lost after the command was sent raises, unless the caller marked the command idempotent.
+    """
+    socket = DroppingSocket()
+    monkeypatch.setattr(websocket, "create_connection", lambda *args, **kwargs: socket)
+    session = CdpSession("ws://devtools.test/page", timeout=2)
+    driver = RecordingDriver(session)
+
+    with pytest.raises(CdpConnectionError):
+        run_script(driver, "window.scrollBy(0, arguments[0]);", 1)
+    assert len(socket.sent) == 1
+    assert not session.alive
+    assert driver.classic == []
+
+    socket = DroppingSocket()
+    driver = RecordingDriver(CdpSession("ws://devtools.test/page", timeout=2))
+    assert run_script(driver, "return arguments[0];", 2, idempotent=True) == "classic"
+    assert len(socket.sent) == 1
+    assert driver.classic == [(2,)]
+
+
+class ClosedSession:
+    """
+    A session whose socket turns out to be gone when the command is written.
+    """
+    alive = True
+
+    def run_script(self, script, *args):
+        raise CdpNotSentError("The DevTools connection is closed")
+
+    def call(self, method, params):
+        raise CdpNotSentError("The DevTools connection is closed")
+
+
+def test_commands_never_sent_fall_back():
+    """
+    A command that never reached the socket goes through WebDriver, idempotent or not.
+    """
+    driver = RecordingDriver(ClosedSession())
+
+    assert run_script(driver, "window.scrollBy(0, arguments[0]);", 1) == "classic"
+    assert cdp_command(driver, "Page.captureScreenshot", {"format": "png"}) == "classic"
+    assert driver.classic == [(1,), ("Page.captureScreenshot", {"format": "png"})]
+
+
+class SilentSocket(DroppingSocket):
+    """
+    A websocket that never answers.
+    """
+    def send(self, message):
+        self.sent.append(message)
+
+
+def test_unanswered_commands_are_forgotten_after_the_timeout(monkeypatch):
+    """
+    A command that times out is removed from the pending table.
+    """
+    socket = SilentSocket()
+    monkeypatch.setattr(websocket, "create_connection", lambda *args, **kwargs: socket)
+    session = CdpSession("ws://devtools.test/page", timeout=0.05)
+
+    with pytest.raises(WebDriverException):
+        session.call("Runtime.evaluate", {"expression": "1"})
+    assert session._pending == {}
+    session.close()
@@ -0,0 +1,66 @@
+import json  # Writing the test config
+import pytest  # Fixtures and error checks
+from driver.driver_setup import Driver  # Functions under test
+
+MATRIX = {
+    "device_matrix": {
+        "run": ["Pixel 7"],
+        "devices": {
+            "Pixel 7": {"width": 412, "height": 915, "pixelRatio": 2.625, "mobile": True},
+            "iPad Mini": {"width": 768, "height": 1024, "pixelRatio": 2.0, "mobile": True},
+            "Desktop 1366x768": {"width": 1366, "height": 768, "pixelRatio": 1.0, "mobile": False},
+        },
+    }
+}
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    """
+    A config file with a small device matrix, and no DEVICES override.
+    """
+    monkeypatch.delenv("DEVICES", raising=False)
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(MATRIX))
+    return str(path)
+
+
+def test_run_list_is_the_default(config_path):
+    """
+    Without DEVICES only the devices in "run" are used.
+    """
+    assert Driver.load_device_matrix(config_path) == [
+        {"name": "Pixel 7", "width": 412, "height": 915, "pixelRatio": 2.625, "mobile": True}
+    ]
+
+
+def test_devices_env_var_selects_devices(config_path, monkeypatch):
+    """
+    DEVICES picks devices by name, in order, and "all" runs the whole matrix.
+    """
+    monkeypatch.setenv("DEVICES", "Desktop 1366x768, iPad Mini")
+    assert [d["name"] for d in Driver.load_device_matrix(config_path)] == ["Desktop 1366x768", "iPad Mini"]
+
+    monkeypatch.setenv("DEVICES", "all")
+    assert [d["name"] for d in Driver.load_device_matrix(config_path)] == ["Pixel 7", "iPad Mini", "Desktop 1366x768"]
+
+
+def test_unknown_devices_are_rejected(config_path, monkeypatch):
+    """
+    A misspelled device name fails loudly instead of being skipped.
+    """
+    monkeypatch.setenv("DEVICES", "Pixel 7,Pixel 9")
+    with pytest.raises(ValueError, match="Pixel 9"):
+        Driver.load_device_matrix(config_path)
+    with pytest.raises(ValueError, match="Galaxy"):
+        Driver.get_device("Galaxy S99", config_path)
+
+
+def test_get_device_returns_a_copy_with_its_name(config_path):
+    """
+    The returned profile carries its name and does not alias the config.
+    """
+    device = Driver.get_device("iPad Mini", config_path)
+    assert device == {"name": "iPad Mini", "width": 768, "height": 1024, "pixelRatio": 2.0, "mobile": True}
+    device["width"] = 1
+    assert Driver.get_device("iPad Mini", config_path)["width"] == 768
@@ -0,0 +1,125 @@
+import threading  # Acquiring from a second thread
+import pytest  # Fixtures
+from driver.driver_setup import Driver, DriverPool  # Class under test
+
+
+class FakeBrowser:
+    """
+    Answers the commands the pool sends for reset and health checks.
+    """
+    def __init__(self):
+        self.window_handles = ["main"]
+        self.switch_to = self
+        self.alive = True
+        self.quit = False
+
+    def window(self, handle):
+        pass
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("browser is gone")
+        if "performance.memory" in script:
+            return 0
+        if "location.origin" in script:
+            return "null"
+        return 1
+
+    def execute_cdp_cmd(self, command, params):
+        return {}
+
+    def get(self, url):
+        pass
+
+
+@pytest.fixture
+def browsers(monkeypatch):
+    """
+    Replace browser start and quit with fakes; returns every browser started.
+    """
+    started = []
+
+    def get_driver(mobile=False, config_path="config.json", device=None):
+        browser = FakeBrowser()
+        started.append(browser)
+        return browser
+
+    def close_driver(driver):
+        driver.quit = True
+
+    monkeypatch.setattr(Driver, "get_driver", staticmethod(get_driver))
+    monkeypatch.setattr(Driver, "close_driver", staticmethod(close_driver))
+    return started
+
+
+def test_warm_never_starts_more_than_size(browsers):
+    """
+    Warming reserves its slots up front and respects `size`.
+    """
+    pool = DriverPool(size=2)
+    pool.warm(count=5)
+    pool.warm(count=5)
+
+    assert len(browsers) == 2
+
+
+def test_acquire_blocks_at_size_until_release(browsers):
+    """
+    A second acquire waits for the only slot and then reuses the released browser.
+    """
+    pool = DriverPool(size=1)
+    first = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+
+    pool.release(first)
+    waiter.join(5)
+    assert acquired == [first]
+    assert len(browsers) == 1
+
+
+def test_session_is_retired_after_max_uses(browsers):
+    """
+    A browser that served `max_uses` tests is quit and replaced.
+    """
+    pool = DriverPool(size=1, max_uses=2)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    pool.release(first)
+
+    assert first.quit
+    second = pool.acquire()
+    assert second is not first
+    assert len(browsers) == 2
+
+
+def test_unhealthy_session_is_replaced(browsers):
+    """
+    An idle browser that no longer answers is discarded and a new one started.
+    """
+    pool = DriverPool(size=1)
+    first = pool.acquire()
+    pool.release(first)
+    first.alive = False
+
+    second = pool.acquire()
+    assert second is not first
+    assert first.quit
+
+
+def test_close_all_quits_idle_and_busy_sessions(browsers):
+    """
+    Every browser owned by the pool is quit and the slots are freed.
+    """
+    pool = DriverPool(size=2)
+    busy = pool.acquire()
+    idle = pool.acquire()
+    pool.release(idle)
+
+    pool.close_all()
+    assert busy.quit and idle.quit
+    assert pool.acquire() not in (busy, idle)
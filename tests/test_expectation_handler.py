@@ -0,0 +1,45 @@
+import base64  # The fake browser returns base64 screenshots
+import pytest  # Checking the raised AssertionError
+import lib.screenshot_pipeline  # Screenshots are redirected to tmp_path
+from lib.expectation_handler import ExpectationHandler  # Functions under test
+from lib.failure_artifacts import FailureArtifacts  # Snapshot writer
+from lib.screenshot_pipeline import ScreenshotPipeline  # Screenshot writer
+
+PNG = base64.b64encode(b"\x89PNG fake frame").decode()
+
+
+class FakeDriver:
+    """
+    Answers the screenshot and snapshot commands of a failure capture.
+    """
+    cdp = None
+
+    def execute(self, driver_command, params=None):
+        return {"value": None}
+
+    def get_screenshot_as_base64(self):
+        return PNG
+
+    def execute_script(self, script, *args):
+        return {"url": "https://www.twitch.tv/", "title": "Twitch", "dom": "<html></html>", "console": [], "network": []}
+
+
+def test_failed_assertion_raises_and_writes_failure_artifacts(tmp_path, monkeypatch):
+    """
+    A failed assertion is re-raised after a screenshot and a DOM snapshot were written.
+    """
+    monkeypatch.setattr(lib.screenshot_pipeline, "artifact_dir", lambda kind: str(tmp_path))
+    monkeypatch.setattr(ScreenshotPipeline, "_settings", {"format": "png", "dedupe": False})
+    monkeypatch.setattr(FailureArtifacts, "_settings", {"compression": "gzip"})
+
+    with pytest.raises(AssertionError, match="Twitch player is not visible"):
+        ExpectationHandler.assert_true(FakeDriver(), False, "Twitch player is not visible")
+    ScreenshotPipeline.flush()
+    FailureArtifacts.flush()
+
+    screenshots = list(tmp_path.glob("assert_true_failure_*.png"))
+    snapshots = list(tmp_path.glob("assert_true_failure_*.snapshot.json.gz"))
+    assert len(screenshots) == 1 and len(snapshots) == 1
+    assert FailureArtifacts.load(str(snapshots[0]))["url"] == "https://www.twitch.tv/"
+    ExpectationHandler.assert_true(FakeDriver(), True)  # A passing assertion captures nothing
+    assert len(list(tmp_path.iterdir())) == 2
@@ -0,0 +1,72 @@
+import threading  # Holding a capture until the test releases it
+import pytest  # Skipping the replay test without lxml
+from lib.failure_artifacts import FailureArtifacts, replay_locators  # Functions under test
+
+DOM = """<!DOCTYPE html><html><body>
+<div>Browse</div><input type="search" placeholder="Search">
+<img class="tw-image card">
+</body></html>"""
+
+
+class PageDriver:
+    """
+    Answers the snapshot script the way Chrome would for DOM.
+    """
+    def execute_script(self, script, max_dom, max_network):
+        return {"url": "https://www.twitch.tv/search", "title": "Twitch", "viewport": {}, "active_element": None,
+                "dom_length": len(DOM), "dom_truncated": False, "dom": DOM[:max_dom],
+                "console": [{"level": "error", "time": 0, "message": "boom"}], "network": []}
+
+
+def test_snapshot_is_written_next_to_the_screenshot(tmp_path, monkeypatch):
+    """
+    The snapshot is compressed, written beside the screenshot and loads back unchanged.
+    """
+    monkeypatch.setattr(FailureArtifacts, "_settings", {"compression": "gzip"})
+    path = FailureArtifacts.capture(PageDriver(), str(tmp_path / "assert_true_failure_1.png"), context={"test": "t"})
+    FailureArtifacts.flush()
+
+    assert path == str(tmp_path / "assert_true_failure_1.snapshot.json.gz")
+    snapshot = FailureArtifacts.load(path)
+    assert snapshot["dom"] == DOM
+    assert snapshot["console"][0]["message"] == "boom"
+    assert snapshot["context"] == {"test": "t"}
+
+
+class HungDriver:
+    """
+    Never answers the snapshot script until released.
+    """
+    def __init__(self):
+        self.release = threading.Event()
+
+    def execute_script(self, script, max_dom, max_network):
+        self.release.wait(10)
+        return PageDriver().execute_script(script, max_dom, max_network)
+
+
+def test_a_hung_capture_does_not_block_the_next_one(tmp_path, monkeypatch):
+    """
+    After a capture runs out of time, the next capture runs on a fresh thread and succeeds.
+    """
+    monkeypatch.setattr(FailureArtifacts, "_settings", {"compression": "gzip", "time_budget": 0.1})
+    hung = HungDriver()
+    try:
+        assert FailureArtifacts.capture(hung, str(tmp_path / "first.png")) is None
+        path = FailureArtifacts.capture(PageDriver(), str(tmp_path / "second.png"))
+        FailureArtifacts.flush()
+        assert FailureArtifacts.load(path)["dom"] == DOM
+    finally:
+        hung.release.set()
+
+
+def test_registered_locators_are_replayed_against_the_dom():
+    """
+    Each strategy of a registered locator is counted against the snapshot's DOM.
+    """
+    pytest.importorskip("lxml")
+    results = dict(replay_locators({"dom": DOM}, ["home.browse_button", "search.result_image", "player.video"]))
+
+    assert results["home.browse_button"][0][2] == 1
+    assert results["search.result_image"][0][2] == 1
+    assert results["player.video"][0][2] == 0
@@ -0,0 +1,20 @@
+from lib.live_report import LiveReport  # Class under test
+
+
+def test_rows_are_on_disk_before_the_report_is_closed(tmp_path):
+    """
+    Each row is flushed as it is added, screenshots are linked, and closing stops the page reloading.
+    """
+    report = LiveReport(str(tmp_path / "reports" / "live_report.html"))
+    report.open()
+    report.add("tests/test_a.py::test_a", "passed", 1.5, worker="gw0")
+    report.add("tests/test_a.py::test_b", "failed", 2.0, message="assert 1 == 2",
+               screenshots=[str(tmp_path / "screenshots" / "gw0" / "player.png")])
+
+    content = (tmp_path / "reports" / "live_report.html").read_text()
+    assert content.count("<tr class=\"result") == 2
+    assert "href=\"../screenshots/gw0/player.png\"" in content
+    assert "id=\"done\"" not in content
+
+    report.close()
+    assert "id=\"done\"" in (tmp_path / "reports" / "live_report.html").read_text()
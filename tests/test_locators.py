@@ -0,0 +1,120 @@
+import pytest  # Error checks
+from selenium.common.exceptions import StaleElementReferenceException  # Raised by a detached element
+from pages.base_page import BasePage  # Page helpers under test
+from pages.locators import ElementCache, LocatorRegistry  # Classes under test
+
+
+class FakeElement:
+    """
+    An element that records clicks, or raises once it has gone stale.
+    """
+    def __init__(self, stale=False):
+        self.stale = stale
+        self.clicks = 0
+
+    def click(self):
+        if self.stale:
+            raise StaleElementReferenceException("element is not attached to the page document")
+        self.clicks += 1
+
+
+class FakeWaits:
+    """
+    Stands in for WaitEngine: every lookup returns the next element it was given.
+    """
+    def __init__(self, *elements):
+        self.elements = list(elements)
+        self.lookups = []
+        self.last_wait = {"matched_index": 0}
+
+    def until(self, locators, condition="present", timeout=None, step=None):
+        self.lookups.append(step)
+        return self.elements.pop(0)
+
+
+class FakeDriver:
+    """
+    Accepts the navigation and script commands a page sends.
+    """
+    cdp = None
+
+    def __init__(self):
+        self.urls = []
+
+    def execute(self, driver_command, params=None):
+        return {"value": None}
+
+    def get(self, url):
+        self.urls.append(url)
+
+    def execute_script(self, script, *args):
+        return {}
+
+
+def page_with(*elements):
+    page = BasePage(FakeDriver())
+    page.waits = FakeWaits(*elements)
+    return page
+
+
+def test_cached_element_is_reused_without_a_lookup():
+    """
+    A second action on the same name uses the cached reference.
+    """
+    element = FakeElement()
+    page = page_with(element)
+
+    page.with_element("home.search_input", lambda e: e.click())
+    page.with_element("home.search_input", lambda e: e.click())
+
+    assert element.clicks == 2
+    assert page.waits.lookups == ["home.search_input"]
+    assert (page.elements.hits, page.elements.misses) == (1, 1)
+
+
+def test_stale_element_is_found_again():
+    """
+    An action that fails on a stale cached element re-resolves the locator and retries once.
+    """
+    stale, fresh = FakeElement(stale=True), FakeElement()
+    page = page_with(fresh)
+    page.elements.put("home.search_input", stale)
+
+    page.with_element("home.search_input", lambda e: e.click())
+
+    assert fresh.clicks == 1
+    assert page.elements.get("home.search_input") is fresh
+
+
+def test_cache_is_dropped_after_navigating_actions():
+    """
+    Clicks and page loads may leave the current document, so every cached element is dropped.
+    """
+    page = page_with(FakeElement())
+    page.elements.put("home.search_input", FakeElement())
+
+    page.click_element("home.browse_button")
+    assert page.elements.get("home.browse_button") is None
+    assert page.elements.get("home.search_input") is None
+
+    page.elements.put("home.search_input", FakeElement())
+    page.load("https://www.twitch.tv/")
+    assert page.elements.get("home.search_input") is None
+
+
+def test_cache_is_shared_by_the_pages_of_a_driver():
+    """
+    Every page of one browser session uses the same cache.
+    """
+    driver = FakeDriver()
+    assert BasePage(driver).elements is BasePage(driver).elements is ElementCache.for_driver(driver)
+
+
+def test_unknown_locator_name_is_reported():
+    """
+    Looking up a name nobody registered fails with the name in the message.
+    """
+    with pytest.raises(KeyError, match="home.no_such_button"):
+        LocatorRegistry.get("home.no_such_button")
+    with pytest.raises(KeyError, match="home.no_such_button"):
+        page_with().locate("home.no_such_button")
@@ -0,0 +1,44 @@
+import hashlib  # Expected body digests
+from lib.network_recorder import NetworkArchive  # Class under test
+
+
+def test_ignored_query_params_are_stripped():
+    """
+    Ignored parameters (cache busters) do not change the key.
+    """
+    archive = NetworkArchive("unused.jsonl.gz", ignore_query_params=["_", "t"])
+
+    assert archive.key("GET", "https://gql.twitch.tv/a?q=1&_=123&t=9") == "GET https://gql.twitch.tv/a?q=1"
+    assert archive.key("GET", "https://gql.twitch.tv/a?_=1") == "GET https://gql.twitch.tv/a"
+
+
+def test_parameter_order_does_not_change_the_key():
+    """
+    The same parameters in a different order give the same key.
+    """
+    archive = NetworkArchive("unused.jsonl.gz")
+
+    assert archive.key("GET", "https://x.test/p?b=2&a=1&a=0") == archive.key("GET", "https://x.test/p?a=0&b=2&a=1")
+    assert archive.key("GET", "https://x.test/p?b=2&a=1") == "GET https://x.test/p?a=1&b=2"
+
+
+def test_fragment_is_dropped():
+    """
+    Fragments never reach the server, so they are not part of the key.
+    """
+    archive = NetworkArchive("unused.jsonl.gz")
+
+    assert archive.key("GET", "https://x.test/p?a=1#top") == "GET https://x.test/p?a=1"
+
+
+def test_post_data_is_hashed_into_the_key():
+    """
+    Requests with a body are told apart by a hash of the body.
+    """
+    archive = NetworkArchive("unused.jsonl.gz")
+    body = '{"operationName": "SearchResults"}'
+
+    key = archive.key("POST", "https://gql.twitch.tv/gql", post_data=body)
+    assert key == f"POST https://gql.twitch.tv/gql {hashlib.sha1(body.encode('utf-8')).hexdigest()}"
+    assert key != archive.key("POST", "https://gql.twitch.tv/gql", post_data=body + " ")
+    assert archive.key("POST", "https://gql.twitch.tv/gql") == "POST https://gql.twitch.tv/gql"
@@ -0,0 +1,32 @@
+from lib.page_metrics import PageMetrics, budget_violations  # Functions under test
+
+
+def test_budget_violations_report_exceeded_and_missing_metrics():
+    """
+    Metrics over budget and metrics that were not measured are both reported.
+    """
+    metrics = {"player_visible_ms": 3500.0, "transfer_bytes": 1000, "lcp_ms": None}
+    budgets = {"player_visible_ms": 3000, "transfer_bytes": 5000, "lcp_ms": 4000}
+
+    violations = budget_violations(metrics, budgets)
+
+    assert len(violations) == 2
+    assert violations[0].startswith("lcp_ms was not measured")
+    assert violations[1].startswith("player_visible_ms = 3500.0 exceeds")
+
+
+def test_update_history_stores_one_median_per_run(tmp_path, monkeypatch):
+    """
+    Each session adds the median of every metric per label to the history.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(PageMetrics, "_settings", {"history_file": str(tmp_path / "history.json"), "max_runs": 2})
+    for run in range(3):
+        for value in (100, 200 + run, 900):
+            PageMetrics.record("player", {"lcp_ms": value, "url": "https://example.test"})
+        PageMetrics.update_history()
+        (tmp_path / "reports" / "main" / "page_metrics.jsonl").unlink()
+
+    runs = PageMetrics.history()["player"]
+    assert [r["metrics"]["lcp_ms"] for r in runs] == [201, 202]
+    assert runs[-1]["samples"] == 3
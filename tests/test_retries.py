@@ -0,0 +1,134 @@
+import json  # Config and flakiness history of the inner runs
+import os  # Locating the repository root
+import pytest  # Fixtures
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException, WebDriverException  # Failure kinds
+from lib.network_recorder import UnrecordedRequestError  # Replay misses
+from lib.retries import FlakinessTracker, classify_failure  # Functions under test
+
+pytest_plugins = ["pytester"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RETRIES = {"max_retries": 2, "retry_on": ["timeout"], "min_runs": 5, "quarantine_threshold": 0.3, "window": 20,
+           "history_file": ".cache/flakiness.json", "quarantine": ["test_inner.py::test_quarantined"]}
+
+
+@pytest.fixture
+def inner(pytester, monkeypatch):
+    """
+    A pytest run in a scratch folder using this repository's conftest.py and retry settings.
+    """
+    monkeypatch.setenv("PYTHONPATH", ROOT)
+    with open(os.path.join(ROOT, "conftest.py")) as conftest:
+        pytester.makeconftest(conftest.read())
+    pytester.makefile(".json", config=json.dumps({"retries": RETRIES, "live_report": {"enabled": False}}))
+    return pytester
+
+
+def run_inner(pytester, source):
+    pytester.makepyfile(test_inner=source)
+    return pytester.runpytest_subprocess("-p", "no:cacheprovider")
+
+
+def test_timeout_is_retried_until_it_passes(inner):
+    result = run_inner(inner, """
+        from selenium.common.exceptions import TimeoutException
+        attempts = []
+        def test_flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise TimeoutException("slow")
+    """)
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*2 retries (timeout, timeout), flaky: test_inner.py::test_flaky*"])
+
+
+def test_retries_are_exhausted(inner):
+    result = run_inner(inner, """
+        from selenium.common.exceptions import TimeoutException
+        attempts = []
+        def test_always_slow():
+            attempts.append(1)
+            raise TimeoutException(f"slow {len(attempts)}")
+    """)
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*TimeoutException*slow 3*"])
+
+
+def test_non_retryable_failure_is_not_retried(inner):
+    result = run_inner(inner, """
+        attempts = []
+        def test_wrong_value():
+            attempts.append(1)
+            assert len(attempts) > 1
+    """)
+    result.assert_outcomes(failed=1)
+    result.stdout.no_fnmatch_line("*retrying*")
+
+
+def test_quarantined_test_is_reported_as_xfailed(inner):
+    result = run_inner(inner, """
+        def test_quarantined():
+            assert False
+    """)
+    result.assert_outcomes(xfailed=1)
+    result.stdout.fnmatch_lines(["*quarantined in config.json: test_inner.py::test_quarantined*"])
+
+
+def test_function_fixtures_are_torn_down_between_attempts(inner):
+    events = inner.path / "events.txt"
+    result = run_inner(inner, f"""
+        import pytest
+        from selenium.common.exceptions import TimeoutException
+        attempts = []
+        def log(event):
+            with open({str(events)!r}, "a") as f:
+                f.write(event + "\\n")
+        @pytest.fixture(scope="session")
+        def pool():
+            log("pool setup")
+            yield
+            log("pool teardown")
+        @pytest.fixture
+        def browser(pool):
+            log("browser setup")
+            yield
+            log("browser teardown")
+        def test_flaky(browser):
+            attempts.append(1)
+            if len(attempts) < 2:
+                raise TimeoutException("slow")
+    """)
+    result.assert_outcomes(passed=1)
+    assert events.read_text().split("\n")[:-1] == [
+        "pool setup", "browser setup", "browser teardown", "browser setup", "browser teardown", "pool teardown",
+    ]
+
+
+@pytest.mark.parametrize("exception, kind", [
+    (TimeoutException("slow"), "timeout"),
+    (AssertionError("wrong"), "assertion"),
+    (UnrecordedRequestError("GET https://example.test"), "replay_miss"),
+    (InvalidSessionIdException("invalid session id"), "webdriver_crash"),
+    (WebDriverException("chrome not reachable"), "webdriver_crash"),
+    (WebDriverException("element click intercepted"), "webdriver"),
+    (ValueError("bug"), "error"),
+])
+def test_classify_failure(exception, kind):
+    assert classify_failure(exception) == kind
+
+
+def test_flakiness_score_counts_only_the_recent_window(monkeypatch):
+    """
+    The score is the share of non-first-attempt passes over the last `window` runs; broken tests score 0.
+    """
+    runs = [{"outcome": "flaky"}] * 2 + [{"outcome": "passed"}] * 2 + [{"outcome": "flaky"}, {"outcome": "passed"}]
+    monkeypatch.setattr(FlakinessTracker, "_settings", dict(RETRIES, window=4, quarantine=[]))
+    monkeypatch.setattr(FlakinessTracker, "_history", {"flaky": runs, "broken": [{"outcome": "failed"}] * 6})
+
+    assert FlakinessTracker.score("flaky") == 0.25
+    assert FlakinessTracker.score("broken") == 0.0
+    assert FlakinessTracker.score("unknown") == 0.0
+    assert FlakinessTracker.quarantine_reason("flaky") is None
+    monkeypatch.setitem(FlakinessTracker._settings, "quarantine_threshold", 0.25)
+    assert FlakinessTracker.quarantine_reason("flaky").startswith("quarantined as flaky (score 0.25 over the last 4 runs)")
@@ -0,0 +1,80 @@
+import base64  # The fake browser returns base64 screenshots
+import os  # Checking written files
+import re  # File name pattern
+import pytest  # Fixtures
+import lib.screenshot_pipeline  # Screenshots are redirected to tmp_path
+from lib.screenshot_pipeline import ScreenshotPipeline  # Class under test
+
+NAME = re.compile(r"^player_\d{8}_\d{6}_\d{6}_(\d{4})\.png$")
+
+
+class FrameDriver:
+    """
+    Returns the given frames, one per screenshot.
+    """
+    cdp = None
+
+    def __init__(self, *frames):
+        self.frames = list(frames)
+
+    def get_screenshot_as_base64(self):
+        return base64.b64encode(self.frames.pop(0)).decode()
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    """
+    A pipeline writing to tmp_path with empty de-duplication state.
+    """
+    monkeypatch.setattr(lib.screenshot_pipeline, "artifact_dir", lambda kind: str(tmp_path))
+    monkeypatch.setattr(ScreenshotPipeline, "_settings", {"format": "png", "dedupe": True})
+    monkeypatch.setattr(ScreenshotPipeline, "_hashes", {})
+    monkeypatch.setattr(ScreenshotPipeline, "_aliases", {})
+    monkeypatch.setattr(ScreenshotPipeline, "_captures", [])
+    return ScreenshotPipeline
+
+
+def test_names_carry_microseconds_and_a_sequence_number(pipeline):
+    """
+    Captures taken back to back get distinct names with increasing sequence numbers.
+    """
+    driver = FrameDriver(b"one", b"two")
+    first = os.path.basename(pipeline.capture(driver, "player"))
+    second = os.path.basename(pipeline.capture(driver, "player"))
+    pipeline.flush()
+
+    assert NAME.match(first) and NAME.match(second)
+    assert first != second
+    assert int(NAME.match(second).group(1)) > int(NAME.match(first).group(1))
+
+
+def test_identical_frames_are_written_once(pipeline, tmp_path):
+    """
+    A frame with the same SHA-256 as an earlier one is not written; resolve() points at the earlier file.
+    """
+    driver = FrameDriver(b"same frame", b"same frame", b"other frame")
+    first = pipeline.capture(driver, "player")
+    duplicate = pipeline.capture(driver, "player")
+    other = pipeline.capture(driver, "player")
+
+    assert pipeline.resolve(duplicate) == first
+    assert pipeline.resolve(first) == first
+    assert pipeline.resolve(other) == other
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(first), os.path.basename(other)])
+    with open(first, "rb") as screenshot_file:
+        assert screenshot_file.read() == b"same frame"
+    assert pipeline.take_captures() == [first, other]
+
+
+def test_dedupe_can_be_turned_off(pipeline, tmp_path, monkeypatch):
+    """
+    With dedupe off every capture gets its own file.
+    """
+    monkeypatch.setattr(ScreenshotPipeline, "_settings", {"format": "png", "dedupe": False})
+    driver = FrameDriver(b"same frame", b"same frame")
+    first = pipeline.capture(driver, "player")
+    second = pipeline.capture(driver, "player")
+
+    assert pipeline.resolve(second) == second
+    assert len(os.listdir(tmp_path)) == 2
+    assert pipeline.take_captures() == [first, second]
@@ -0,0 +1,71 @@
+import pytest  # Error checks
+from selenium.common.exceptions import JavascriptException  # Raised for a throwing snippet
+from lib.script_batch import ScriptBatch  # Class under test
+
+
+class BatchDriver:
+    """
+    Records the batch script and answers with the given per-snippet outcomes.
+    """
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append((script, args))
+        return self.outcomes
+
+
+def test_build_script_runs_every_snippet_with_its_own_arguments():
+    """
+    Snippets are wrapped in order, each applied to its own argument list.
+    """
+    batch = ScriptBatch(BatchDriver([]))
+    first = batch.scroll_by(200)
+    second = batch.read_texts(("class name", "tw-image"))
+
+    script = batch.build_script()
+    assert (first, second) == (0, 1)
+    assert batch.arguments == [[200], ["class name", "tw-image"]]
+    assert script.index("window.scrollBy(0, arguments[0]);") < script.index("__find(arguments[0], arguments[1])")
+    assert ".apply(null, calls[0])" in script and ".apply(null, calls[1])" in script
+    assert script.count("catch (e)") == 2
+    assert script.endswith("return results;")
+
+
+def test_results_are_unpacked_in_order():
+    """
+    The batch runs in one call and `results` holds each snippet's value.
+    """
+    driver = BatchDriver([{}, {"value": ["Just Chatting", "Fortnite"]}])
+    with ScriptBatch(driver) as batch:
+        batch.scroll_by(200)
+        texts = batch.read_texts(("class name", "tw-image"))
+
+    assert len(driver.calls) == 1
+    assert driver.calls[0][1] == ([[200], ["class name", "tw-image"]],)
+    assert batch.results == [None, ["Just Chatting", "Fortnite"]]
+    assert batch.results[texts] == ["Just Chatting", "Fortnite"]
+
+
+def test_a_throwing_snippet_raises_after_the_batch_ran():
+    """
+    A snippet that throws is reported by index; the other snippets' values are kept.
+    """
+    batch = ScriptBatch(BatchDriver([{"value": 1}, {"error": "el is null"}, {"value": "x"}]))
+    batch.add("return 1;")
+    batch.add("return el.innerText;")
+    batch.add("return arguments[0];", "x")
+
+    with pytest.raises(JavascriptException, match=r"#1 failed: el is null"):
+        batch.execute()
+    assert batch.results == [1, None, "x"]
+
+
+def test_empty_batch_sends_nothing():
+    """
+    A batch with no snippets makes no round trip.
+    """
+    driver = BatchDriver(None)
+    assert ScriptBatch(driver).execute() == []
+    assert driver.calls == []
@@ -0,0 +1,43 @@
+import json  # Writing shard result files
+from lib.sharding import merge_results, partition, shard_results  # Functions under test
+
+
+def test_partition_balances_longest_first():
+    """
+    Longest-processing-time-first keeps shard totals close together.
+    """
+    durations = {"a": 8, "b": 7, "c": 6, "d": 5, "e": 4}
+    shards = partition([(nodeid, None) for nodeid in durations], 2, durations)
+
+    totals = [sum(durations[nodeid] for nodeid in shard) for shard in shards]
+    assert max(totals) - min(totals) <= max(durations.values())
+    assert sorted(nodeid for shard in shards for nodeid in shard) == sorted(durations)
+
+
+def test_partition_groups_tests_by_driver_configuration():
+    """
+    Browser startup cost keeps tests of one driver configuration on the same shard.
+    """
+    tests = [("m1", "mobile"), ("d1", "desktop"), ("m2", "mobile"), ("d2", "desktop")]
+    durations = {"m1": 5, "m2": 5, "d1": 5, "d2": 5}
+    shards = partition(tests, 2, durations, startup={"mobile": 30, "desktop": 30})
+
+    assert sorted(map(sorted, shards)) == [["d1", "d2"], ["m1", "m2"]]
+
+
+def test_merge_results_combines_shards(tmp_path):
+    """
+    Merging writes one JSON and one HTML report covering every shard.
+    """
+    paths = []
+    for shard_id, reports in enumerate([{"a": {"outcome": "passed", "duration": 1.0}},
+                                        {"b": {"outcome": "failed", "duration": 2.0}}]):
+        path = tmp_path / f"shard{shard_id}.json"
+        path.write_text(json.dumps(shard_results(shard_id, 2, reports)))
+        paths.append(str(path))
+
+    merged = merge_results(paths, str(tmp_path / "merged"))
+
+    assert merged["outcomes"] == {"passed": 1, "failed": 1}
+    assert [t["shard_id"] for t in merged["tests"]] == [0, 1]
+    assert (tmp_path / "merged" / "merged_report.html").exists()
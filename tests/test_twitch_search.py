@@ -1,30 +1,10 @@
-import pytest # Import pytest for testing framework
 from selenium.webdriver.remote.webdriver import WebDriver  # Correct WebDriver import for type hinting
-from driver.driver_setup import Driver  # Import the Driver class
 from lib.url import TWITCH_URL     # Import the URL from lib.url
 from lib.expectation_handler import ExpectationHandler  # Import the ExpectationHandler
+from lib.constants import CONSTANTS # Import the constants
+from lib.scenario_runner import ScenarioRunner  # Concurrent multi-session runner
 from pages.home_page import HomePage  # Import the HomePage
 from pages.common_page import CommonPage # Import the CommonPage
-from lib.constants import CONSTANTS # Import the constants
-
-
-@pytest.fixture
-def driver():
-    """
-    Pytest fixture to initialize and yield a WebDriver instance,
-    then close it after the test completes.
-    """
-    driver = Driver.get_driver(mobile=True)  # Enable mobile emulation
-    yield driver
-    Driver.close_driver(driver)
-    
-@pytest.fixture
-def home_page(driver):
-    return HomePage(driver)
-
-@pytest.fixture
-def common_page(driver):
-    return CommonPage(driver)
 
 
 def test_twitch_search_player(driver: WebDriver, home_page, common_page):
@@ -58,7 +38,55 @@ def test_twitch_search_player(driver: WebDriver, home_page, common_page):
 
     # Verify the video player is visible
     is_player_visible = home_page.is_player_visible()
-    ExpectationHandler.assert_true(is_player_visible, "Twitch player is not visible")
+    ExpectationHandler.assert_true(driver, is_player_visible, "Twitch player is not visible")
+
+    # Check how fast the player appeared and how much the page loaded
+    ExpectationHandler.assert_performance_budget(driver, home_page.collect_metrics("player"))
 
     # Capture a screenshot of the player view
-    common_page.screenshot(CONSTANTS.SCREENSHOT_NAME)
\ No newline at end of file
+    screenshot_path = common_page.screenshot(CONSTANTS.SCREENSHOT_NAME)
+
+    # Compare the player view with its golden image, ignoring the live video
+    ExpectationHandler.assert_visual_match(driver, screenshot_path, "test_twitch_search_player",
+                                           ignore_regions=[home_page.video_region])
+
+
+def search_player_flow(driver: WebDriver, search_text):
+    """
+    Search for a stream and open its player; used as a ScenarioRunner scenario.
+
+    Returns True if the player became visible.
+    """
+    home_page = HomePage(driver)
+    common_page = CommonPage(driver)
+
+    home_page.load(TWITCH_URL)
+    home_page.click_browse_button()
+    home_page.enter_search_text(search_text)
+    common_page.close_modal_popup()
+    for _ in range(2):  # Scroll twice to load more results
+        common_page.scroll_down(200)
+    home_page.click_twitch_image()
+    home_page.wait_for_player_load()
+    return home_page.is_player_visible()
+
+
+def test_twitch_search_player_on_devices(driver: WebDriver, device):
+    """
+    Run the search flow on every device of the device matrix, reusing one browser.
+    """
+    assert search_player_flow(driver, CONSTANTS.TWITCH_SEARCH_STARCRAFT_II), f"Twitch player is not visible on {device}"
+
+
+def test_twitch_search_player_concurrent(driver_pool):
+    """
+    Run the search flow for several search terms at once, one browser per scenario.
+    """
+    runner = ScenarioRunner(driver_pool)
+    results = runner.run({
+        term: (lambda driver, term=term: search_player_flow(driver, term))
+        for term in CONSTANTS.TWITCH_SEARCH_TERMS
+    })
+
+    failed = [r for r in results if not (r.passed and r.value)]
+    assert not failed, f"Scenarios failed: {failed} ({runner.summary(results)})"
@@ -0,0 +1,76 @@
+import numpy as np  # Building test images
+from PIL import Image  # Writing test images
+from pathlib import Path  # Splitting baseline paths
+from types import SimpleNamespace  # Stand-in drivers carrying a device profile
+from lib.visual_regression import VisualBaseline, compare_images, compare_batch, mismatch_mask  # Functions under test
+
+
+def write_image(path, array):
+    Image.fromarray(array).save(path)
+    return str(path)
+
+
+def test_identical_images_match(tmp_path):
+    """
+    Identical captures pass with no mismatched pixels.
+    """
+    image = np.full((40, 30, 3), 120, dtype=np.uint8)
+    actual = write_image(tmp_path / "actual.png", image)
+    expected = write_image(tmp_path / "expected.png", image)
+
+    result = compare_images(actual, expected)
+    assert result.passed
+    assert result.mismatched_pixels == 0
+
+
+def test_changed_block_fails_and_writes_diff(tmp_path):
+    """
+    A changed block is counted pixel by pixel and a diff image is written.
+    """
+    expected_image = np.zeros((40, 30, 3), dtype=np.uint8)
+    actual_image = expected_image.copy()
+    actual_image[10:20, 5:15] = 255
+    actual = write_image(tmp_path / "actual.png", actual_image)
+    expected = write_image(tmp_path / "expected.png", expected_image)
+    diff_path = tmp_path / "diff.png"
+
+    result = compare_images(actual, expected, diff_path=str(diff_path))
+    assert not result.passed
+    assert result.mismatched_pixels == 100
+    assert diff_path.exists()
+
+
+def test_ignore_regions_and_threshold():
+    """
+    Ignored regions and differences below the threshold do not count.
+    """
+    expected = np.zeros((20, 20, 3), dtype=np.uint8)
+    actual = expected.copy()
+    actual[0:5, 0:5] = 255  # Inside the ignored region
+    actual[10:12, 10:12] = 3  # Below the perceptual threshold
+
+    mask = mismatch_mask(actual, expected, threshold=0.1, ignore_regions=[(0, 0, 5, 5)])
+    assert not mask.any()
+
+
+def test_size_mismatch_fails(tmp_path):
+    """
+    Captures with a different size than the baseline fail.
+    """
+    actual = write_image(tmp_path / "actual.png", np.zeros((10, 10, 3), dtype=np.uint8))
+    expected = write_image(tmp_path / "expected.png", np.zeros((12, 10, 3), dtype=np.uint8))
+
+    (result,) = compare_batch([{"actual_path": actual, "expected_path": expected}])
+    assert not result.passed
+
+
+def test_baselines_are_kept_per_driver_device_profile():
+    """
+    Browsers emulating different devices compare against different golden images.
+    """
+    desktop = VisualBaseline(driver=SimpleNamespace(device_profile="desktop"))
+    pixel = VisualBaseline(driver=SimpleNamespace(device_profile="Pixel_7_412x915@2.625"))
+
+    assert Path(desktop.baseline_path("test_player", "player")).parts[-3] == "desktop"
+    assert Path(pixel.baseline_path("test_player", "player")).parts[-3] == "Pixel_7_412x915@2.625"
+    assert VisualBaseline(driver=object()).profile == VisualBaseline.profile_key()